@@ -1,8 +1,15 @@
+import concurrent.futures
+import hashlib
+import json
+import os
+import shutil
 import subprocess
 from functools import lru_cache
-from typing import Tuple
+from pathlib import Path
+from typing import Optional, Tuple
 
 from .Architectures import isaToGfx
+from .Utilities import atomicWrite
 
 
 def _tryAssembler(
@@ -49,93 +56,173 @@ def _tryAssembler(
     return True
 
 
-########################################
-# Get Caps
-########################################
+# Assembler capabilities probed by assembling short instruction sequences. A capability
+# is present if any of its alternatives assembles without diagnostics.
+# fmt: off
+_ASM_CAP_PROBES = (
+    ("SupportedISA",      ("",)),
+    ("HasExplicitCO",     ("v_add_co_u32 v0,vcc,v0,1",)),
+    ("HasExplicitNC",     ("v_add_nc_u32 v0,v0,1",)),
 
+    ("HasDirectToLds",    ("buffer_load_dword v36, s[24:27], s28 offen offset:0 lds",
+                           "buffer_load_b32 v36, s[24:27], s28 offen offset:0 lds")),
+    ("HasAddLshl",        ("v_add_lshl_u32 v47, v36, v34, 0x2",)),
+    ("HasLshlOr",         ("v_lshl_or_b32 v47, v36, 0x2, v34",)),
+    ("HasSMulHi",         ("s_mul_hi_u32 s47, s36, s34",)),
 
-@lru_cache()
-def initAsmCaps(isaVersion, assemblerPath, isDebug) -> dict:
-    """Determine assembler capabilities by testing short instructions sequences"""
-    rv = {}
-    # fmt: off
-    rv["SupportedISA"]      = _tryAssembler(isaVersion, assemblerPath, "", isDebug)
-    rv["HasExplicitCO"]     = _tryAssembler(isaVersion, assemblerPath, "v_add_co_u32 v0,vcc,v0,1", isDebug)
-    rv["HasExplicitNC"]     = _tryAssembler(isaVersion, assemblerPath, "v_add_nc_u32 v0,v0,1", isDebug)
+    ("HasMFMA_explictB",  ("v_mfma_f32_32x32x1_2b_f32 a[0:31], v0, v1, a[0:31]",)),
+    ("HasMFMA",           ("v_mfma_f32_32x32x2bf16 a[0:31], v32, v33, a[0:31]",
+                           "v_mfma_f32_32x32x1_2b_f32 a[0:31], v0, v1, a[0:31]")),
+    ("HasMFMA_f64",       ("v_mfma_f64_16x16x4f64 v[0:7], v[32:33], v[36:37], v[0:7]",
+                           "v_mfma_f64_16x16x4_f64 v[0:7], v[32:33], v[36:37], v[0:7]")),
+    ("HasMFMA_bf16_1k",   ("v_mfma_f32_32x32x4bf16_1k a[0:31], v[32:33], v[36:37], a[0:31]",)),
+    ("HasMFMA_f8",        ("v_mfma_f32_16x16x32_fp8_fp8 a[0:3], v[2:3], v[4:5], a[0:3]",)),
+    ("HasMFMA_b8",        ("v_mfma_f32_16x16x32_bf8_bf8 a[0:3], v[2:3], v[4:5], a[0:3]",)),
 
-    rv["HasDirectToLds"]    = _tryAssembler(isaVersion, assemblerPath, "buffer_load_dword v36, s[24:27], s28 offen offset:0 lds", isDebug) \
-                                or _tryAssembler(isaVersion, assemblerPath, "buffer_load_b32 v36, s[24:27], s28 offen offset:0 lds", isDebug)
-    rv["HasAddLshl"]        = _tryAssembler(isaVersion, assemblerPath, "v_add_lshl_u32 v47, v36, v34, 0x2", isDebug)
-    rv["HasLshlOr"]         = _tryAssembler(isaVersion, assemblerPath, "v_lshl_or_b32 v47, v36, 0x2, v34", isDebug)
-    rv["HasSMulHi"]         = _tryAssembler(isaVersion, assemblerPath, "s_mul_hi_u32 s47, s36, s34", isDebug)
+    ("HasMFMA_xf32",      ("v_mfma_f32_32x32x4_xf32 a[0:15], v[32:33], v[36:37], a[0:15]",)),
+    ("HasSMFMA",          ("v_smfmac_f32_32x32x16_f16 a[0:15], v[32:33], v[36:39], v[40]",)),
+    ("HasWMMA",           ("v_wmma_f32_16x16x16_f16 v[0:3], v[8:15], v[16:23], v[0:3]",
+                           "v_wmma_f32_16x16x16_f16 v[0:3], v[8:9], v[16:17], v[0:3]")),
+    ("HasWMMA_V1",        ("v_wmma_f32_16x16x16_f16 v[0:3], v[8:15], v[16:23], v[0:3]",)),
+    ("HasWMMA_V2",        ("v_wmma_f32_16x16x16_f16 v[0:3], v[8:9], v[16:17], v[0:3]",)),
 
-    rv["HasMFMA_explictB"]  = _tryAssembler(isaVersion, assemblerPath, "v_mfma_f32_32x32x1_2b_f32 a[0:31], v0, v1, a[0:31]", isDebug)
-    rv["HasMFMA"]           = _tryAssembler(isaVersion, assemblerPath, "v_mfma_f32_32x32x2bf16 a[0:31], v32, v33, a[0:31]", isDebug) or rv["HasMFMA_explictB"]
-    rv["HasMFMA_f64"]       = _tryAssembler(isaVersion, assemblerPath, "v_mfma_f64_16x16x4f64 v[0:7], v[32:33], v[36:37], v[0:7]", isDebug) or _tryAssembler(isaVersion, assemblerPath, "v_mfma_f64_16x16x4_f64 v[0:7], v[32:33], v[36:37], v[0:7]", isDebug)
-    rv["HasMFMA_bf16_1k"]   = _tryAssembler(isaVersion, assemblerPath, "v_mfma_f32_32x32x4bf16_1k a[0:31], v[32:33], v[36:37], a[0:31]", isDebug)
-    rv["HasMFMA_f8"]        = _tryAssembler(isaVersion, assemblerPath, "v_mfma_f32_16x16x32_fp8_fp8 a[0:3], v[2:3], v[4:5], a[0:3]", isDebug)
-    rv["HasMFMA_b8"]        = _tryAssembler(isaVersion, assemblerPath, "v_mfma_f32_16x16x32_bf8_bf8 a[0:3], v[2:3], v[4:5], a[0:3]", isDebug)
+    ("v_mac_f16",         ("v_mac_f16 v47, v36, v34",)),
 
-    rv["HasMFMA_xf32"]      = _tryAssembler(isaVersion, assemblerPath, "v_mfma_f32_32x32x4_xf32 a[0:15], v[32:33], v[36:37], a[0:15]", isDebug)
-    rv["HasSMFMA"]          = _tryAssembler(isaVersion, assemblerPath, "v_smfmac_f32_32x32x16_f16 a[0:15], v[32:33], v[36:39], v[40]", isDebug)
-    rv["HasWMMA"]           = _tryAssembler(isaVersion, assemblerPath, "v_wmma_f32_16x16x16_f16 v[0:3], v[8:15], v[16:23], v[0:3]", isDebug) \
-                                or _tryAssembler(isaVersion, assemblerPath, "v_wmma_f32_16x16x16_f16 v[0:3], v[8:9], v[16:17], v[0:3]", isDebug)
-    rv["HasWMMA_V1"]        = _tryAssembler(isaVersion, assemblerPath, "v_wmma_f32_16x16x16_f16 v[0:3], v[8:15], v[16:23], v[0:3]", isDebug)
-    rv["HasWMMA_V2"]        = _tryAssembler(isaVersion, assemblerPath, "v_wmma_f32_16x16x16_f16 v[0:3], v[8:9], v[16:17], v[0:3]", isDebug)
+    ("v_fma_f16",         ("v_fma_f16 v47, v36, v34, v47, op_sel:[0,0,0,0]",)),
+    ("v_fmac_f16",        ("v_fma_f16 v47, v36, v34",)),
 
-    rv["v_mac_f16"]         = _tryAssembler(isaVersion, assemblerPath, "v_mac_f16 v47, v36, v34", isDebug)
+    ("v_pk_fma_f16",      ("v_pk_fma_f16 v47, v36, v34, v47, op_sel:[0,0,0]",)),
+    ("v_pk_fmac_f16",     ("v_pk_fma_f16 v47, v36, v34",)),
 
-    rv["v_fma_f16"]         = _tryAssembler(isaVersion, assemblerPath, "v_fma_f16 v47, v36, v34, v47, op_sel:[0,0,0,0]", isDebug)
-    rv["v_fmac_f16"]        = _tryAssembler(isaVersion, assemblerPath, "v_fma_f16 v47, v36, v34", isDebug)
+    ("v_pk_add_f32",      ("v_pk_add_f32 v[48:49], v[36:37], v[0:1]",)),
+    ("v_pk_mul_f32",      ("v_pk_mul_f32 v[20:21], v[18:19], v[20:21]",)),
 
-    rv["v_pk_fma_f16"]      = _tryAssembler(isaVersion, assemblerPath, "v_pk_fma_f16 v47, v36, v34, v47, op_sel:[0,0,0]", isDebug)
-    rv["v_pk_fmac_f16"]     = _tryAssembler(isaVersion, assemblerPath, "v_pk_fma_f16 v47, v36, v34", isDebug)
+    ("v_mad_mix_f32",     ("v_mad_mix_f32 v47, v36, v34, v47, op_sel:[0,0,0] op_sel_hi:[1,1,0]",)),
+    ("v_fma_mix_f32",     ("v_fma_mix_f32 v47, v36, v34, v47, op_sel:[0,0,0] op_sel_hi:[1,1,0]",)),
 
-    rv["v_pk_add_f32"]      = _tryAssembler(isaVersion, assemblerPath, "v_pk_add_f32 v[48:49], v[36:37], v[0:1]", isDebug)
-    rv["v_pk_mul_f32"]      = _tryAssembler(isaVersion, assemblerPath, "v_pk_mul_f32 v[48:49], v[36:37], v[0:1]", isDebug)
+    ("v_dot2_f32_f16",    ("v_dot2_f32_f16 v20, v36, v34, v20",)),
+    ("v_dot2c_f32_f16",   ("v_dot2c_f32_f16 v47, v36, v34",
+                           "v_dot2acc_f32_f16 v47, v36, v34")),
 
-    rv["v_pk_mul_f32"]      = _tryAssembler(isaVersion, assemblerPath, "v_pk_mul_f32 v[20:21], v[18:19], v[20:21]", isDebug)
+    ("v_dot4_i32_i8",     ("v_dot4_i32_i8 v47, v36, v34",)),
+    ("v_dot4c_i32_i8",    ("v_dot4c_i32_i8 v47, v36, v34",)),
+    ("VOP3v_dot4_i32_i8", ("v_dot4_i32_i8 v47, v36, v34, v47",)),
 
-    rv["v_mad_mix_f32"]     = _tryAssembler(isaVersion, assemblerPath, "v_mad_mix_f32 v47, v36, v34, v47, op_sel:[0,0,0] op_sel_hi:[1,1,0]", isDebug)
-    rv["v_fma_mix_f32"]     = _tryAssembler(isaVersion, assemblerPath, "v_fma_mix_f32 v47, v36, v34, v47, op_sel:[0,0,0] op_sel_hi:[1,1,0]", isDebug)
+    ("v_mac_f32",         ("v_mac_f32 v20, v21, v22",)),
+    ("v_fma_f32",         ("v_fma_f32 v20, v21, v22, v23",)),
+    ("v_fmac_f32",        ("v_fmac_f32 v20, v21, v22",)),
 
-    rv["v_dot2_f32_f16"]    = _tryAssembler(isaVersion, assemblerPath, "v_dot2_f32_f16 v20, v36, v34, v20", isDebug)
-    rv["v_dot2c_f32_f16"]   = _tryAssembler(isaVersion, assemblerPath, "v_dot2c_f32_f16 v47, v36, v34", isDebug) \
-                                or _tryAssembler(isaVersion, assemblerPath, "v_dot2acc_f32_f16 v47, v36, v34", isDebug)
+    ("v_fma_f64",         ("v_fma_f64 v[20:21], v[22:23], v[24:25], v[20:21]",)),
 
-    rv["v_dot4_i32_i8"]     = _tryAssembler(isaVersion, assemblerPath, "v_dot4_i32_i8 v47, v36, v34", isDebug)
-    rv["v_dot4c_i32_i8"]    = _tryAssembler(isaVersion, assemblerPath, "v_dot4c_i32_i8 v47, v36, v34", isDebug)
-    rv["VOP3v_dot4_i32_i8"] = _tryAssembler(isaVersion, assemblerPath, "v_dot4_i32_i8 v47, v36, v34, v47", isDebug)
+    ("v_mov_b64",         ("v_mov_b64 v[0:1], v[2:3]",)),
 
-    rv["v_mac_f32"]         = _tryAssembler(isaVersion, assemblerPath, "v_mac_f32 v20, v21, v22", isDebug)
-    rv["v_fma_f32"]         = _tryAssembler(isaVersion, assemblerPath, "v_fma_f32 v20, v21, v22, v23", isDebug)
-    rv["v_fmac_f32"]        = _tryAssembler(isaVersion, assemblerPath, "v_fmac_f32 v20, v21, v22", isDebug)
+    ("HasAtomicAdd",      ("buffer_atomic_add_f32 v0, v1, s[0:3], 0 offen offset:0",
+                           "buffer_atomic_add_f32 v0, v1, s[0:3], null offen offset:0")),
+    ("HasGLCModifier",    ("buffer_load_dwordx4 v[10:13], v[0], s[0:3], 0, offen offset:0, glc",)),
+    ("HasMUBUFConst",     ("buffer_load_dword v40, v36, s[24:27], 1 offen offset:0",
+                           "buffer_load_b32 v40, v36, s[24:27], 1 offen offset:0")),
+    ("HasSCMPK",          ("s_cmpk_gt_u32 s56, 0x0",)),
 
-    rv["v_fma_f64"]         = _tryAssembler(isaVersion, assemblerPath, "v_fma_f64 v[20:21], v[22:23], v[24:25], v[20:21]", isDebug)
+    ("HasNTModifier",     ("buffer_load_dwordx4 v[10:13], v[0], s[0:3], 0, offen offset:0, nt",)),
 
-    rv["v_mov_b64"]         = _tryAssembler(isaVersion, assemblerPath, "v_mov_b64 v[0:1], v[2:3]", isDebug)
+    ("HasNewBarrier",     ("s_barrier_wait -1",)),
+)
 
-    rv["HasAtomicAdd"]      = _tryAssembler(isaVersion, assemblerPath, "buffer_atomic_add_f32 v0, v1, s[0:3], 0 offen offset:0", isDebug) \
-                                or _tryAssembler(isaVersion, assemblerPath, "buffer_atomic_add_f32 v0, v1, s[0:3], null offen offset:0", isDebug)
-    rv["HasGLCModifier"]    = _tryAssembler(isaVersion, assemblerPath, "buffer_load_dwordx4 v[10:13], v[0], s[0:3], 0, offen offset:0, glc", isDebug) \
-                                or _tryAssembler(isaVersion, assemblerPath, "buffer_load_dwordx4 v[10:13], v[0], s[0:3], null, offen offset:0, glc", isDebug)
-    rv["HasMUBUFConst"]    = _tryAssembler(isaVersion, assemblerPath, "buffer_load_dword v40, v36, s[24:27], 1 offen offset:0", isDebug) \
-                                or _tryAssembler(isaVersion, assemblerPath, "buffer_load_b32 v40, v36, s[24:27], 1 offen offset:0", isDebug)
-    rv["HasSCMPK"]          = _tryAssembler(isaVersion, assemblerPath, "s_cmpk_gt_u32 s56, 0x0", isDebug)
+# The first count that assembles determines MaxVmcnt, 0 if none does.
+_MAX_VMCNT_PROBES = (
+    (63, "s_waitcnt vmcnt(63)"),
+    (15, "s_waitcnt vmcnt(15)"),
+)
+# fmt: on
 
-    rv["HasGLCModifier"]    = _tryAssembler(isaVersion, assemblerPath, "buffer_load_dwordx4 v[10:13], v[0], s[0:3], 0, offen offset:0, glc", isDebug)
+_ASM_CAPS_CACHE_VERSION = 2
 
-    rv["HasNTModifier"]    = _tryAssembler(isaVersion, assemblerPath, "buffer_load_dwordx4 v[10:13], v[0], s[0:3], 0, offen offset:0, nt", isDebug)
 
-    rv["HasNewBarrier"]    = _tryAssembler(isaVersion, assemblerPath, "s_barrier_wait -1", isDebug)
-    # fmt: on
+def _asmCapsCachePath() -> Optional[Path]:
+    """Directory of the persistent assembler capability cache, None if disabled.
 
-    if _tryAssembler(isaVersion, assemblerPath, "s_waitcnt vmcnt(63)", isDebug):
-        rv["MaxVmcnt"] = 63
-    elif _tryAssembler(isaVersion, assemblerPath, "s_waitcnt vmcnt(15)", isDebug):
-        rv["MaxVmcnt"] = 15
-    else:
-        rv["MaxVmcnt"] = 0
+    Defaults to ``$XDG_CACHE_HOME/tensile/asm_caps`` and may be moved with
+    ``TENSILE_ASM_CAPS_CACHE``; setting that variable to an empty string disables it.
+    """
+    path = os.environ.get("TENSILE_ASM_CAPS_CACHE")
+    if path is None:
+        cacheHome = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        path = os.path.join(cacheHome, "tensile", "asm_caps")
+    return Path(path) if path else None
+
+
+def _asmCapsCacheFile(isaVersion: Tuple[int, int, int], assemblerPath: str) -> Optional[Path]:
+    """Cache file for an ISA and assembler, None if the cache or the assembler is unavailable.
+
+    The key covers the resolved assembler path, size and modification time of the
+    assembler binary, the ISA and the probes themselves.
+    """
+    cachePath = _asmCapsCachePath()
+    if cachePath is None:
+        return None
+    resolved = shutil.which(str(assemblerPath)) or str(assemblerPath)
+    try:
+        resolved = os.path.realpath(resolved)
+        stat = os.stat(resolved)
+    except OSError:
+        return None
+    key = repr(
+        (
+            _ASM_CAPS_CACHE_VERSION,
+            resolved,
+            stat.st_size,
+            stat.st_mtime_ns,
+            tuple(isaVersion),
+            _ASM_CAP_PROBES,
+            _MAX_VMCNT_PROBES,
+        )
+    )
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return cachePath / f"{isaToGfx(isaVersion)}-{digest}.json"
+
+
+def _readAsmCapsCache(cacheFile: Path) -> Optional[dict]:
+    try:
+        with open(cacheFile, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _writeAsmCapsCache(cacheFile: Path, caps: dict):
+    try:
+        cacheFile.parent.mkdir(parents=True, exist_ok=True)
+        with atomicWrite(cacheFile) as f:
+            json.dump(caps, f, indent=1)
+    except OSError:
+        pass
+
+
+def _probeAsmCaps(isaVersion, assemblerPath, isDebug) -> dict:
+    """Runs every probe of an ISA, distinct instruction sequences are assembled concurrently."""
+    asmStrings = list(
+        dict.fromkeys(
+            [asm for _, alternatives in _ASM_CAP_PROBES for asm in alternatives]
+            + [asm for _, asm in _MAX_VMCNT_PROBES]
+        )
+    )
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(16, len(asmStrings))) as executor:
+        results = dict(
+            zip(
+                asmStrings,
+                executor.map(
+                    lambda asm: _tryAssembler(isaVersion, assemblerPath, asm, isDebug), asmStrings
+                ),
+            )
+        )
+
+    rv = {}
+    for cap, alternatives in _ASM_CAP_PROBES:
+        rv[cap] = any(results[asm] for asm in alternatives)
+
+    rv["MaxVmcnt"] = next((count for count, asm in _MAX_VMCNT_PROBES if results[asm]), 0)
 
     # TODO- Need to query the max cap, just like vmcnt as well?
     rv["MaxLgkmcnt"] = 15
@@ -145,6 +232,33 @@ def initAsmCaps(isaVersion, assemblerPath, isDebug) -> dict:
     return rv
 
 
+########################################
+# Get Caps
+########################################
+
+
+@lru_cache()
+def initAsmCaps(isaVersion, assemblerPath, isDebug) -> dict:
+    """Determine assembler capabilities by testing short instructions sequences.
+
+    Results are persisted per assembler and ISA (see _asmCapsCachePath) so that only
+    the first process using an assembler pays for the probes. Results of an ISA the
+    assembler did not accept are not persisted: the failure may as well be transient
+    (killed process, full disk, broken environment) and would otherwise drop the ISA
+    from every later build.
+    """
+    cacheFile = None if isDebug else _asmCapsCacheFile(isaVersion, assemblerPath)
+    if cacheFile is not None:
+        rv = _readAsmCapsCache(cacheFile)
+        if rv is not None:
+            return rv
+
+    rv = _probeAsmCaps(isaVersion, assemblerPath, isDebug)
+    if cacheFile is not None and rv["SupportedISA"]:
+        _writeAsmCapsCache(cacheFile, rv)
+    return rv
+
+
 @lru_cache()
 def initArchCaps(isaVersion) -> dict:
     rv = {}
@@ -125,6 +125,9 @@ globalParameters["ExitOnFails"] = (
 globalParameters["CpuThreads"] = (
     -1
 )  # How many CPU threads to use for kernel generation.  0=no threading, -1 == nproc, N=min(nproc,N).  TODO - 0 sometimes fails with a kernel name error?  0 does not check error codes correctly
+globalParameters["MaxInFlightKernels"] = (
+    0
+)  # Max kernels generated, written and assembled concurrently. 0=CpuThreads. Lower it to bound peak memory.
 globalParameters["NumWarmups"] = 0
 
 # even if error occurs in kernel generation (ie due to resource overflow),
@@ -1759,6 +1762,9 @@ def assignGlobalParameters(config, cxxCompiler=None):
         "OutputPath",
         "Experimental",
         "GenSolTable",
+        "LogicCachePath",
+        "KernelCachePath",
+        "KernelCacheMaxSize",
     ]
     for key in config:
         if key in ignoreKeys:
@@ -22,15 +22,21 @@
 #
 ################################################################################
 
+import atexit
 import concurrent.futures
+import hashlib
 import itertools
 import os
+import pickle
+import shutil
 import sys
+import tempfile
 import time
+from typing import NamedTuple
 
 from joblib import Parallel, delayed
 
-from .Utilities import tqdm
+from .Utilities import atomicWrite, tqdm
 
 
 def joblibParallelSupportsGenerator():
@@ -53,19 +59,83 @@ def CPUThreadCount(enable=True):
             cpu_count = len(os.sched_getaffinity(0))
         cpuThreads = globalParameters["CpuThreads"]
         if cpuThreads == -1:
-            return min(
-                cpu_count, 64
-            )  # Temporarily hack to fix oom issue, remove this after jenkin is fixed.
+            return cpu_count
         return min(cpu_count, cpuThreads)
 
 
-def pcallWithGlobalParamsMultiArg(f, args, newGlobalParameters):
-    OverwriteGlobalParameters(newGlobalParameters)
+class GlobalParametersSnapshot(NamedTuple):
+    """Reference to a read-only copy of globalParameters shared with worker processes.
+
+    Only this small record travels with each task; workers load the pickled parameters
+    from ``path`` once per ``stamp``.
+    """
+
+    stamp: str
+    path: str
+    pid: int
+
+
+# stamp of the snapshot last loaded by this (worker) process
+_loadedGlobalParametersStamp = None
+# private directory holding the snapshots written by this process, created on first use
+_snapshotDir = None
+_snapshotDirPid = None
+_snapshotStamps = set()
+
+
+def _removeSnapshotDir(path, pid):
+    # forked children inherit the exit handlers but must not remove the parent's directory
+    if os.getpid() == pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _getSnapshotDir() -> str:
+    global _snapshotDir, _snapshotDirPid
+
+    if _snapshotDirPid != os.getpid():
+        _snapshotDir = tempfile.mkdtemp(prefix="tensile-globals-")
+        _snapshotDirPid = os.getpid()
+        _snapshotStamps.clear()
+        atexit.register(_removeSnapshotDir, _snapshotDir, _snapshotDirPid)
+    return _snapshotDir
+
+
+def globalParametersSnapshot() -> GlobalParametersSnapshot:
+    """Writes the current globalParameters to a snapshot file unless an identical one exists.
+
+    Snapshots are written to a directory only accessible by the current user, which is
+    removed when the process exits.
+    """
+    from .GlobalParameters import globalParameters
+
+    data = pickle.dumps(dict(globalParameters), protocol=pickle.HIGHEST_PROTOCOL)
+    stamp = hashlib.sha1(data).hexdigest()
+    path = os.path.join(_getSnapshotDir(), f"{stamp}.pkl")
+    if stamp not in _snapshotStamps:
+        with atomicWrite(path, "wb") as f:
+            f.write(data)
+        _snapshotStamps.add(stamp)
+    return GlobalParametersSnapshot(stamp, path, os.getpid())
+
+
+def syncGlobalParameters(snapshot: GlobalParametersSnapshot):
+    """Loads a snapshot into globalParameters if this worker does not hold it yet."""
+    global _loadedGlobalParametersStamp
+
+    if snapshot.pid == os.getpid() or snapshot.stamp == _loadedGlobalParametersStamp:
+        return
+    with open(snapshot.path, "rb") as f:
+        OverwriteGlobalParameters(pickle.load(f))
+    _loadedGlobalParametersStamp = snapshot.stamp
+
+
+def pcallWithGlobalParamsMultiArg(f, args, snapshot):
+    syncGlobalParameters(snapshot)
     return f(*args)
 
 
-def pcallWithGlobalParamsSingleArg(f, arg, newGlobalParameters):
-    OverwriteGlobalParameters(newGlobalParameters)
+def pcallWithGlobalParamsSingleArg(f, arg, snapshot):
+    syncGlobalParameters(snapshot)
     return f(arg)
 
 
@@ -205,15 +275,17 @@ def ParallelMap2(
       enable: May be set to false to disable parallelism.
       multiArg: True if objects represent multiple arguments
                   (differentiates multi args vs single collection arg)
+      procs: Upper bound on the number of tasks in flight, defaults to CPUThreadCount().
+             Tasks are dispatched as earlier ones complete, bounding peak memory.
     """
     if return_as in ("generator", "generator_unordered") and not joblibParallelSupportsGenerator():
         return ParallelMapReturnAsGenerator(function, objects, message, enable, multiArg)
 
     from .GlobalParameters import globalParameters
 
-    threadCount = procs if procs else CPUThreadCount(enable)
-
     threadCount = CPUThreadCount(enable)
+    if procs:
+        threadCount = min(threadCount, procs)
 
     if threadCount <= 1 and globalParameters["ShowProgressBar"]:
         # Provide a progress bar for single-threaded operation.
@@ -231,19 +303,124 @@ def ParallelMap2(
     sys.stdout.flush()
     currentTime = time.time()
 
+    # with an explicit bound only dispatch a new task once a running one completes
+    preDispatch = "n_jobs" if procs else "2*n_jobs"
     pcall = pcallWithGlobalParamsMultiArg if multiArg else pcallWithGlobalParamsSingleArg
-    pargs = zip(objects, itertools.repeat(globalParameters))
+    # workers load the global parameters once per snapshot instead of receiving them per task
+    snapshot = globalParametersSnapshot()
 
     if joblibParallelSupportsGenerator():
-        rv = Parallel(n_jobs=threadCount, timeout=99999, return_as=return_as)(
-            delayed(pcall)(function, a, params) for a, params in pargs
-        )
+        rv = Parallel(
+            n_jobs=threadCount, timeout=99999, return_as=return_as, pre_dispatch=preDispatch
+        )(delayed(pcall)(function, a, snapshot) for a in objects)
     else:
-        rv = Parallel(n_jobs=threadCount, timeout=99999)(
-            delayed(pcall)(function, a, params) for a, params in pargs
+        rv = Parallel(n_jobs=threadCount, timeout=99999, pre_dispatch=preDispatch)(
+            delayed(pcall)(function, a, snapshot) for a in objects
         )
 
     totalTime = time.time() - currentTime
     print("{0}Done. ({1:.1f} secs elapsed)".format(message, totalTime))
     sys.stdout.flush()
     return rv
+
+
+def _runChunk(function, chunk, multiArg, snapshot):
+    """Runs a chunk of tasks, returns their results and the time spent on them."""
+    syncGlobalParameters(snapshot)
+    start = time.perf_counter()
+    results = [function(*args) if multiArg else function(args) for args in chunk]
+    return results, time.perf_counter() - start
+
+
+def scheduleByCost(costs, threadCount, chunksPerThread=4):
+    """Orders tasks largest-first and groups them into chunks of decreasing cost.
+
+    Each chunk is filled up to a share of the remaining cost (guided scheduling), so
+    expensive tasks run alone and early while the cheap tail is batched into chunks
+    that shrink towards the end, keeping all workers busy until the last task.
+
+    Args:
+        costs: Estimated cost of each task.
+        threadCount: Number of workers.
+        chunksPerThread: Controls the chunk granularity; higher values yield smaller chunks.
+
+    Returns:
+        A list of chunks, each a list of task indices.
+    """
+    order = sorted(range(len(costs)), key=lambda i: costs[i], reverse=True)
+    remaining = float(sum(costs))
+    # do not let chunks at the tail shrink below the cost of an average task
+    minChunkCost = remaining / len(costs) if costs else 0.0
+    chunks, chunk, chunkCost = [], [], 0.0
+    for i in order:
+        if not chunk:
+            target = max(remaining / (threadCount * chunksPerThread), minChunkCost)
+        chunk.append(i)
+        chunkCost += costs[i]
+        remaining -= costs[i]
+        if chunkCost >= target:
+            chunks.append(chunk)
+            chunk, chunkCost = [], 0.0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def ParallelMapByCost(
+    function, objects, cost, message="", enable=True, multiArg=True, procs=None
+):
+    """
+    Equivalent to ParallelMap2(function, objects) with cost based scheduling.
+
+    Tasks are run largest-first in adaptively sized chunks (see scheduleByCost) and
+    the results are returned in the order of objects. The achieved core utilization,
+    the time workers spent on tasks relative to the available worker time, is reported.
+
+      cost: Function estimating the relative cost of an object.
+      procs: Upper bound on the number of tasks in flight, see ParallelMap2.
+    """
+    from .GlobalParameters import globalParameters
+
+    objects = list(objects)
+    threadCount = CPUThreadCount(enable)
+    if procs:
+        threadCount = min(threadCount, procs)
+
+    if threadCount <= 1 and globalParameters["ShowProgressBar"]:
+        # Provide a progress bar for single-threaded operation.
+        return [function(*args) if multiArg else function(args) for args in tqdm(objects, message)]
+
+    chunks = scheduleByCost([cost(o) for o in objects], threadCount)
+
+    if message != "":
+        message += ": "
+    print(
+        "{0}Launching {1} threads for {2} tasks in {3} chunks...".format(
+            message, threadCount, len(objects), len(chunks)
+        )
+    )
+    sys.stdout.flush()
+    currentTime = time.time()
+
+    snapshot = globalParametersSnapshot()
+    chunkResults = Parallel(n_jobs=threadCount, timeout=99999, batch_size=1)(
+        delayed(_runChunk)(function, [objects[i] for i in chunk], multiArg, snapshot)
+        for chunk in chunks
+    )
+
+    rv = [None] * len(objects)
+    busyTime = 0.0
+    for chunk, (results, chunkTime) in zip(chunks, chunkResults):
+        busyTime += chunkTime
+        for i, result in zip(chunk, results):
+            rv[i] = result
+
+    totalTime = time.time() - currentTime
+    utilization = 100.0 * busyTime / (threadCount * totalTime) if totalTime > 0 else 100.0
+    print(
+        "{0}Done. ({1:.1f} secs elapsed, {2:.1f}% core utilization)".format(
+            message, totalTime, utilization
+        )
+    )
+    sys.stdout.flush()
+    return rv
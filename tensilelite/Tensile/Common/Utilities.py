@@ -1,9 +1,13 @@
 import functools
+import hashlib
 import math
 import os
 import re
 import sys
+import tempfile
 import time
+from collections.abc import Mapping
+from contextlib import contextmanager
 from enum import Enum
 from typing import List, Tuple
 
@@ -107,6 +111,32 @@ def ensurePath(path):
     return path
 
 
+def fileDigest(path, algorithm: str = "sha1") -> str:
+    """Returns the hex digest of the content of a file."""
+    h = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@contextmanager
+def atomicWrite(path, mode: str = "w"):
+    """Yields a temporary file in the directory of path that replaces path on success.
+
+    Readers never see a partially written file. If the block raises, the temporary
+    file is removed and path is left untouched.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
 def roundUp(f):
     return (int)(math.ceil(f))
 
@@ -240,6 +270,21 @@ def state(obj):
     return obj
 
 
+def canonicalState(obj) -> str:
+    """Returns a deterministic textual form of a (nested) solution state.
+
+    Mappings are ordered by key so that the result only depends on content, never
+    on insertion order. Leaf values rely on ``repr`` which is stable for every type
+    stored in a solution state (builtins, DataType, ActivationType).
+    """
+    if isinstance(obj, Mapping):
+        items = sorted((str(k), canonicalState(v)) for k, v in obj.items())
+        return "{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+    if isinstance(obj, (list, tuple)):
+        return "[" + ",".join(canonicalState(v) for v in obj) + "]"
+    return repr(obj)
+
+
 def state_key_ordering(cls):
     def tup(obj):
         return tuple([getattr(obj, k) for k in cls.StateKeys])
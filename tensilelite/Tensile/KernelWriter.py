@@ -2895,18 +2895,14 @@ class KernelWriter(metaclass=abc.ABCMeta):
     moduleKernelBody.addBody(module)
     self.checkResources(kernel, moduleKernelBody) # check resource available or not
 
-    # Tensile instruction pass, temporarily disable due to build time.
-    # Kernels with epilog especially with activation is too long (50000~ lines).
-    # Need to refactor global write elements.
+    # Tensile instruction pass
     tipo = TensileInstructionsPassOptions()
-    if kernel["ProblemType"]["ActivationType"] == "all":
-      tipo.removeDupAssign = False
     TensileInstructionsPass(moduleKernelBody, tipo)
 
     error = self.states.overflowedResources
     print2(f"  found error code {error} with overflowed resources set to {self.states.overflowedResources}")
 
-    return (error, str(moduleKernelBody))
+    return (error, moduleKernelBody)
 
   ##############################################################################
   # Init Kernel
@@ -5021,25 +5017,34 @@ class KernelWriter(metaclass=abc.ABCMeta):
 
     return code
 
-  def _getKernelSource(self, kernel: Solution):
+  def _getKernelBody(self, kernel: Solution) -> KernelBody:
     """
-    Returns the source of the kernel, either C++ or assembly.
+    Returns the kernel body of the kernel.
     """
-
-    fileString = ""
     tensorParametersA = {}
     tensorParametersB = {}
     self.initKernel(kernel, tensorParametersA, tensorParametersB)
     self.stringIdx = 0
     (error, kb) = self.kernelBody(kernel, tensorParametersA, tensorParametersB)
-    fileString += str(kb)
 
     if error != 0:
       if globalParameters["ForceGenerateKernel"]:
         printWarning("Generating kernel source resulted in error {}, but ForceGenerateKernel=1 so saving source".format(error))
       else:
         raise RuntimeError("Generating kernel source resulted in error {}".format(error))
-    return fileString
+    return kb
+
+  def _getKernelSource(self, kernel: Solution):
+    """
+    Returns the source of the kernel, either C++ or assembly.
+    """
+    return str(self._getKernelBody(kernel))
+
+  def _writeKernelSource(self, kernel: Solution, writer):
+    """
+    Writes the source of the kernel to writer without building it as a string.
+    """
+    self._getKernelBody(kernel).emit(writer)
 
 
   ##############################################################################
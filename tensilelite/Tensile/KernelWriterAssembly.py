@@ -101,6 +101,26 @@ class KernelWriterAssembly(KernelWriter):
       errcode = -2
     return (errcode, code)
 
+  def writeSourceFile(self, kernel, path) -> int:
+    """
+    Writes the assembly source of the kernel to path, streaming it from the kernel body
+    instead of building the source string. Returns the same error code as
+    getSourceFileString; no file is left behind on errors.
+    """
+    assert kernel["KernelLanguage"] == "Assembly" and not kernel.duplicate
+    self.language = "ASM"
+    try:
+      with open(path, "w", encoding="utf-8") as f:
+        if isCustomKernelConfig(kernel):
+          f.write(self._getCustomKernelSource(kernel, CUSTOM_KERNEL_PATH))
+        else:
+          self._writeKernelSource(kernel, f)
+      return 0
+    except RuntimeError as e:
+      printWarning(f"Failed to generate assembly source code for {kernel}: {e}")
+      os.remove(path)
+      return -2
+
   def getSgprOccupancy(self, sgprs):
     return self.states.regCaps["PhysicalMaxSgpr"]//sgprs
 
@@ -4174,11 +4194,11 @@ class KernelWriterAssembly(KernelWriter):
                "StaggerUIter", "GlobalReadIncsA", "GlobalReadIncsB"]
     lastRegTag = None
     for i in range(0, self.sgprPool.size()):
-      regTag = self.sgprPool.pool[i].tag
+      regTag = self.sgprPool.getTag(i)
       if regTag != lastRegTag:
         lastRegTag = regTag
         if (lastRegTag not in self.states.nonPostLoopSgpr) and \
-           (self.sgprPool.pool[i].status == RegisterPool.Status.InUse) and \
+           (self.sgprPool.getStatus(i) == RegisterPool.Status.InUse) and \
            (lastRegTag in tagList):
           imod.add(self.undefineSgpr(regTag))
 
@@ -5226,10 +5246,10 @@ class KernelWriterAssembly(KernelWriter):
     lastRegTag=None
 
     for i in range(0, self.sgprPool.size()):
-      regTag = self.sgprPool.pool[i].tag
+      regTag = self.sgprPool.getTag(i)
       if regTag != lastRegTag:
         lastRegTag = regTag
-        if (lastRegTag not in self.states.nonPostLoopSgpr) and (self.sgprPool.pool[i].status == RegisterPool.Status.InUse):
+        if (lastRegTag not in self.states.nonPostLoopSgpr) and (self.sgprPool.getStatus(i) == RegisterPool.Status.InUse):
           if label == "Summation_End_OptNLL":
             self.undefineSgpr(regTag)
           else:
@@ -6297,8 +6317,7 @@ class KernelWriterAssembly(KernelWriter):
       oldSize = self.savedVgprPool.size()
       newSize = self.vgprPool.size()
       if newSize > self.savedVgprPool.size():
-        for i in range(oldSize,newSize):
-          self.savedVgprPool.pool.append(self.savedVgprPool.Register(RegisterPool.Status.Available,"restore vgprPool"))
+        self.savedVgprPool.appendAvailable(newSize-oldSize, "restore vgprPool")
       self.vgprPool = self.savedVgprPool # restore vgprPool before alternate path
       self.savedVgprPool = None
     # swap back sgpr pool if any
@@ -6308,8 +6327,7 @@ class KernelWriterAssembly(KernelWriter):
       oldSize = self.savedSgprPool.size()
       newSize = self.sgprPool.size()
       if newSize > self.savedSgprPool.size():
-        for i in range(oldSize-1,newSize):
-          self.savedSgprPool.pool.append(self.savedSgprPool.Register(RegisterPool.Status.Available,"restore sgprPool"))
+        self.savedSgprPool.appendAvailable(newSize-oldSize+1, "restore sgprPool")
       self.sgprPool = self.savedSgprPool # restore vgprPool before alternate path
       self.savedSgprPool = None
     return module
@@ -10603,9 +10621,9 @@ class KernelWriterAssembly(KernelWriter):
         tmpSgpr = tmpSgprRes.idx
         actTempSgpr = tmpSgpr # Get sgpr start address, should always be the same
         elementSgprs = tmpSgpr + ss.cfg.numTempSgprPerBatch
-        codeAccVgprRead = deepcopy(self.codes.accVgprRead) if self.states.serializedStore else None
+        codeAccVgprRead = fastdeepcopy(self.codes.accVgprRead) if self.states.serializedStore else None
         mulAlpha = self.codes.mulAlphaMultipleBuffer if (kernel["_GlobalAccumulation"] == 'MultipleBuffer' or kernel["_GlobalAccumulation"] == 'MultipleBufferSingleKernel') else self.codes.mulAlphaOther
-        codeMulAlpha = deepcopy(mulAlpha) if self.states.serializedStore else None
+        codeMulAlpha = fastdeepcopy(mulAlpha) if self.states.serializedStore else None
 
         self.alphaBeforeLoadC = False
         if kernel["MIArchVgpr"] and applyAlpha and not kernel["_GlobalAccumulation"] == 'MultipleBufferSingleKernel':
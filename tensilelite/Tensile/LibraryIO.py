@@ -26,11 +26,18 @@ from .CustomKernels import getCustomKernelConfig
 from .SolutionStructs import Solution, ProblemSizes, ProblemType
 from . import SolutionLibrary
 from .CustomYamlLoader import load_yaml_stream
-from .Common import gfxToIsa, printExit, printWarning, print2, versionIsCompatible, __version__
+from .Common import gfxToIsa, printExit, printWarning, print2, versionIsCompatible, __version__, \
+    state, ParallelMap, atomicWrite, fileDigest
 
 from typing import NamedTuple, List
+import csv
+import hashlib
+import multiprocessing
 import os
 import sys
+import warnings
+
+import numpy as np
 
 
 try:
@@ -105,11 +112,197 @@ def writeMsgPack(filename, data):
     with open(filename, "wb") as f:
         msgpack.pack(data, f)
 
+class _MsgPackStateWriter:
+    def __init__(self, f):
+        self.f = f
+        self.packer = msgpack.Packer()
+
+    def beginMap(self, n):
+        self.f.write(self.packer.pack_map_header(n))
+
+    def key(self, k):
+        self.f.write(self.packer.pack(k))
+
+    def endMap(self):
+        pass
+
+    def beginArray(self, n):
+        self.f.write(self.packer.pack_array_header(n))
+
+    def endArray(self):
+        pass
+
+    def value(self, v):
+        self.f.write(self.packer.pack(v))
+
+
+class _JsonStateWriter:
+    """Writes the same text as writeJson, one element at a time."""
+    def __init__(self, f):
+        self.f = f
+        self.stack = [] # [isMap, isEmpty, isFirst] per open container
+
+    def _dumps(self, v):
+        if 'orjson' in sys.modules:
+            return json.dumps(v, option=json.OPT_INDENT_2).decode("utf-8")
+        return json.dumps(v, indent=2)
+
+    def _item(self):
+        if self.stack and not self.stack[-1][0]:
+            self._newline()
+
+    def _newline(self):
+        top = self.stack[-1]
+        self.f.write("\n" if top[2] else ",\n")
+        self.f.write("  " * len(self.stack))
+        top[2] = False
+
+    def _begin(self, isMap, n):
+        self._item()
+        self.f.write("{" if isMap else "[")
+        if n == 0:
+            self.f.write("}" if isMap else "]")
+        self.stack.append([isMap, n == 0, True])
+
+    def _end(self):
+        isMap, isEmpty, _ = self.stack.pop()
+        if not isEmpty:
+            self.f.write("\n" + "  " * len(self.stack) + ("}" if isMap else "]"))
+
+    def beginMap(self, n):
+        self._begin(True, n)
+
+    def key(self, k):
+        if not isinstance(k, str):
+            # apply the key conversion of the json backend
+            k = next(iter(json.loads(json.dumps({k: None}))))
+        self._newline()
+        self.f.write(self._dumps(k) + ": ")
+
+    def endMap(self):
+        self._end()
+
+    def beginArray(self, n):
+        self._begin(False, n)
+
+    def endArray(self):
+        self._end()
+
+    def value(self, v):
+        self._item()
+        self.f.write(self._dumps(v).replace("\n", "\n" + "  " * len(self.stack)))
+
+
+# Depth below which the state is converted and written one subtree at a time, e.g. one
+# solution or one sub-library of a problem map.
+_STATE_STREAM_DEPTH = 3
+
+def _writeStateItems(obj, writer, depth=0):
+    """Passes the state of obj to writer, see Common.state."""
+    if hasattr(obj, "shallowState"):
+        _writeStateItems(obj.shallowState(), writer, depth)
+    elif hasattr(obj, "state") or depth >= _STATE_STREAM_DEPTH:
+        writer.value(state(obj))
+    elif hasattr(obj.__class__, "StateKeys"):
+        keys = obj.__class__.StateKeys
+        writer.beginMap(len(keys))
+        for key in keys:
+            attr = key
+            if isinstance(key, tuple):
+                (key, attr) = key
+            writer.key(key)
+            _writeStateItems(getattr(obj, attr), writer, depth + 1)
+        writer.endMap()
+    elif isinstance(obj, dict):
+        writer.beginMap(len(obj))
+        for k, v in obj.items():
+            writer.key(k)
+            _writeStateItems(v, writer, depth + 1)
+        writer.endMap()
+    elif isinstance(obj, (str, int, float)):
+        writer.value(obj)
+    else:
+        try:
+            items = list(obj)
+        except TypeError:
+            writer.value(obj)
+            return
+        writer.beginArray(len(items))
+        for item in items:
+            _writeStateItems(item, writer, depth + 1)
+        writer.endArray()
+
+
+def writeState(filename_noExt, obj, format="yaml"):
+    """Writes the state of obj, equivalent to write(filename_noExt, state(obj), format).
+
+    The msgpack and json writers stream the state instead of building it in memory first.
+    """
+    if format == "msgpack":
+        with open(filename_noExt + ".dat", "wb") as f:
+            _writeStateItems(obj, _MsgPackStateWriter(f))
+    elif format == "json" and json.__name__ in ("orjson", "json"):
+        with open(filename_noExt + ".json", "w") as f:
+            _writeStateItems(obj, _JsonStateWriter(f))
+    else:
+        write(filename_noExt, state(obj), format)
+
+
+_pendingStates = []
+
+def _writePendingState(job):
+    filename_noExt, obj, format = _pendingStates[job] if isinstance(job, int) else job
+    writeState(filename_noExt, obj, format)
+
+
+def writeStates(jobs, format="yaml"):
+    """Writes the state of each (filename_noExt, obj) of jobs in parallel, see writeState."""
+    global _pendingStates
+    jobs = [(filename_noExt, obj, format) for filename_noExt, obj in jobs]
+    if multiprocessing.get_start_method() == "fork":
+        # forked workers inherit the objects, only pass their index
+        _pendingStates = jobs
+        jobs = range(len(jobs))
+    try:
+        ParallelMap(_writePendingState, jobs, "Writing library files")
+    finally:
+        _pendingStates = []
+
+
+def _stampDerivedParameters(solutionState, digests):
+    """Records the fingerprint of the derived parameters of a serialized solution state.
+
+    digests memoizes Solution.getDerivationDigest per ISA.
+    """
+    if not solutionState.get("AssignedDerivedParameters", False):
+        return
+    isa = tuple(solutionState["ISA"])
+    if isa not in digests:
+        digests[isa] = Solution.getDerivationDigest(isa)
+    fingerprint = Solution.getDerivedParametersFingerprint(solutionState, digests[isa])
+    if fingerprint is not None:
+        solutionState[Solution.DerivedFingerprintKey] = fingerprint
+
+def _verifyDerivedParameters(solutionState, digests):
+    """Keeps the derived parameters of a serialized solution state only if its stored fingerprint
+    matches, otherwise they are derived again when the Solution is created.
+    """
+    fingerprint = solutionState.get(Solution.DerivedFingerprintKey, None)
+    if fingerprint is not None and solutionState.get("AssignedDerivedParameters", False):
+        isa = tuple(solutionState["ISA"])
+        if isa not in digests:
+            digests[isa] = Solution.getDerivationDigest(isa)
+        if fingerprint == Solution.getDerivedParametersFingerprint(solutionState, digests[isa]):
+            return
+    solutionState["AssignedProblemIndependentDerivedParameters"] = False
+    solutionState["AssignedDerivedParameters"] = False
+
 def writeSolutions(filename, problemSizes, biasTypeArgs, activationArgs, solutions, cache=False):
     """Writes solution YAML file."""
 
     # convert objects to nested dictionaries
     solutionStates = []
+    digests = {}
 
     if cache:
         solYaml = read(filename)
@@ -148,6 +341,7 @@ def writeSolutions(filename, problemSizes, biasTypeArgs, activationArgs, solutio
             if "DataTypeMetadata" in solutionState["ProblemType"]:
                 solutionState["ProblemType"]["DataTypeMetadata"] = \
                     solutionState["ProblemType"]["DataTypeMetadata"].value
+            _stampDerivedParameters(solutionState, digests)
             solutionStates.append(solutionState)
     # write dictionaries
     with open(filename, "w") as f:
@@ -192,6 +386,88 @@ def readJson(filename):
         data = json.loads(f.read())
     return data
 
+def readCSV(filename, selectColumns, stringColumns=()):
+    """Reads a benchmark result CSV file column-wise.
+
+    selectColumns maps the header row to the indices of the numeric columns to load; these
+    are returned as a float64 array with one row per data row. The cells of stringColumns
+    are returned as lists of stripped strings. Returns (header, data, strings).
+    """
+    with open(filename, "r", newline="") as f:
+        header = next(csv.reader([f.readline()]), [])
+        columns = selectColumns(header)
+        f.seek(0)
+        with warnings.catch_warnings():
+            # a file without data rows is not an error
+            warnings.simplefilter("ignore", UserWarning)
+            data = np.loadtxt(f, delimiter=",", quotechar='"', skiprows=1, usecols=columns,
+                              ndmin=2, dtype=np.float64, comments=None)
+        strings = [[] for _ in stringColumns]
+        if stringColumns:
+            f.seek(0)
+            rows = csv.reader(f)
+            next(rows, None)
+            for row in rows:
+                if row:
+                    for cells, column in zip(strings, stringColumns):
+                        cells.append(row[column].strip())
+    return header, data, strings
+
+# Bump when the layout of logic cache files changes.
+LOGIC_CACHE_VERSION = 1
+
+def _logicCacheFile(filename, cachePath):
+    key = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()
+    return os.path.join(cachePath, key + ".dat")
+
+def _writeLogicCache(cacheFile, header, data):
+    try:
+        os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+        with atomicWrite(cacheFile, "wb") as f:
+            msgpack.pack(header, f)
+            msgpack.pack(data, f)
+    except (OSError, TypeError, ValueError):
+        # the cache is optional, data msgpack cannot encode is simply not cached
+        pass
+
+def readLogic(filename, cachePath=None):
+    """Reads a library logic file, using a pre-parsed Message Pack sidecar when possible.
+
+    The sidecar lives in cachePath and stores a header (cache version, source mtime,
+    size and sha256) followed by the parsed data. The header is checked first: matching
+    mtime and size return the cached data directly; otherwise the content hash decides
+    whether the sidecar is still valid. Any stale or unreadable sidecar is rebuilt.
+    """
+    if not cachePath or "msgpack" not in sys.modules:
+        return read(filename, True)
+
+    stat = os.stat(filename)
+    cacheFile = _logicCacheFile(filename, cachePath)
+    header = {"Version": LOGIC_CACHE_VERSION, "MTime": stat.st_mtime_ns, "Size": stat.st_size}
+
+    try:
+        with open(cacheFile, "rb") as f:
+            unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False, max_buffer_size=0)
+            cached = next(unpacker)
+            if isinstance(cached, dict) and cached.get("Version") == LOGIC_CACHE_VERSION \
+                    and cached["Size"] == stat.st_size:
+                if cached["MTime"] == stat.st_mtime_ns:
+                    return next(unpacker)
+                header["Digest"] = fileDigest(filename, "sha256")
+                if cached["Digest"] == header["Digest"]:
+                    data = next(unpacker)
+                    _writeLogicCache(cacheFile, header, data)
+                    return data
+    except (OSError, KeyError, StopIteration, ValueError, msgpack.UnpackException):
+        # a missing, corrupt or outdated sidecar is simply rebuilt below
+        pass
+
+    if "Digest" not in header:
+        header["Digest"] = fileDigest(filename, "sha256")
+    data = read(filename, True)
+    _writeLogicCache(cacheFile, header, data)
+    return data
+
 def parseSolutionsFile(filename, cxxCompiler):
     """Wrapper function to read and parse a solutions file."""
     return parseSolutionsData(read(filename), filename, cxxCompiler)
@@ -219,11 +495,12 @@ def parseSolutionsData(data, srcFile, cxxCompiler):
         solutionStartIdxInData += 1
 
     solutions = []
+    digests = {}
     for i in range(solutionStartIdxInData, len(data)):
         solutionState = data[i]
-        # force redo the deriving of parameters, make sure old version logic yamls can be validated
-        solutionState["AssignedProblemIndependentDerivedParameters"] = False
-        solutionState["AssignedDerivedParameters"] = False
+        # force redo the deriving of parameters unless they are verified by their fingerprint,
+        # make sure old version logic yamls can be validated
+        _verifyDerivedParameters(solutionState, digests)
         solutionObject = Solution(solutionState, cxxCompiler, srcFile)
         solutions.append(solutionObject)
     problemType = solutions[0]["ProblemType"]
@@ -240,9 +517,12 @@ class LibraryLogic(NamedTuple):
     exactLogic: list
     library: SolutionLibrary.MasterSolutionLibrary
 
-def parseLibraryLogicFile(filename, cxxCompiler, archs=None):
-    """Wrapper function to read and parse a library logic file."""
-    return parseLibraryLogicData(read(filename, True), filename, cxxCompiler, archs)
+def parseLibraryLogicFile(filename, cxxCompiler, archs=None, cachePath=None):
+    """Wrapper function to read and parse a library logic file.
+
+    If cachePath is set, pre-parsed logic data is read from and written to that directory.
+    """
+    return parseLibraryLogicData(readLogic(filename, cachePath), filename, cxxCompiler, archs)
 
 
 def parseLibraryLogicData(data, srcFile, cxxCompiler, archs=None):
@@ -271,15 +551,13 @@ def parseLibraryLogicData(data, srcFile, cxxCompiler, archs=None):
     problemType = ProblemType(data["ProblemType"])
 
     # unpack solution
+    digests = {}
     def solutionStateToSolution(solutionState, cxxCompiler) -> Solution:
         if solutionState["KernelLanguage"] == "Assembly":
             solutionState["ISA"] = gfxToIsa(data["ArchitectureName"])
         else:
             solutionState["ISA"] = (0, 0, 0)
         solutionState["CUCount"] = data["CUCount"]
-        # force redo the deriving of parameters, make sure old version logic yamls can be validated
-        solutionState["AssignedProblemIndependentDerivedParameters"] = False
-        solutionState["AssignedDerivedParameters"] = False
         if solutionState["CustomKernelName"]:
             isp = {}
             if "InternalSupportParams" in solutionState:
@@ -290,6 +568,9 @@ def parseLibraryLogicData(data, srcFile, cxxCompiler, archs=None):
             # The ActivationType setting in YAML is meaningless in customKernel case.
             # Therefore, we override the customKernel setting with the ActivationType value from ProblemType to avoid false alarms during subsequent problemType checks.
             solutionState["ProblemType"]["ActivationType"] = problemType["ActivationType"]
+        # force redo the deriving of parameters unless they are verified by their fingerprint,
+        # make sure old version logic yamls can be validated
+        _verifyDerivedParameters(solutionState, digests)
         solutionObject = Solution(solutionState, cxxCompiler, srcFile)
         solutionProblemType = solutionObject["ProblemType"]
         if problemType != solutionProblemType:
@@ -436,6 +717,7 @@ def createLibraryLogic(schedulePrefix, architectureName, deviceNames, libraryTyp
     data.append(problemTypeState)
     # solutions
     solutionList = []
+    digests = {}
     for solution in solutions:
         solutionState = solution.getAttributes()
         solutionState["ProblemType"] = solutionState["ProblemType"].state
@@ -464,6 +746,7 @@ def createLibraryLogic(schedulePrefix, architectureName, deviceNames, libraryTyp
         if "DataTypeMetadata" in solutionState["ProblemType"]:
             solutionState["ProblemType"]["DataTypeMetadata"] = \
                     solutionState["ProblemType"]["DataTypeMetadata"].value
+        _stampDerivedParameters(solutionState, digests)
         solutionList.append(solutionState)
 
     if tileSelection:
@@ -496,6 +779,7 @@ def createLibraryLogic(schedulePrefix, architectureName, deviceNames, libraryTyp
             if "DataTypeMetadata" in solutionState["ProblemType"]:
                 solutionState["ProblemType"]["DataTypeMetadata"] = \
                     solutionState["ProblemType"]["DataTypeMetadata"].value
+            _stampDerivedParameters(solutionState, digests)
             solutionList.append(solutionState)
 
     data.append(solutionList)
@@ -33,12 +33,12 @@ from . import SolutionSelectionLibrary
 from copy import deepcopy
 from sys import stdout
 
-import array
-import csv
 import os
 import time
 import math
 
+import numpy as np
+
 ################################################################################
 # Analyze Problem Type
 ################################################################################
@@ -118,7 +118,7 @@ def analyzeProblemType(problemType, problemSizeGroups, inputParameters, libraryL
     for row in range(0, numOther):
       for col in range(0, numCols):
         for sol in range(0, logicAnalyzer.numSolutions):
-         line += "% 5.0f" % logicAnalyzer.data[sol + logicAnalyzer.numSolutions*(col + row*numCols)]
+         line += "% 5.0f" % logicAnalyzer.data[col + row*numCols, sol]
         line += "; "
       line += "\n"
     print(line)
@@ -290,14 +290,10 @@ class LogicAnalyzer:
         self.solutionGroupMap[solutionGroupIdx][solutionIdx] = sIdx
         progressBar.increment()
     self.numSolutions = len(self.solutions)
-    self.solutionMinNaming = Solution.getMinNaming(self.solutions)
-    self.solutionNames = []
-    self.solutionTiles = []
-    for solution in self.solutions:
-      self.solutionNames.append(Solution.getNameMin(solution, \
-          self.solutionMinNaming))
-      self.solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
-          solution["MacroTile1"]))
+    # (solutionMinNaming, solutionNames, solutionTiles), named on first use
+    self.solutionNaming = None
+    # winners of the problems kept up to date while removing solutions
+    self.problemWinners = None
     self.flopsPerMac = self.problemType["DataType"].flopsPerMac()
 
     # merge problem sizes from size groups
@@ -351,7 +347,9 @@ class LogicAnalyzer:
     print2("TotalSize: %u" % self.totalSize)
     # data is a 2D array [problemIdx][solutionIdx] which stores perf data in gflops for
     # the specified solution
-    self.data = array.array('f', [-2]*self.totalSize)
+    self.data = np.full((self.totalProblems, self.numSolutions), -2, dtype=np.float32)
+    # columns of the remaining solutions, applied to data on its next use
+    self.dataColumns = None
 
     # Each entry in exactWinners is a 2D array [solutionIdx, perf]
     self.exactWinners = {}
@@ -392,6 +390,9 @@ class LogicAnalyzer:
       self.globalIndexRange.append([0, self.numProblemSizes[i]])
     self.problemIndicesForGlobalRange \
         = self.problemIndicesForRange(self.globalIndexRange)
+    # flops of each problem, i.e. of each row of data
+    self.problemFlops = np.array([self.totalFlopsForProblemIndices(problemIndices) \
+        for problemIndices in self.problemIndicesForGlobalRange], dtype=np.float64)
     self.tab = [""]*self.numIndices
 
     ######################################
@@ -415,13 +416,8 @@ class LogicAnalyzer:
 
     # open file
     print("reading datafile", dataFileName)
-    try:
-      dataFile = open(dataFileName, "r")
-    except IOError:
-      printExit("Can't open \"%s\" to get data" % dataFileName )
 
     # column indices
-    csvFile = csv.reader(dataFile)
     problemSizeStartIdx = 1
     # notice that for OperationType != GEMM, the numIndices = 0
     totalSizeIdx = problemSizeStartIdx + self.numIndices
@@ -430,138 +426,157 @@ class LogicAnalyzer:
     csvHasWinner = "_CSVWinner" in dataFileName
     csvHasWinnerColumn = True
 
-    # iterate over rows
-    rowIdx = 0
-    deviceMaxFreq = None
-    for row in csvFile:
-      rowIdx+=1
-      if rowIdx == 1:
-        # get unit (gflops or gflops/cu) of benchmark data
-        perfUnit = row[0]
-        if perfUnit == "GFlops":
-          self.perfMetric = "DeviceEfficiency"
-        elif perfUnit == "GFlopsPerCU":
-          self.perfMetric = "CUEfficiency"
-        else:
-          printWarning("Performance unit %s in %s is unrecognized: assuming GFlops (device efficiency)" % (perfUnit, dataFileName))
-          self.perfMetric = "DeviceEfficiency"
-
-        if csvHasWinner:
-          try:
-            # These two columns only appear when using WinnerCSV
-            columnOfWinnerGFlops = row.index(" WinnerGFlops")
-            columnOfWinnerIdx = row.index(" WinnerIdx")
-          except ValueError as e:
-            csvHasWinnerColumn = False
-            print1(f"Error: Could not find WinnerGFlops or WinnerIdx column in CSV file: {e}")
-
-        # get the length of each row, and derive the first column of the solution instead of using wrong "solutionStartIdx = totalSizeIdx + 1"
-        rowLength = len(row)
-        solutionStartIdx = rowLength - numSolutions
-        continue
+    # columns to load: problem size, winner gflops and index (WinnerCSV only), solution gflops
+    def selectColumns(row):
+      nonlocal csvHasWinnerColumn
+      if len(row) == 0:
+        return []
+      # get unit (gflops or gflops/cu) of benchmark data
+      perfUnit = row[0]
+      if perfUnit == "GFlops":
+        self.perfMetric = "DeviceEfficiency"
+      elif perfUnit == "GFlopsPerCU":
+        self.perfMetric = "CUEfficiency"
       else:
-        #if len(row) < rowLength:
-        #  printWarning("CSV File %s row %u doesn't have %u elements; ignoring remainer of file." \
-        #      % (dataFileName, rowIdx, rowLength) )
-        #  break
-
-        # get problem size
-        problemSize = []
-        for i in range(problemSizeStartIdx, totalSizeIdx):
-          problemSize.append(int(row[i]))
-        problemSize = tuple(problemSize)
-        # Exact Problem Size
-        if problemSize in self.exactProblemSizes:
-
-          if csvHasWinner and csvHasWinnerColumn:
-            # Faster. Get the winner info from csv directly, avoid an extra loop
-            winnerGFlops = float(row[columnOfWinnerGFlops])
-            winnerIdx = int(row[columnOfWinnerIdx])
-          else:
-            # Old code. TODO - Can we get rid of this in the future?
-            # solution gflops
-            solutionIdx = 0
-            winnerIdx = -1
-            winnerGFlops = -1
-            for i in range(solutionStartIdx, rowLength):
-              gflops = float(row[i])
-              if gflops > winnerGFlops:
-                winnerIdx = solutionIdx
-                winnerGFlops = gflops
-              solutionIdx += 1
-
-          if globalParameters["UseEffLike"]:
-            if not deviceMaxFreq:
-              deviceMaxFreq = read_max_freq()
-
-            # calculate effLike
-            # effLike = winnerGFlops / Frequency(MHz)
-            try:
-              if not deviceMaxFreq or deviceMaxFreq <= 0 or math.isnan(deviceMaxFreq):
-                performance_metric = round(float(winnerGFlops))
-                print("Error when retrieving device frequency, fall back to winnerGFlops.")
-              else:
-                performance_metric = round(float(winnerGFlops) / deviceMaxFreq, 2)
-            except:
-              print1("Error: Could not convert winnerGFlops to float.")
-              performance_metric = float('nan')
+        printWarning("Performance unit %s in %s is unrecognized: assuming GFlops (device efficiency)" % (perfUnit, dataFileName))
+        self.perfMetric = "DeviceEfficiency"
+
+      winnerColumns = []
+      if csvHasWinner:
+        try:
+          # These two columns only appear when using WinnerCSV
+          winnerColumns = [row.index(" WinnerGFlops"), row.index(" WinnerIdx")]
+        except ValueError as e:
+          csvHasWinnerColumn = False
+          print1(f"Error: Could not find WinnerGFlops or WinnerIdx column in CSV file: {e}")
+
+      # get the length of each row, and derive the first column of the solution instead of using wrong "solutionStartIdx = totalSizeIdx + 1"
+      rowLength = len(row)
+      solutionStartIdx = rowLength - numSolutions
+      return list(range(problemSizeStartIdx, totalSizeIdx)) + winnerColumns \
+          + list(range(solutionStartIdx, rowLength))
+
+    try:
+      _, data, _ = LibraryIO.readCSV(dataFileName, selectColumns)
+    except IOError:
+      printExit("Can't open \"%s\" to get data" % dataFileName )
+
+    useWinnerColumns = csvHasWinner and csvHasWinnerColumn
+    problemSizes = data[:, :self.numIndices].astype(np.int64)
+    solutionGFlops = data[:, self.numIndices + (2 if useWinnerColumns else 0):]
+    problemSizeTuples = list(map(tuple, problemSizes.tolist()))
+    isExact = np.array([problemSize in self.exactProblemSizes \
+        for problemSize in problemSizeTuples], dtype=bool)
+    isRange = np.array([problemSize in self.rangeProblemSizes \
+        for problemSize in problemSizeTuples], dtype=bool) & ~isExact
+
+    # rows are used up to the first unknown problem size
+    unknownRows = np.flatnonzero(~(isExact | isRange))
+    numRows = unknownRows[0] if len(unknownRows) > 0 else len(problemSizeTuples)
+
+    # Exact Problem Size
+    exactRows = np.flatnonzero(isExact[:numRows])
+    if useWinnerColumns:
+      # Faster. Get the winner info from csv directly, avoid an extra loop
+      exactWinnerGFlops = data[exactRows, self.numIndices]
+      exactWinnerIdx = data[exactRows, self.numIndices+1].astype(np.int64)
+    else:
+      # first solution with the most gflops, -1 if none
+      gflops = solutionGFlops[exactRows]
+      gflops[np.isnan(gflops)] = -np.inf
+      exactWinnerIdx = np.argmax(gflops, axis=1) if gflops.shape[1] > 0 \
+          else np.zeros(len(exactRows), dtype=np.intp)
+      exactWinnerGFlops = gflops[np.arange(len(exactRows)), exactWinnerIdx] if gflops.shape[1] > 0 \
+          else np.full(len(exactRows), -1.0)
+      hasExactWinner = exactWinnerGFlops > -1
+      exactWinnerIdx = np.where(hasExactWinner, exactWinnerIdx, -1)
+      exactWinnerGFlops = np.where(hasExactWinner, exactWinnerGFlops, -1)
+
+    deviceMaxFreq = None
+    for rowIdx, winnerIdx, winnerGFlops in zip(exactRows.tolist(), exactWinnerIdx.tolist(), exactWinnerGFlops.tolist()):
+      problemSize = problemSizeTuples[rowIdx]
+      if globalParameters["UseEffLike"]:
+        if not deviceMaxFreq:
+          deviceMaxFreq = read_max_freq()
+
+        # calculate effLike
+        # effLike = winnerGFlops / Frequency(MHz)
+        try:
+          if not deviceMaxFreq or deviceMaxFreq <= 0 or math.isnan(deviceMaxFreq):
+            performance_metric = round(float(winnerGFlops))
+            print("Error when retrieving device frequency, fall back to winnerGFlops.")
           else:
-            try:
-              performance_metric = float(winnerGFlops)
-            except:
-              print1("Error: Could not convert winnerGFlops to float.")
-              performance_metric = float('nan')
-
-          if winnerIdx != -1:
-            if problemSize in self.exactWinners:
-              if winnerGFlops > self.exactWinners[problemSize][1]:
-                #print "update exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize], "->", solutionMap[winnerIdx], winnerGFlops
-                self.exactWinners[problemSize] = [solutionMap[winnerIdx], performance_metric]
-            else:
-              self.exactWinners[problemSize] = [solutionMap[winnerIdx], performance_metric]
-              #print "new exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize]
-
-        # Range Problem Size
-        elif problemSize in self.rangeProblemSizes:
-          problemIndices = []
-          for i in range(0, self.numIndices):
-            problemIndices.append(self.problemSizeToIndex[i][problemSize[i]])
-          serialIdx = self.indicesToSerial(0, problemIndices)
-          # solution gflops
-          solutionIdx = 0
-          for i in range(solutionStartIdx, rowLength):
-            gflops = float(row[i])
-            self.data[serialIdx+solutionMap[solutionIdx]] = gflops
-            solutionIdx += 1
-
-        # Unknown Problem Size
+            performance_metric = round(float(winnerGFlops) / deviceMaxFreq, 2)
+        except:
+          print1("Error: Could not convert winnerGFlops to float.")
+          performance_metric = float('nan')
+      else:
+        try:
+          performance_metric = float(winnerGFlops)
+        except:
+          print1("Error: Could not convert winnerGFlops to float.")
+          performance_metric = float('nan')
+
+      if winnerIdx != -1:
+        if problemSize in self.exactWinners:
+          if winnerGFlops > self.exactWinners[problemSize][1]:
+            #print "update exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize], "->", solutionMap[winnerIdx], winnerGFlops
+            self.exactWinners[problemSize] = [solutionMap[winnerIdx], performance_metric]
         else:
-          printExit("Huh? %s has ProblemSize %s which isn't in its yaml" \
-              % ( dataFileName, list(problemSize)) )
-    #print self.data
+          self.exactWinners[problemSize] = [solutionMap[winnerIdx], performance_metric]
+          #print "new exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize]
+
+    # Unknown Problem Size
+    if len(unknownRows) > 0:
+      printExit("Huh? %s has ProblemSize %s which isn't in its yaml" \
+          % ( dataFileName, list(problemSizeTuples[numRows])) )
+
+    # Range Problem Size
+    rangeRows = np.flatnonzero(isRange)
+    if len(rangeRows) > 0:
+      problemIdx = np.zeros(len(rangeRows), dtype=np.intp)
+      stride = 1
+      for i in range(0, self.numIndices):
+        indexSizes = np.array(self.problemIndexToSize[i], dtype=np.int64)
+        rowSizes = problemSizes[rangeRows, i]
+        sizeIdx = np.searchsorted(indexSizes, rowSizes)
+        found = sizeIdx < len(indexSizes)
+        found[found] = indexSizes[sizeIdx[found]] == rowSizes[found]
+        if not found.all():
+          unknownRow = rangeRows[np.flatnonzero(~found)[0]]
+          printExit("Huh? %s has ProblemSize %s whose size %u for index %u isn't in its yaml" \
+              % ( dataFileName, list(problemSizeTuples[unknownRow]), problemSizes[unknownRow, i], i) )
+        problemIdx += sizeIdx * stride
+        stride *= self.numProblemSizes[i]
+      # the last row of a problem size and the last column of a solution listed twice win
+      lastRows = len(rangeRows) - 1 - np.unique(problemIdx[::-1], return_index=True)[1]
+      columns = {}
+      for solutionIdx in range(0, solutionGFlops.shape[1]):
+        columns[solutionMap[solutionIdx]] = solutionIdx
+      self.data[np.ix_(problemIdx[lastRows], list(columns.keys()))] \
+          = solutionGFlops[np.ix_(rangeRows[lastRows], list(columns.values()))]
 
 
   ##############################################################################
   # ENTRY: Remove Invalid Solutions
   ##############################################################################
   def removeInvalidSolutions(self):
-    #problemIndices = [0]*self.numIndices
-    allSolutionValid = False
-    while not allSolutionValid:
-      invalidIdx = -1
-      for problemIndices in self.problemIndicesForGlobalRange:
-        problemSerial = self.indicesToSerial(0, problemIndices)
-        for solutionIdx in range(0, self.numSolutions):
-          gflops = self.data[problemSerial+solutionIdx]
-          if gflops == 0:
-            invalidIdx = solutionIdx
-            break
-      if invalidIdx >= 0:
-        print1("# Removing Invalid Solution: %u %s" \
-            % (invalidIdx, self.solutionNames[invalidIdx]) )
-        self.removeSolution(invalidIdx)
-      else:
-        allSolutionValid = True
+    invalid = self.data == 0
+    # number of invalid solutions and columns of the remaining ones
+    invalidCount = invalid.sum(axis=1)
+    columns = np.arange(self.numSolutions)
+    solutionNames = None
+    while invalidCount.any():
+      # first invalid solution of the last problem that has one
+      invalidProblem = np.flatnonzero(invalidCount)[-1]
+      invalidIdx = int(np.argmax(invalid[invalidProblem, columns]))
+      invalidCount -= invalid[:, columns[invalidIdx]]
+      columns = np.delete(columns, invalidIdx)
+      if solutionNames is None:
+        solutionNames = list(self.solutionNames)
+      print1("# Removing Invalid Solution: %u %s" \
+          % (invalidIdx, solutionNames.pop(invalidIdx)) )
+      self.removeSolution(invalidIdx)
 
   ##############################################################################
   # ENTRY: Dereference ProblemType and Solutions
@@ -579,6 +594,8 @@ class LogicAnalyzer:
   def removeLeastImportantSolutions(self):
     # Remove least important solutions
     start = time.time()
+    self.problemWinners = ProblemWinners(self.data)
+    solutionNames = list(self.solutionNames)
     while len(self.solutions) > 1:
       lisTuple = self.leastImportantSolution()
       if lisTuple != None:
@@ -588,13 +605,14 @@ class LogicAnalyzer:
         lisPercTime = lisTuple[3]
         if lisPercSaved < self.parameters["SolutionImportanceMin"] or lisPercWins == 0:
           print1("# Removing Unimportant Solution %u/%u: %s ( %f%% wins, %f%% ms time, %f%% ms saved" \
-              % (lisIdx, self.numSolutions, self.solutionNames[lisIdx], 100*lisPercWins, 100*lisPercTime, 100*lisPercSaved) )
+              % (lisIdx, self.numSolutions, solutionNames.pop(lisIdx), 100*lisPercWins, 100*lisPercTime, 100*lisPercSaved) )
           self.removeSolution(lisIdx)
           continue
         else:
           break
       else: # no more lis, remainders are exact winner
         break
+    self.problemWinners = None
     stop = time.time()
     print("removeLeastImportantSolutions elapsed time = %.1f secs" % (stop - start))
 
@@ -605,32 +623,9 @@ class LogicAnalyzer:
   ##############################################################################
   def keepWinnerSolutions(self):
 
-    # solution indexes for the winners:
-    winners = set()
-
-    solutionImportance = []
-    for i in range(0, self.numSolutions):
-      solutionImportance.append([i, 0, 0, 0, False])
-    problemSizes = [0]*self.numIndices
     print("problemIndicesForGlobalRange", self.problemIndicesForGlobalRange)
-    for problemIndices in self.problemIndicesForGlobalRange:
-      for i in range(0, self.numIndices):
-        problemSizes[i] = self.problemIndexToSize[i][problemIndices[i]]
-      totalFlops = self.flopsPerMac
-      for size in problemSizes:
-        totalFlops *= size
-
-      problemSerial = self.indicesToSerial(0, problemIndices)
-      winnerIdx = -1
-      winnerGFlops = -1e6
-      for solutionIdx in range(0, self.numSolutions):
-        solutionSerialIdx = problemSerial + solutionIdx
-        solutionGFlops = self.data[solutionSerialIdx]
-        if solutionGFlops > winnerGFlops:
-          winnerIdx = solutionIdx
-          winnerGFlops = solutionGFlops
-
-      winners.add(winnerIdx)
+    # solution indexes for the winners:
+    winners = set(ProblemWinners(self.data).getWinners()[0].tolist())
 
     # Always keep the exact sizes:
     for exactProblem in self.exactWinners:
@@ -962,16 +957,15 @@ class LogicAnalyzer:
         sss[sIdx] += "%4u" % self.problemIndexToSize[0][i]
       for j in range(0, self.numProblemSizes[1]):
         problemIndices[self.idx1] = j
-        problemSerial = self.indicesToSerial(0, problemIndices)
+        problemGFlops = self.data[self.indicesToProblem(problemIndices)].tolist()
         for sIdx in range(0, self.numSolutions):
-          sss[sIdx] += ",%f" % self.data[problemSerial+sIdx]
+          sss[sIdx] += ",%f" % problemGFlops[sIdx]
         winnerIdx = 0
         secondIdx = 1
-        winnerGFlops = self.data[problemSerial+0]
+        winnerGFlops = problemGFlops[0]
         secondGFlops = 1e-9
         for solutionIdx in range(1, self.numSolutions):
-          solutionSerialIdx = problemSerial + solutionIdx
-          solutionGFlops = self.data[solutionSerialIdx]
+          solutionGFlops = problemGFlops[solutionIdx]
           if solutionGFlops > winnerGFlops:
             secondIdx = winnerIdx
             secondGFlops = winnerGFlops
@@ -1022,68 +1016,55 @@ class LogicAnalyzer:
   # Least Important Solution
   ##############################################################################
   def leastImportantSolution(self):
-    solutionImportance = []
-    for i in range(0, self.numSolutions):
-      solutionImportance.append([i, 0, 0, 0, False])
-    problemSizes = [0]*self.numIndices
-    totalSavedMs = 0
-    totalExecMs = 0
-    totalWins = 0
-    for problemIndices in self.problemIndicesForGlobalRange:
-      for i in range(0, self.numIndices):
-        problemSizes[i] = self.problemIndexToSize[i][problemIndices[i]]
-      totalFlops = self.flopsPerMac
-      for size in problemSizes:
-        totalFlops *= size
-
-      problemSerial = self.indicesToSerial(0, problemIndices)
-      winnerIdx = -1
-      winnerGFlops = -1e6
-      secondGFlops = -1e9
-      for solutionIdx in range(0, self.numSolutions):
-        solutionSerialIdx = problemSerial + solutionIdx
-        solutionGFlops = self.data[solutionSerialIdx]
-        if solutionGFlops > winnerGFlops:
-          secondGFlops = winnerGFlops
-          winnerIdx = solutionIdx
-          winnerGFlops = solutionGFlops
-        elif solutionGFlops > secondGFlops:
-          secondGFlops = solutionGFlops
-
-      winnerTimeMs = totalFlops / winnerGFlops / 1000000.0
-      secondTimeMs = totalFlops / secondGFlops / 1000000.0
-      if winnerGFlops > 0 and secondGFlops > 0:
-        solutionImportance[winnerIdx][1] += (secondTimeMs - winnerTimeMs)
-        totalSavedMs += secondTimeMs - winnerTimeMs
-      if winnerGFlops > 0:
-        solutionImportance[winnerIdx][2] += 1
-        solutionImportance[winnerIdx][3] += winnerTimeMs
-        totalExecMs += winnerTimeMs
-        totalWins += 1
-        if secondGFlops <= 0:
-          solutionImportance[winnerIdx][4] = True # this is only valid solution for this problem size, keep it
-
+    problemWinners = self.problemWinners
+    if problemWinners is None:
+      problemWinners = ProblemWinners(self.data)
+    winnerIdx, winnerGFlops, secondGFlops = problemWinners.getWinners()
+
+    # like scoreRangeForSolutions, solutions without positive gflops for a
+    # problem count as not benchmarked for it
+    with np.errstate(divide="ignore", over="ignore"):
+      winnerTimeMs = self.problemFlops / winnerGFlops / 1000000.0
+      secondTimeMs = self.problemFlops / secondGFlops / 1000000.0
+    hasWinner = winnerGFlops > 0
+    hasSecond = hasWinner & (secondGFlops > 0)
+    savedMs = secondTimeMs[hasSecond] - winnerTimeMs[hasSecond]
+    winnerTimeMs = winnerTimeMs[hasWinner]
+
+    # per solution [idx, saved ms, wins, exec ms, singular], accumulated in problem order
+    saved = np.zeros(self.numSolutions)
+    np.add.at(saved, winnerIdx[hasSecond], savedMs)
+    wins = np.bincount(winnerIdx[hasWinner], minlength=self.numSolutions)
+    execMs = np.zeros(self.numSolutions)
+    np.add.at(execMs, winnerIdx[hasWinner], winnerTimeMs)
+    singular = np.zeros(self.numSolutions, dtype=bool)
+    # this is only valid solution for this problem size, keep it
+    singular[winnerIdx[hasWinner & (secondGFlops <= 0)]] = True
+    solutionImportance = [list(importance) for importance in zip(range(0, self.numSolutions), \
+        saved.tolist(), wins.tolist(), execMs.tolist(), singular.tolist())]
+    totalSavedMs = self.sequentialSum(savedMs)
+    totalExecMs = self.sequentialSum(winnerTimeMs)
+    totalWins = len(winnerTimeMs)
 
     # print data before sorting
-    for i in range(0, self.numSolutions):
-      print2("[%2u] %s: %e saved, %u wins, %u time, %s" \
-          % (solutionImportance[i][0], \
-          self.solutionNames[solutionImportance[i][0]], \
-          solutionImportance[i][1], \
-          solutionImportance[i][2], \
-          solutionImportance[i][3], \
-          "singular" if solutionImportance[i][4] else "" ) )
+    if globalParameters["PrintLevel"] >= 2:
+      for i in range(0, self.numSolutions):
+        print2("[%2u] %s: %e saved, %u wins, %u time, %s" \
+            % (solutionImportance[i][0], \
+            self.solutionNames[solutionImportance[i][0]], \
+            solutionImportance[i][1], \
+            solutionImportance[i][2], \
+            solutionImportance[i][3], \
+            "singular" if solutionImportance[i][4] else "" ) )
 
     totalSavedMs = max(1, totalSavedMs)
     solutionImportance.sort(key=lambda x: x[1])
+    exactWinnerIndices = set(exactWinner[0] for exactWinner in self.exactWinners.values())
     for i in range(0, self.numSolutions):
       solutionIdx = solutionImportance[i][0]
       canRemove = not solutionImportance[i][4] # don't remove if is only win for any size
-      for exactProblem in self.exactWinners:
-        winnerIdx = self.exactWinners[exactProblem][0]
-        if solutionIdx == winnerIdx: # exact winners are important
-          canRemove = False
-          break
+      if solutionIdx in exactWinnerIndices: # exact winners are important
+        canRemove = False
       if canRemove:
         idx = solutionImportance[i][0]
         if totalSavedMs > 0:
@@ -1106,37 +1087,7 @@ class LogicAnalyzer:
   # Remove Solution
   ##############################################################################
   def removeSolution(self, removeSolutionIdx):
-
-    # temporarily move current to old
-    oldSolutions = deepcopy(self.solutions)
-    oldNumSolutions = self.numSolutions
-    oldData = deepcopy(self.data)
-
-    # update solutions
-    self.solutions = []
-    for i in range(0, oldNumSolutions):
-      if i != removeSolutionIdx:
-        self.solutions.append(oldSolutions[i])
-    self.solutionMinNaming = Solution.getMinNaming(self.solutions)
-    self.solutionNames = []
-    self.solutionTiles = []
-    for solution in self.solutions:
-      self.solutionNames.append(Solution.getNameMin(solution, \
-          self.solutionMinNaming))
-      self.solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
-          solution["MacroTile1"]))
-    self.numSolutions = len(self.solutions)
-
-    # update data
-    self.totalSize = self.totalProblems * self.numSolutions
-    self.data = array.array('f', [0]*self.totalSize)
-    for problemIndex in range(0, self.totalProblems):
-      newSolutionIdx = 0
-      for oldSolutionIdx in range(0, oldNumSolutions):
-        if oldSolutionIdx != removeSolutionIdx:
-          self.data[problemIndex*self.numSolutions+newSolutionIdx] \
-              = oldData[problemIndex*oldNumSolutions+oldSolutionIdx]
-          newSolutionIdx += 1
+    self.selectSolutions([i for i in range(0, self.numSolutions) if i != removeSolutionIdx])
 
     # update exact Winners
     for problemSize in self.exactWinners:
@@ -1150,42 +1101,13 @@ class LogicAnalyzer:
   ##############################################################################
   def pruneSolutions(self, keepSolutions):
 
-    removeSolutionIdxList = []
     solutionMapNewToOld = [] # dense mapping
     solutionMapOldToNew = [-1] * self.numSolutions
-
-    # temporarily move current to old
-    oldSolutions = deepcopy(self.solutions)
-    oldNumSolutions = self.numSolutions
-    oldData = deepcopy(self.data)
-    # update solutions
-    self.solutions = []
-    for i in range(0, oldNumSolutions):
+    for i in range(0, self.numSolutions):
       if i in keepSolutions:
+        solutionMapOldToNew[i] = len(solutionMapNewToOld)
         solutionMapNewToOld.append(i)
-        solutionMapOldToNew[i] = len(self.solutions)
-        self.solutions.append(oldSolutions[i])
-      else:
-        removeSolutionIdxList.append(i)
-
-    self.solutionMinNaming = Solution.getMinNaming(self.solutions)
-    self.solutionNames = []
-    self.solutionTiles = []
-    for solution in self.solutions:
-      self.solutionNames.append(Solution.getNameMin(solution, \
-          self.solutionMinNaming))
-      self.solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
-          solution["MacroTile1"]))
-    self.numSolutions = len(self.solutions)
-
-    # update data
-    self.totalSize = self.totalProblems * self.numSolutions
-    self.data = array.array('f', [0]*self.totalSize)
-    for problemIndex in range(0, self.totalProblems):
-      for newSolutionIdx in range(0, self.numSolutions):
-        oldSolutionIdx = solutionMapNewToOld[newSolutionIdx]
-        self.data[problemIndex*self.numSolutions+newSolutionIdx] \
-            = oldData[problemIndex*oldNumSolutions+oldSolutionIdx]
+    self.selectSolutions(solutionMapNewToOld)
 
     # update exact Winners
     for problemSize in self.exactWinners:
@@ -1200,6 +1122,73 @@ class LogicAnalyzer:
         print(("warning: exactWinner[", problemSize, "] "))
 
 
+  ##############################################################################
+  # Select Solutions
+  # keep only the solutions at the (ascending) indices of keepSolutions; the
+  # data columns are dropped and the solutions renamed when next used
+  ##############################################################################
+  def selectSolutions(self, keepSolutions):
+    keepSet = set(keepSolutions)
+    removeSolutions = [i for i in range(0, self.numSolutions) if i not in keepSet]
+    if self.problemWinners is not None:
+      for solutionIdx in reversed(removeSolutions):
+        self.problemWinners.removeSolution(solutionIdx)
+
+    self.solutions = [self.solutions[i] for i in keepSolutions]
+    self.numSolutions = len(self.solutions)
+    self.solutionNaming = None
+
+    keepSolutions = np.array(keepSolutions, dtype=np.intp)
+    if self.dataColumns is not None:
+      keepSolutions = self.dataColumns[keepSolutions]
+    self.dataColumns = keepSolutions
+    self.totalSize = self.totalProblems * self.numSolutions
+
+
+  ##############################################################################
+  # Data, with the columns of removed solutions dropped.  Removing solutions
+  # only records the kept columns in dataColumns; reading data compacts _data
+  # to those columns as a side effect and clears dataColumns.
+  @property
+  def data(self):
+    if self.dataColumns is not None:
+      self._data = self._data[:, self.dataColumns]
+      self.dataColumns = None
+    return self._data
+
+  @data.setter
+  def data(self, data):
+    self._data = data
+    self.dataColumns = None
+
+
+  ##############################################################################
+  # Solution names and tiles for printing, named once after removals
+  def getSolutionNaming(self):
+    if self.solutionNaming is None:
+      solutionMinNaming = Solution.getMinNaming(self.solutions)
+      solutionNames = []
+      solutionTiles = []
+      for solution in self.solutions:
+        solutionNames.append(Solution.getNameMin(solution, solutionMinNaming))
+        solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
+            solution["MacroTile1"]))
+      self.solutionNaming = (solutionMinNaming, solutionNames, solutionTiles)
+    return self.solutionNaming
+
+  @property
+  def solutionMinNaming(self):
+    return self.getSolutionNaming()[0]
+
+  @property
+  def solutionNames(self):
+    return self.getSolutionNaming()[1]
+
+  @property
+  def solutionTiles(self):
+    return self.getSolutionNaming()[2]
+
+
   ##############################################################################
   # Score Range For Logic
   ##############################################################################
@@ -1217,14 +1206,14 @@ class LogicAnalyzer:
   def scoreRangeForFullLogic(self, depth, indexRange, logic):
     score = 0
     for problemIndices in self.problemIndicesForRange(indexRange):
-      problemSerial = self.indicesToSerial(0, problemIndices)
+      problemIdx = self.indicesToProblem(problemIndices)
       totalFlops = self.totalFlopsForProblemIndices(problemIndices)
       solutionIdx = self.getSolutionForProblemIndicesUsingLogic( \
           problemIndices, logic)
       if solutionIdx == None:
         printWarning("SolutionIdx = None. This should never happen.")
         continue
-      solutionGFlops = self.data[problemSerial + solutionIdx]
+      solutionGFlops = float(self.data[problemIdx, solutionIdx])
       solutionGFlops = max(1E-9, solutionGFlops)
       timeUs = totalFlops / solutionGFlops / 1000
       score += timeUs
@@ -1263,12 +1252,11 @@ class LogicAnalyzer:
   ##############################################################################
   # Get Winner For Problem
   def getWinnerForProblem(self, problemIndices):
-    problemSerial = self.indicesToSerial(0, problemIndices)
+    problemGFlops = self.data[self.indicesToProblem(problemIndices)].tolist()
     winnerIdx = -1
     winnerGFlops = -1
     for solutionIdx in range(0, self.numSolutions):
-      solutionSerialIdx = problemSerial + solutionIdx
-      solutionGFlops = self.data[solutionSerialIdx]
+      solutionGFlops = problemGFlops[solutionIdx]
       solutionGFlops = max(1E-9, solutionGFlops)
       if solutionGFlops > winnerGFlops:
         winnerIdx = solutionIdx
@@ -1301,19 +1289,24 @@ class LogicAnalyzer:
   ##############################################################################
   # Score (microseconds) Range For Solutions
   def scoreRangeForSolutions(self, indexRange):
-    scores = [0]*self.numSolutions
-    for problemIndices in self.problemIndicesForRange(indexRange):
-      problemSerial = self.indicesToSerial(0, problemIndices)
-      totalFlops = self.totalFlopsForProblemIndices(problemIndices)
-      for solutionIdx in range(0, self.numSolutions):
-        gflops = self.data[problemSerial+solutionIdx]
-        if gflops > 0:
-          timeUs = totalFlops / gflops / 1000
-        else: # this solution not benchmarked for this size, therefore set
-          # its score to +inf so that its automatically disqualified
-          timeUs = float("inf")
-        scores[solutionIdx] += timeUs
-    return scores
+    problemIdx = [self.indicesToProblem(problemIndices) \
+        for problemIndices in self.problemIndicesForRange(indexRange)]
+    if len(problemIdx) == 0 or self.numSolutions == 0:
+      return [0]*self.numSolutions
+    gflops = self.data[problemIdx].astype(np.float64)
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+      timeUs = self.problemFlops[problemIdx, np.newaxis] / gflops / 1000
+    # solutions not benchmarked for a size score +inf so that they are
+    # automatically disqualified
+    timeUs[~(gflops > 0)] = np.inf
+    return np.cumsum(timeUs, axis=0)[-1].tolist()
+
+
+  ##############################################################################
+  # Sum of values added in order, like accumulating them in a loop
+  @staticmethod
+  def sequentialSum(values):
+    return np.cumsum(values)[-1].item() if len(values) > 0 else 0
 
 
   ##############################################################################
@@ -1403,8 +1396,7 @@ class LogicAnalyzer:
   def __getitem__(self, indexTuple):
     indices = indexTuple[0] # in analysis order
     solutionIdx = indexTuple[1]
-    serial = self.indicesToSerial(solutionIdx, indices)
-    return self.data[serial]
+    return float(self.data[self.indicesToProblem(indices), solutionIdx])
 
 
   ##############################################################################
@@ -1412,21 +1404,92 @@ class LogicAnalyzer:
   def __setitem__(self, indexTuple, value):
     indices = indexTuple[0] # in analysis order
     solutionIdx = indexTuple[1]
-    serial = self.indicesToSerial(solutionIdx, indices )
-    self.data[serial] = value
+    self.data[self.indicesToProblem(indices), solutionIdx] = value
 
 
   ##############################################################################
-  # Indices -> Serial
-  def indicesToSerial(self, solutionIdx, indices ):
-    serial = 0
+  # Indices -> Problem (row of data)
+  def indicesToProblem(self, indices):
+    problemIdx = 0
     stride = 1
-    serial += solutionIdx * stride
-    stride *= self.numSolutions
     for i in range(0, self.numIndices):
-      serial += indices[i] * stride
+      problemIdx += indices[i] * stride
       stride *= self.numProblemSizes[i]
-    return serial
+    return problemIdx
+
+
+
+################################################################################
+# ProblemWinners
+# Winner and runner-up of each problem (row of LogicAnalyzer.data) among the
+# remaining solutions, scanning solutions like the original per-problem loops:
+# the first solution with the most gflops above minGFlops wins, nan never
+# compares greater.  Removing a solution only rescans the problems it won or
+# was runner-up for.
+################################################################################
+class ProblemWinners:
+
+  def __init__(self, data, minGFlops=-1e6, minSecondGFlops=-1e9):
+    self.minGFlops = minGFlops
+    self.minSecondGFlops = minSecondGFlops
+    self.gflops = data.astype(np.float64)
+    self.gflops[np.isnan(self.gflops)] = -np.inf
+    # columns of gflops of the remaining solutions
+    self.columns = np.arange(self.gflops.shape[1])
+    # columns of the winner and runner-up of each problem, -1 if none
+    numProblems = self.gflops.shape[0]
+    self.winnerColumn = np.full(numProblems, -1, dtype=np.intp)
+    self.winnerGFlops = np.full(numProblems, float(minGFlops))
+    self.secondColumn = np.full(numProblems, -1, dtype=np.intp)
+    self.secondGFlops = np.full(numProblems, float(minSecondGFlops))
+    problems = np.arange(numProblems)
+    self.findWinners(problems)
+    self.findRunnerUps(problems)
+
+  ##############################################################################
+  # winner index, winner gflops and runner-up gflops of each problem
+  def getWinners(self):
+    winnerIdx = np.searchsorted(self.columns, self.winnerColumn)
+    winnerIdx[self.winnerColumn < 0] = -1
+    return winnerIdx, self.winnerGFlops, self.secondGFlops
+
+  ##############################################################################
+  def removeSolution(self, solutionIdx):
+    column = self.columns[solutionIdx]
+    self.columns = np.delete(self.columns, solutionIdx)
+    self.gflops[:, column] = -np.inf
+    lostWinner = np.flatnonzero(self.winnerColumn == column)
+    lostSecond = np.flatnonzero((self.secondColumn == column) | (self.winnerColumn == column))
+    self.findWinners(lostWinner)
+    self.findRunnerUps(lostSecond)
+
+  ##############################################################################
+  def findWinners(self, problems):
+    if len(problems) == 0 or self.gflops.shape[1] == 0:
+      return
+    gflops = self.gflops[problems]
+    column = np.argmax(gflops, axis=1)
+    best = gflops[np.arange(len(problems)), column]
+    hasWinner = best > self.minGFlops
+    self.winnerColumn[problems] = np.where(hasWinner, column, -1)
+    self.winnerGFlops[problems] = np.where(hasWinner, best, self.minGFlops)
+
+  ##############################################################################
+  # best of the other solutions, at least minGFlops when there is a winner
+  # and minSecondGFlops otherwise
+  def findRunnerUps(self, problems):
+    if len(problems) == 0 or self.gflops.shape[1] == 0:
+      return
+    gflops = self.gflops[problems]
+    winnerColumn = self.winnerColumn[problems]
+    hasWinner = winnerColumn >= 0
+    gflops[np.flatnonzero(hasWinner), winnerColumn[hasWinner]] = -np.inf
+    column = np.argmax(gflops, axis=1)
+    best = gflops[np.arange(len(problems)), column]
+    minGFlops = np.where(hasWinner, self.minGFlops, self.minSecondGFlops)
+    hasSecond = best > minGFlops
+    self.secondColumn[problems] = np.where(hasSecond, column, -1)
+    self.secondGFlops[problems] = np.where(hasSecond, best, minGFlops)
 
 
 
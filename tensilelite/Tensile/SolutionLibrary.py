@@ -509,16 +509,21 @@ class MasterSolutionLibrary:
         self.library = library
         self.version = version
 
-    def state(self):
+    def shallowState(self):
+        """Returns the state dict of this library without converting its members to state,
+        which allows writers to stream the solutions and the library tree."""
         rv = {
-            "solutions": state(self.solutions.values()),
-            "library": state(self.library)
+            "solutions": self.solutions.values(),
+            "library": self.library
         }
 
         if self.version is not None:
             rv["version"] = self.version
         return rv
 
+    def state(self):
+        return state(self.shallowState())
+
     def applyNaming(self, naming=None):
         if naming is None:
             kernels = itertools.chain(s.originalSolution.getKernels() for s in self.solutions.values())
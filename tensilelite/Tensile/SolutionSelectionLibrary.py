@@ -23,8 +23,9 @@
 ################################################################################
 
 from .SolutionStructs import Solution
+from . import LibraryIO
 
-import csv
+import numpy as np
 
 def getSummationKeys(header):
   keys=[]
@@ -60,6 +61,40 @@ def updateIfGT(theDictionary, theKey, theValue):
       theDictionary[theKey] = theValue
 
 
+# group index of each key, groups numbered in order of first appearance
+def groupIndices(keys):
+  groups = {}
+  indices = [groups.setdefault(key, len(groups)) for key in keys]
+  return np.array(indices, dtype=np.intp), len(groups)
+
+
+# Reduces the values of each (row group, column group) block as seen when visiting the
+# values row by row: yields the row group and, per column group, the column and value of
+# the first element, the column and value of the first largest non-nan element and
+# whether there is one.
+def reduceGroups(values, rowGroups, numRowGroups, columnGroups, numColumnGroups):
+  numRows, numColumns = values.shape
+  if numRows == 0 or numColumns == 0:
+    return
+  columns = np.arange(numColumns)
+  firstColumns = np.full(numColumnGroups, numColumns, dtype=np.intp)
+  np.minimum.at(firstColumns, columnGroups, columns)
+  rowOrder = np.argsort(rowGroups, kind="stable")
+  rowBounds = np.searchsorted(rowGroups[rowOrder], np.arange(numRowGroups + 1))
+  for rowGroup in range(0, numRowGroups):
+    groupValues = values[rowOrder[rowBounds[rowGroup]:rowBounds[rowGroup+1]]]
+    isValue = ~np.isnan(groupValues)
+    groupValues = np.where(isValue, groupValues, -np.inf)
+    hasValue = isValue.any(axis=0)
+    columnMax = groupValues.max(axis=0)
+    columnMaxRow = np.argmax(groupValues == columnMax, axis=0)
+    # best column per column group: has a value, largest, earliest
+    order = np.lexsort((columnMaxRow * numColumns + columns, -columnMax, ~hasValue, columnGroups))
+    maxColumns = order[np.searchsorted(columnGroups[order], np.arange(numColumnGroups))]
+    yield rowGroup, firstColumns, values[rowOrder[rowBounds[rowGroup]], firstColumns], \
+        maxColumns, columnMax[maxColumns], hasValue[maxColumns]
+
+
 def updateValidSolutions(validSolutions, analyzerSolutions, solutionMinNaming):
   solutionsStartIndex = len(analyzerSolutions)
   validSelectionSolutionsIncluded = []
@@ -121,34 +156,39 @@ def analyzeSolutionSelection(problemType, selectionFileNameList, numSolutionsPer
       baseKey = getSolutionBaseKey(solution)
       solutionBaseKeys.append(baseKey)
 
-    selectionfFile = open(selectionFileName, "r")
-    csvFile = csv.reader(selectionfFile)
-
-    firstRow = 0
-    for row in csvFile:
-      if firstRow == 0:
-        firstRow += 1
-      else:
-        sumationId = row[summationIndex].strip()
-
-        solutionIndex = 0
-        for i in range(solutionStartIdx, rowLength):
-          baseKey = solutionBaseKeys[solutionIndex]
-          key = "%s_%s" % (baseKey, sumationId)
-          solution = solutions[solutionIndex]
-          solutionIndex += 1
-          value = float(row[i])
-          if not solution in solutionsHash:
-            dataMap = {}
-            solutionsHash[solution] = dataMap
-
-          updateIfGT(solutionsHash[solution], sumationId, value)
-          if not key in performanceMap:
-            performanceMap[key] = (solution, value)
+    _, values, (sumationIds,) = LibraryIO.readCSV(selectionFileName, \
+        lambda header: list(range(solutionStartIdx, rowLength)), [summationIndex])
+    if len(sumationIds) > 0:
+      for solution in solutions:
+        if not solution in solutionsHash:
+          dataMap = {}
+          solutionsHash[solution] = dataMap
+
+    # Fold the values of each summation id into the maps, row by row as they appear in
+    # the file: the first value of a key is kept unless a later one is greater.
+    rowGroups, numRowGroups = groupIndices(sumationIds)
+    sumationIds = list(dict.fromkeys(sumationIds))
+    for columnGroups, numColumnGroups, isPerformance in \
+        (groupIndices(solutions) + (False,), groupIndices(solutionBaseKeys) + (True,)):
+      for rowGroup, firstColumns, firstValues, maxColumns, maxValues, hasMax in reduceGroups( \
+          values, rowGroups, numRowGroups, columnGroups, numColumnGroups):
+        sumationId = sumationIds[rowGroup]
+        for firstColumn, firstValue, maxColumn, maxValue, isMax in zip(firstColumns.tolist(), \
+            firstValues.tolist(), maxColumns.tolist(), maxValues.tolist(), hasMax.tolist()):
+          if isPerformance:
+            key = "%s_%s" % (solutionBaseKeys[firstColumn], sumationId)
+            if not key in performanceMap:
+              performanceMap[key] = (solutions[firstColumn], firstValue)
+            if isMax:
+              _,valueOld = performanceMap[key]
+              if maxValue > valueOld:
+                performanceMap[key] = (solutions[maxColumn], maxValue)
           else:
-            _,valueOld = performanceMap[key]
-            if value > valueOld:
-              performanceMap[key] = (solution, value)
+            dataMap = solutionsHash[solutions[firstColumn]]
+            if not sumationId in dataMap:
+              dataMap[sumationId] = firstValue
+            if isMax:
+              updateIfGT(dataMap, sumationId, maxValue)
 
 
   validSolutions = []
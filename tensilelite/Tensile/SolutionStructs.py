@@ -37,7 +37,7 @@ from .Activation import ActivationType
 
 from .CustomKernels import isCustomKernelConfig
 
-from .Common import assignParameterWithDefault, \
+from .Common import assignParameterWithDefault, canonicalState, \
                     defaultProblemType, defaultSolution, \
                     defaultInternalSupportParams, \
                     globalParameters, internalParameters, \
@@ -52,9 +52,14 @@ from functools import lru_cache
 from typing import List
 
 import collections
+import hashlib
+import itertools
+import json
 import math
 import operator
 import sys
+import threading
+import uuid
 
 ########################################
 # Print a reject message :
@@ -459,6 +464,11 @@ class ProblemType(Mapping):
 
   ########################################
   def __str__(self):
+    return self.getName()
+
+  ########################################
+  # ignoreGroupedGemm: name of the problem type as if GroupedGemm was False
+  def getName(self, ignoreGroupedGemm=False):
     indexChars = INDEX_CHARS
     # C dimensions
     name = "C"
@@ -536,7 +546,7 @@ class ProblemType(Mapping):
 
     # precision and other
     # name += "_SB" if self["StridedBatched"] else "_GB"
-    if self["GroupedGemm"]:
+    if self["GroupedGemm"] and not ignoreGroupedGemm:
       name += "_GG"
     else:
       name += "" if self["StridedBatched"] else "_GB" # legacy
@@ -1047,6 +1057,77 @@ def isExtractableIndex(ks, index, tc='x'):
   else:
     return xA or xB
 
+########################################
+# hashable key of a parameter value, keys are equal iff the values compare equal.
+# raises TypeError for values that can only be compared with ==
+def _paramValueKey(value):
+  valueType = type(value)
+  if valueType is list:
+    return (list, tuple(_paramValueKey(v) for v in value))
+  if valueType is dict:
+    return (dict, frozenset((k, _paramValueKey(v)) for k, v in value.items()))
+  if valueType is set:
+    return frozenset(value)
+  hash(value)
+  return value
+
+########################################
+# requiredParameters of a naming scheme compiled for Solution.getNameMin: the
+# parameters of the name in key order with their abbreviations
+class _MinNamingTable:
+  # parameters left out of kernel names when ignoring internal arguments
+  InternalArgs = ("WorkGroupMapping", "WorkGroupMappingXCC", "WorkGroupMappingXCCGroup", \
+                  "StaggerU", "StaggerUStride", "StaggerUMapping", "GlobalSplitUCoalesced", \
+                  "GlobalSplitUWorkGroupMappingRoundRobin")
+
+  # tables of requiredParameters dicts not built by Solution.getMinNaming, one
+  # per distinct set of parameters
+  _tables = {}
+  _lock = threading.Lock()
+
+  def __init__(self, requiredParameters):
+    self.requiredParameters = dict(requiredParameters)
+    # identifies the table in the name caches of solutions, also across processes
+    self.token = uuid.uuid4().hex
+    self._keys = {}
+
+  # table of a requiredParameters dict
+  @staticmethod
+  def get(requiredParameters):
+    if isinstance(requiredParameters, _MinNaming):
+      return requiredParameters.table
+    frozen = frozenset(requiredParameters.items())
+    table = _MinNamingTable._tables.get(frozen)
+    if table is None:
+      with _MinNamingTable._lock:
+        table = _MinNamingTable._tables.setdefault(frozen, _MinNamingTable(requiredParameters))
+    return table
+
+  # (parameter, abbreviation) in key order
+  def keys(self, ignoreInternalArgs, matrixInstruction, globalSplitU):
+    cacheKey = (ignoreInternalArgs, matrixInstruction, globalSplitU)
+    keys = self._keys.get(cacheKey)
+    if keys is None:
+      required = dict(self.requiredParameters)
+      for key in _MinNamingTable.InternalArgs:
+        required[key] = not ignoreInternalArgs
+      required["GlobalSplitU"] = globalSplitU
+      # Use MIWaveGroup and MIWaveTile instead of WG and MT
+      required["MIWaveTile"] = matrixInstruction
+      required["ThreadTile"] = not matrixInstruction
+      keys = [(key, Solution.getParameterNameAbbreviation(key)) for key in sorted(required) \
+              if required[key] and key[0] != '_' and key != "CustomKernelName"]
+      self._keys[cacheKey] = keys
+    return keys
+
+########################################
+# requiredParameters returned by Solution.getMinNaming, carrying its naming
+# table; it is not modified after being returned
+class _MinNaming(dict):
+  def __init__(self, requiredParameters):
+    super().__init__(requiredParameters)
+    self.table = _MinNamingTable(self)
+
 ################################################################################
 # Solution
 ################################################################################
@@ -1055,6 +1136,8 @@ class Solution(collections.abc.Mapping):
   ########################################
   def __init__(self, config, cxxCompiler: str, srcName: str = ""):
     self._name = None
+    self._keyNoInternalArgs = None
+    self._nameMinCache = None
     self.cxxCompiler = cxxCompiler
     self.srcName = srcName
     config = config
@@ -1107,6 +1190,9 @@ class Solution(collections.abc.Mapping):
       self["AssignedProblemIndependentDerivedParameters"] = False
     if "AssignedDerivedParameters" not in self._state:
       self["AssignedDerivedParameters"] = False
+    # the caller hands over already derived parameters only if it trusts them, see
+    # LibraryIO.parseLibraryLogicData
+    self.derivedParametersReused = self["AssignedDerivedParameters"]
     Solution.assignDerivedParameters(self._state)
     self._name = config["CustomKernelName"] if isCustomKernelConfig(config) else None
     self.initHelperKernelObjects()
@@ -1114,6 +1200,46 @@ class Solution(collections.abc.Mapping):
   # these keys are copied from ProblemType to internal that may be overridden
   InternalKeys = ["UseSgprForGRO","VectorStore"]
 
+  # state key recording the fingerprint of the derived parameters
+  DerivedFingerprintKey = "DerivedParametersFingerprint"
+  # bookkeeping keys assigned after derivation that do not take part in the fingerprint
+  DerivedFingerprintIgnoredKeys = frozenset((DerivedFingerprintKey, "SolutionIndex", "SolutionNameMin", \
+                                             "KernelNameMin", "Kernel", "codeObjectFile", "CUCount"))
+  # global parameters and capabilities read by assignDerivedParameters
+  DerivedFingerprintGlobalKeys = ("MaxLDS", "DeviceLDS", "SplitGSU", "UnrollLoopEfficiencyEnable", "CurrentISA")
+  DerivedFingerprintAsmCaps = ("HasMFMA", "HasNTModifier", "HasWMMA", "HasWMMA_V1", "HasWMMA_V2")
+  DerivedFingerprintArchCaps = ("HasAccCD", "HasEccHalf", "HasWave32")
+  # version of the derivation rules, bump it whenever assignDerivedParameters (or the
+  # parameters and capabilities listed above) changes, this invalidates all fingerprints
+  DerivationSchemaVersion = 1
+
+  ########################################
+  # digest of everything besides the solution state that assignDerivedParameters depends on
+  @staticmethod
+  def getDerivationDigest(isa):
+    isa = tuple(isa)
+    asmCaps = globalParameters.get("AsmCaps", {}).get(isa, {})
+    archCaps = globalParameters.get("ArchCaps", {}).get(isa, {})
+    h = hashlib.sha1(str(Solution.DerivationSchemaVersion).encode())
+    h.update(canonicalState({k: globalParameters.get(k) for k in Solution.DerivedFingerprintGlobalKeys}).encode())
+    h.update(canonicalState({k: asmCaps.get(k) for k in Solution.DerivedFingerprintAsmCaps}).encode())
+    h.update(canonicalState({k: archCaps.get(k) for k in Solution.DerivedFingerprintArchCaps}).encode())
+    return h.hexdigest()
+
+  ########################################
+  # fingerprint of a fully derived, serialized state (as written to logic files) so that
+  # loading them again can skip assignDerivedParameters
+  @staticmethod
+  def getDerivedParametersFingerprint(state, derivationDigest=None):
+    if derivationDigest is None:
+      derivationDigest = Solution.getDerivationDigest(state["ISA"])
+    try:
+      content = json.dumps({k: v for k, v in state.items() if k not in Solution.DerivedFingerprintIgnoredKeys}, \
+                           sort_keys=True, separators=(",", ":"), default=str)
+    except (TypeError, ValueError):
+      return None
+    return hashlib.sha1((derivationDigest + content).encode()).hexdigest()
+
 
   ########################################
   # get a list of kernel parameters for this solution
@@ -4238,7 +4364,7 @@ class Solution(collections.abc.Mapping):
 
     # early return
     if len(nonCKObjs) == 0:
-      return {}
+      return _MinNaming({})
 
     # determine keys
     requiredParameters = {}
@@ -4246,23 +4372,15 @@ class Solution(collections.abc.Mapping):
       keys = list(nonCKObjs[0]._state.keys())
     else:
       keys = list(nonCKObjs[0].keys())
-    # only 1, rather than name being nothing, it'll be everything
-    if len(nonCKObjs) == 1:
-      for key in keys:
-        if key in list(validParameters.keys()):
-          requiredParameters[key] = False
-    else:
-      for key in keys:
-        required = False
-        if key in list(validParameters.keys()):
-          for i in range(1, len(nonCKObjs)):
-            if nonCKObjs[0][key] != nonCKObjs[i][key]:
-              required = True
-              break
-        if required:
-          requiredParameters[key] = True
-        else:
-          requiredParameters[key] = False
+    states = [obj._state if isinstance(obj, Solution) else obj for obj in nonCKObjs]
+    # a parameter is required if any object differs from the first one
+    for key in keys:
+      if key in validParameters:
+        first = states[0][key]
+        requiredParameters[key] = any(map(operator.ne, itertools.repeat(first), \
+                                          [state[key] for state in states[1:]]))
+      elif len(states) > 1:
+        requiredParameters[key] = False
 
     requiredParameters["GlobalSplitU"] = True
     requiredParameters["WorkGroupMapping"] = True
@@ -4287,61 +4405,97 @@ class Solution(collections.abc.Mapping):
 
     requiredParameters["Kernel"]            = True  # distinguish kernels from solutions
                                                     # for single-source compilation
-    return requiredParameters
+    return _MinNaming(requiredParameters)
 
   ########################################
+  # hashable key identifying the kernel of a state regardless of its internal arguments,
+  # cached per Solution and invalidated by __setitem__
   @ staticmethod
   def getKeyNoInternalArgs(state):
-    state_copy = deepcopy(state)
+    if isinstance(state, Solution):
+      if state._keyNoInternalArgs is None:
+        state._keyNoInternalArgs = Solution.getNameNoInternalArgs(state._state)
+      name = state._keyNoInternalArgs
+    else:
+      name = Solution.getNameNoInternalArgs(state)
+    return (name, state.get("codeObjectFile", ""))
+
+  ########################################
+  # full name of a state with the internal arguments masked out
+  @ staticmethod
+  def getNameNoInternalArgs(state):
+    masked = dict(state)
 
-    state_copy["ProblemType"]["GroupedGemm"] = False
+    if state["ProblemType"]["GroupedGemm"]:
+      masked["ProblemType"] = deepcopy(state["ProblemType"])
+      masked["ProblemType"]["GroupedGemm"] = False
 
     if globalParameters["SplitGSU"]:
-      state_copy["GlobalSplitU"] = "M" if (state_copy["GlobalSplitU"] > 1) else state_copy["GlobalSplitU"]
+      masked["GlobalSplitU"] = "M" if (state["GlobalSplitU"] > 1) else state["GlobalSplitU"]
     elif state["GlobalSplitU"] > 0:
-      state_copy["GlobalSplitU"] = "M"
-    state_copy["WorkGroupMapping"] = "M"
-    state_copy["WorkGroupMappingXCC"] = "M"
-    state_copy["WorkGroupMappingXCCGroup"] = "M"
-    state_copy["StaggerU"] = "M"
-    state_copy["StaggerUStride"] = "M"
-    state_copy["StaggerUMapping"] = "M"
-    state_copy["GlobalSplitUCoalesced"] = "M"
-    state_copy["GlobalSplitUWorkGroupMappingRoundRobin"] = "M"
-
-    return state_copy
+      masked["GlobalSplitU"] = "M"
+    masked["WorkGroupMapping"] = "M"
+    masked["WorkGroupMappingXCC"] = "M"
+    masked["WorkGroupMappingXCCGroup"] = "M"
+    masked["StaggerU"] = "M"
+    masked["StaggerUStride"] = "M"
+    masked["StaggerUMapping"] = "M"
+    masked["GlobalSplitUCoalesced"] = "M"
+    masked["GlobalSplitUWorkGroupMappingRoundRobin"] = "M"
+
+    return Solution.getNameFull(masked)
 
   @ staticmethod
   def getNameFull(state):
+    if isCustomKernelConfig(state):
+      return state["CustomKernelName"]
+
     requiredParameters = {}
     for key in state:
-      if key in list(validParameters.keys()):
+      if key in validParameters:
         requiredParameters[key] = True
     if "MatrixInstM" in state:
       # Use MIWaveGroup and MIWaveTile instead of WG and MT
       requiredParameters["MIWaveTile"]  = True
       requiredParameters["ThreadTile"]  = False
-    return Solution.getNameMin(state, requiredParameters)
+    return Solution._getNameMin(state, _MinNamingTable.get(requiredParameters), False)
 
   ########################################
   # Get Name Min
+  # Names are cached per Solution and naming scheme, neither the state nor
+  # requiredParameters are modified.
   @ staticmethod
   def getNameMin(state, requiredParameters, ignoreInternalArgs = False):
     if isCustomKernelConfig(state):
       return state["CustomKernelName"]
 
-    components = []
+    table = _MinNamingTable.get(requiredParameters)
+    if not isinstance(state, Solution):
+      return Solution._getNameMin(state, table, ignoreInternalArgs)
+
+    cache = state.__dict__.get("_nameMinCache")
+    if cache is None:
+      cache = state._nameMinCache = {}
+    cacheKey = (table.token, ignoreInternalArgs, globalParameters["SplitGSU"])
+    name = cache.get(cacheKey)
+    if name is None:
+      name = Solution._getNameMin(state._state, table, ignoreInternalArgs)
+      cache[cacheKey] = name
+    return name
 
-    backup = state["ProblemType"]["GroupedGemm"]
-    if ignoreInternalArgs:
-      state["ProblemType"]["GroupedGemm"] = False
+  @ staticmethod
+  def _getNameMin(state, table, ignoreInternalArgs):
+    components = []
 
     if "ProblemType" in state:
-      components.append(f'{str(state["ProblemType"])}')
-      # name += str(state["ProblemType"]) + "_"
-
-    if ignoreInternalArgs:
-      state["ProblemType"]["GroupedGemm"] = backup
+      problemType = state["ProblemType"]
+      if ignoreInternalArgs and problemType["GroupedGemm"]:
+        if isinstance(problemType, ProblemType):
+          components.append(problemType.getName(ignoreGroupedGemm=True))
+        else:
+          components.append(str(dict(problemType, GroupedGemm=False)))
+      else:
+        components.append(f'{str(problemType)}')
 
     if "MacroTile0" in state \
         and "MacroTile1" in state \
@@ -4351,49 +4505,19 @@ class Solution(collections.abc.Mapping):
     if "MatrixInstM" in state:
       components.append(f'{Solution.getParameterNameAbbreviation("MatrixInstruction")}{state["MatrixInstM"]}x{state["MatrixInstN"]}x{state["MatrixInstB"]}')
 
-    backup = state["GlobalSplitU"]
-
+    globalSplitU = state["GlobalSplitU"]
+    useGlobalSplitU = True
     if ignoreInternalArgs:
       if globalParameters["SplitGSU"]:
-        state["GlobalSplitU"] = "M" if (state["GlobalSplitU"] > 1) else state["GlobalSplitU"]
-      elif state["GlobalSplitU"] > 0:
-        requiredParameters["GlobalSplitU"] = False
-      requiredParameters["WorkGroupMapping"] = False
-      requiredParameters["WorkGroupMappingXCC"] = False
-      requiredParameters["WorkGroupMappingXCCGroup"] = False
-      requiredParameters["StaggerU"] = False
-      requiredParameters["StaggerUStride"] = False
-      requiredParameters["StaggerUMapping"] = False
-      requiredParameters["GlobalSplitUCoalesced"] = False
-      requiredParameters["GlobalSplitUWorkGroupMappingRoundRobin"] = False
-
-    useWaveTile, useThreadTile = requiredParameters.get("MIWaveTile", False), requiredParameters.get("ThreadTile", False)
-
-    if 'MatrixInstM' in state:
-      requiredParameters["MIWaveTile"] = True
-      requiredParameters["ThreadTile"] = False
-    else:
-      requiredParameters["MIWaveTile"] = False
-      requiredParameters["ThreadTile"] = True
+        globalSplitU = "M" if (globalSplitU > 1) else globalSplitU
+      elif globalSplitU > 0:
+        useGlobalSplitU = False
 
     components.append('SN')
-    for key in sorted(state.keys()):
-      if key in requiredParameters and key[0] != '_':
-        if requiredParameters[key] and key != "CustomKernelName":
-          components.append(f'{Solution.getParameterNameAbbreviation(key)}{Solution.getParameterValueAbbreviation(key, state[key])}')
-
-    state["GlobalSplitU"] = backup
-    requiredParameters["GlobalSplitU"] = True
-    requiredParameters["WorkGroupMapping"] = True
-    requiredParameters["WorkGroupMappingXCC"] = True
-    requiredParameters["WorkGroupMappingXCCGroup"] = True
-    requiredParameters["StaggerU"] = True
-    requiredParameters["StaggerUStride"] = True
-    requiredParameters["StaggerUMapping"] = True
-    requiredParameters["GlobalSplitUCoalesced"] = True
-    requiredParameters["GlobalSplitUWorkGroupMappingRoundRobin"] = True
-    requiredParameters["MIWaveTile"] = useWaveTile
-    requiredParameters["ThreadTile"] = useThreadTile
+    for key, abbreviation in table.keys(ignoreInternalArgs, "MatrixInstM" in state, useGlobalSplitU):
+      if key in state:
+        value = globalSplitU if key == "GlobalSplitU" else state[key]
+        components.append(f'{abbreviation}{Solution.getParameterValueAbbreviation(key, value)}')
 
     return '_'.join(components)
 
@@ -4401,23 +4525,62 @@ class Solution(collections.abc.Mapping):
   # create a dictionary of lists of parameter values
   @staticmethod
   def getSerialNaming(objs):
+    states = [obj._state if isinstance(obj, Solution) else obj for obj in objs]
+    # parameters in first seen order, objects mostly share the same keys
+    paramNames = []
+    seenParams = set()
+    seenKeys = set()
+    for state in states:
+      keys = tuple(state)
+      if keys not in seenKeys:
+        seenKeys.add(keys)
+        paramNames += sorted(k for k in keys if k in validParameters and k not in seenParams)
+        seenParams.update(paramNames)
     data = {}
-    for obj in objs:
-      for paramName in sorted(obj.keys()):
-        if paramName in validParameters.keys():
-          paramValue = obj[paramName]
-          if paramName in data:
-            if paramValue not in data[paramName]:
-              data[paramName].append(paramValue)
-          else:
-            data[paramName] = [ paramValue ]
+    indices = {}
+    for paramName in paramNames:
+      column = [state[paramName] for state in states if paramName in state]
+      data[paramName] = Solution._uniqueParamValues(column)
     maxObjs = 1
     for paramName in data:
       if not isinstance(data[paramName][0], dict):
         data[paramName] = sorted(data[paramName])
       maxObjs *= len(data[paramName])
+      indices[paramName] = Solution._paramValueIndex(data[paramName])
     numDigits = len(str(maxObjs))
-    return [ data, numDigits ]
+    return [ data, numDigits, indices ]
+
+  ########################################
+  # unique values of a parameter column in first seen order
+  @staticmethod
+  def _uniqueParamValues(column):
+    try:
+      return list(dict.fromkeys(column))
+    except TypeError:
+      pass
+    try:
+      unique = {}
+      for paramValue in column:
+        unique.setdefault(_paramValueKey(paramValue), paramValue)
+      return list(unique.values())
+    except TypeError:
+      values = []
+      for paramValue in column:
+        if paramValue not in values:
+          values.append(paramValue)
+      return values
+
+  ########################################
+  # dictionary from parameter value (or its key) to index, None if not hashable
+  @staticmethod
+  def _paramValueIndex(values):
+    try:
+      index = {}
+      for i, paramValue in enumerate(values):
+        index.setdefault(_paramValueKey(paramValue), i)
+      return index
+    except TypeError:
+      return None
 
   ########################################
   # Get Name Serial
@@ -4425,15 +4588,29 @@ class Solution(collections.abc.Mapping):
   def getNameSerial(state, serialNaming):
     data = serialNaming[0]
     numDigits = serialNaming[1]
+    indices = serialNaming[2] if len(serialNaming) > 2 else {}
 
     serial = 0
     multiplier = 1
     for paramName in sorted(state.keys()):
-      if paramName in list(validParameters.keys()):
+      if paramName in validParameters:
         paramValue = state[paramName]
         paramData = data[paramName]
         paramNameMultiplier = len(paramData)
-        if paramValue in paramData:
+        index = indices.get(paramName)
+        if index is not None:
+          try:
+            # hashable values are their own key
+            idx = index.get(paramValue)
+          except TypeError:
+            try:
+              idx = index.get(_paramValueKey(paramValue))
+            except TypeError:
+              index = None
+        if index is not None:
+          if idx is not None:
+            paramValueIdx = idx
+        elif paramValue in paramData:
           paramValueIdx = paramData.index(paramValue)
         serial += paramValueIdx * multiplier
         multiplier *= paramNameMultiplier
@@ -4522,6 +4699,8 @@ class Solution(collections.abc.Mapping):
 
   def __setitem__(self, key, value):
     self._name = None
+    self._keyNoInternalArgs = None
+    self._nameMinCache = None
     self._state[key] = value
 
   def __str__(self):
@@ -0,0 +1,237 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+import hashlib
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, NamedTuple, Union
+
+from Tensile import ROOT_PATH, __version__
+from Tensile.Common import atomicWrite, canonicalState, fileDigest, globalParameters
+
+# Solution state entries that are bookkeeping only and never reach the generated source.
+_IGNORED_STATE_KEYS = frozenset(
+    (
+        "SolutionIndex",
+        "SolutionNameMin",
+        "KernelNameMin",
+        "codeObjectFile",
+        "Kernel",
+        "DerivedParametersFingerprint",
+    )
+)
+
+# Global parameters that change the generated assembly for an otherwise identical kernel.
+_CODEGEN_GLOBAL_KEYS = (
+    "CodeObjectVersion",
+    "SplitGSU",
+    "DebugKernel",
+    "EnableAsserts",
+    "EnableDebugA",
+    "EnableDebugB",
+    "EnableDebugC",
+    "ExpectedValueC",
+    "ForceCExpectedValue",
+    "ForceGenerateKernel",
+    "UnrollLoopEfficiencyEnable",
+)
+
+
+# Sources of the code generator, relative to the Tensile package. Editing any of them
+# invalidates every cache entry, __version__ alone does not change between commits.
+_CODEGEN_SOURCES = (
+    "Activation.py",
+    "Asm*.py",
+    "Component.py",
+    "CustomKernels.py",
+    "KernelWriter*.py",
+    "TensilePass.py",
+    "Components/*.py",
+    "CustomKernels/*.s",
+    "TensileInstructions/*.py",
+)
+
+
+@lru_cache(maxsize=None)
+def _codegenDigest() -> str:
+    h = hashlib.sha256()
+    root = Path(ROOT_PATH)
+    for pattern in _CODEGEN_SOURCES:
+        for path in sorted(root.glob(pattern)):
+            h.update(f"{path.relative_to(root).as_posix()}:{fileDigest(path)}\0".encode())
+    return h.hexdigest()
+
+
+class KernelCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    objectHits: int
+    evictedFiles: int
+    sizeBytes: int
+
+    def __str__(self):
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return (
+            f"{self.hits} hits ({self.objectHits} with object), {self.misses} misses "
+            f"({rate:3.1f}% hit rate), {self.evictedFiles} files evicted, "
+            f"{self.sizeBytes / (1 << 20):.1f} MiB on disk"
+        )
+
+
+class KernelCache:
+    """Persistent, content-addressed cache of generated kernel assembly and objects.
+
+    Entries are keyed by a digest of the kernel's solution state, the kernel name
+    embedded in the source, the ISA, the assembler, the Tensile version and the code
+    generator sources. Each entry holds a ``.s`` file and, once assembled, the matching
+    ``.o`` file. Files are written atomically so concurrent workers may share one cache
+    directory.
+
+    Eviction is least-recently-used by file modification time; hits refresh the
+    timestamp of the entry.
+    """
+
+    def __init__(self, path: Union[Path, str], maxSizeMiB: int = 0):
+        """
+        Args:
+            path: The cache directory, created if it does not exist.
+            maxSizeMiB: Size bound in MiB enforced by :meth:`prune`; 0 disables eviction.
+        """
+        self.path = Path(path)
+        self.maxSizeBytes = max(0, int(maxSizeMiB)) << 20
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def key(self, kernel, kernelName: str, assembler: str, assemblerVersion) -> str:
+        """Computes the cache key of a kernel.
+
+        Args:
+            kernel: The kernel (Solution) to generate.
+            kernelName: The kernel name as emitted into the assembly source.
+            assembler: Path to the assembler used to build the kernel.
+            assemblerVersion: The version of the assembler.
+
+        Returns:
+            A hex digest uniquely identifying the generated source.
+        """
+        state = {k: v for k, v in kernel._state.items() if k not in _IGNORED_STATE_KEYS}
+        isa = tuple(kernel["ISA"])
+        h = hashlib.sha256()
+        for part in (
+            __version__,
+            _codegenDigest(),
+            str(assembler),
+            str(assemblerVersion),
+            str(isa),
+            kernelName,
+            canonicalState({k: globalParameters.get(k) for k in _CODEGEN_GLOBAL_KEYS}),
+            canonicalState(globalParameters.get("AsmCaps", {}).get(isa, {})),
+            canonicalState(globalParameters.get("ArchCaps", {}).get(isa, {})),
+            canonicalState(state),
+        ):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _entry(self, key: str, ext: str) -> Path:
+        return self.path / key[:2] / (key + ext)
+
+    def _store(self, src: Union[Path, str], dest: Path):
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with open(src, "rb") as s, atomicWrite(dest, "wb") as d:
+                shutil.copyfileobj(s, d)
+        except OSError:
+            pass
+
+    def _touch(self, path: Path) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def fetchSource(self, key: str, dest: Union[Path, str]) -> bool:
+        """Copies the cached assembly source for ``key`` to ``dest``.
+
+        Returns:
+            True if the source was found and copied, False otherwise.
+        """
+        return self._fetch(self._entry(key, ".s"), dest)
+
+    def storeSourceFile(self, key: str, src: Union[Path, str]):
+        """Adds an assembly source file to the cache."""
+        self._store(src, self._entry(key, ".s"))
+
+    def fetchObject(self, key: str, dest: Union[Path, str]) -> bool:
+        """Copies the cached object file for ``key`` to ``dest``.
+
+        Returns:
+            True if the object was found and copied, False otherwise.
+        """
+        return self._fetch(self._entry(key, ".o"), dest)
+
+    def _fetch(self, path: Path, dest: Union[Path, str]) -> bool:
+        if not self._touch(path):
+            return False
+        try:
+            shutil.copyfile(path, dest)
+            return True
+        except OSError:
+            return False
+
+    def storeObject(self, key: str, src: Union[Path, str]):
+        """Adds an assembled object file to the cache."""
+        self._store(src, self._entry(key, ".o"))
+
+    def _files(self) -> Iterable[os.DirEntry]:
+        for bucket in os.scandir(self.path):
+            if bucket.is_dir():
+                for entry in os.scandir(bucket.path):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        yield entry
+
+    def prune(self):
+        """Evicts the least recently used entries until the cache fits its size bound.
+
+        Returns:
+            A tuple (evicted, remaining) holding the number of removed files and the
+            remaining cache size in bytes.
+        """
+        files = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in self._files()]
+        size = sum(f[1] for f in files)
+        evicted = 0
+        if self.maxSizeBytes:
+            for _, fsize, path in sorted(files):
+                if size <= self.maxSizeBytes:
+                    break
+                try:
+                    os.remove(path)
+                    size -= fsize
+                    evicted += 1
+                except OSError:
+                    pass
+        return evicted, size
@@ -129,6 +129,14 @@ def parseArguments(input: Optional[List[str]] = None) -> Dict[str, Any]:
         default=-1,
         help="Number of parallel jobs to launch.",
     )
+    argParser.add_argument(
+        "--max-in-flight-kernels",
+        dest="MaxInFlightKernels",
+        type=int,
+        default=0,
+        help="Maximum number of kernels generated, written and assembled concurrently, "
+        "bounding peak memory. Defaults to the number of jobs.",
+    )
     argParser.add_argument(
         "--verbose",
         "-v",
@@ -190,6 +198,36 @@ def parseArguments(input: Optional[List[str]] = None) -> Dict[str, Any]:
         " Example: gfx942/Equality/* for building equality of gfx942 only",
     )
 
+    argParser.add_argument(
+        "--logic-cache",
+        dest="LogicCachePath",
+        action="store",
+        default=None,
+        type=str,
+        help="Directory for pre-parsed binary (msgpack) copies of the logic files."
+        " Unchanged logic files are loaded from there instead of being parsed as YAML."
+        " Disabled by default.",
+    )
+    argParser.add_argument(
+        "--kernel-cache",
+        dest="KernelCachePath",
+        action="store",
+        default=None,
+        type=str,
+        help="Directory of a persistent cache for generated kernel assembly and object files."
+        " Kernels whose solution state, ISA, assembler and Tensile version are unchanged are"
+        " reused instead of regenerated. Disabled by default.",
+    )
+    argParser.add_argument(
+        "--kernel-cache-max-size",
+        dest="KernelCacheMaxSize",
+        action="store",
+        default=20480,
+        type=int,
+        help="Maximum size of the kernel cache in MiB, least recently used entries are evicted"
+        " (0 for unbounded). Default: 20480",
+    )
+
     args = argParser.parse_args()
 
     arguments = {}
@@ -207,6 +245,7 @@ def parseArguments(input: Optional[List[str]] = None) -> Dict[str, Any]:
     if args.no_enumerate:
         arguments["AMDGPUArchPath"] = False
     arguments["CpuThreads"] = args.CpuThreads
+    arguments["MaxInFlightKernels"] = args.MaxInFlightKernels
     arguments["PrintLevel"] = args.PrintLevel
     arguments["AsmDebug"] = args.AsmDebug
     arguments["BuildIdKind"] = args.BuildIdKind
@@ -222,5 +261,8 @@ def parseArguments(input: Optional[List[str]] = None) -> Dict[str, Any]:
     arguments["OutputPath"] = args.OutputPath
     arguments["Experimental"] = args.Experimental
     arguments["GenSolTable"] = args.GenSolTable
+    arguments["LogicCachePath"] = args.LogicCachePath
+    arguments["KernelCachePath"] = args.KernelCachePath
+    arguments["KernelCacheMaxSize"] = args.KernelCacheMaxSize
 
     return arguments
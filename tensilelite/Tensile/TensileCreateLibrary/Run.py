@@ -22,7 +22,7 @@
 #
 ################################################################################
 
-import functools
+import collections
 import glob
 import itertools
 import os
@@ -37,6 +37,7 @@ from Tensile.Common import (
     CHeader,
     IsaVersion,
     ParallelMap2,
+    ParallelMapByCost,
     SemanticVersion,
     architectureMap,
     assignGlobalParameters,
@@ -46,7 +47,6 @@ from Tensile.Common import (
     print1,
     print2,
     printExit,
-    state,
     tqdm,
 )
 from Tensile.CustomYamlLoader import load_logic_gfx_arch
@@ -68,6 +68,7 @@ from Tensile.Toolchain.Validators import (
 from Tensile.Utilities.Decorators.Profile import profile
 from Tensile.Utilities.Decorators.Timing import timing
 
+from .KernelCache import KernelCache, KernelCacheStats
 from .ParseArguments import parseArguments
 
 
@@ -79,6 +80,8 @@ class KernelCodeGenResult(NamedTuple):
     targetObjFilename: str
     isa: IsaVersion
     wavefrontSize: int
+    cacheKey: Optional[str] = None
+    cacheHit: bool = False
 
 
 def processKernelSource(kernelWriterAssembly, ti, kernel) -> KernelCodeGenResult:
@@ -98,11 +101,90 @@ def processKernelSource(kernelWriterAssembly, ti, kernel) -> KernelCodeGenResult
     )
 
 
+def writeKernelSource(
+    kernelWriterAssembly: KernelWriterAssembly,
+    ti: TensileInstructions,
+    kernel: Solution,
+    asmPath: Union[Path, str],
+    cache: Optional[KernelCache] = None,
+) -> KernelCodeGenResult:
+    """
+    Generate the source of a single kernel and write it to <asmPath>/<name>.s.
+    Returns the result of processKernelSource without the source.
+
+    The assembly is streamed from the kernel body to the file, so the source is never
+    held in memory as a whole. Cache hits and stores copy the file.
+    """
+    kernelWriter = kernelWriterAssembly
+    kernelWriter.setTensileInstructions(ti)
+    asmFilename = kernelWriter.getKernelFileBase(kernel)
+    header = kernelWriter.getHeaderFileString(kernel)
+    objFilename = kernel._state.get("codeObjectFile", None)
+    path = Path(asmPath) / f"{asmFilename}.s"
+
+    cacheKey = None
+    if cache is not None:
+        cacheKey = cache.key(
+            kernel,
+            kernelWriter.getKernelName(kernel),
+            kernelWriter.assembler,
+            kernelWriter.amdClangVersion,
+        )
+
+    cacheHit = cacheKey is not None and cache.fetchSource(cacheKey, path)
+    if cacheHit:
+        err = 0
+    else:
+        err = kernelWriter.writeSourceFile(kernel, path)
+        if cacheKey is not None and err == 0:
+            cache.storeSourceFile(cacheKey, path)
+
+    return KernelCodeGenResult(
+        err,
+        "",
+        header,
+        asmFilename,
+        objFilename,
+        tuple(kernel["ISA"]),
+        kernel["WavefrontSize"],
+        cacheKey,
+        cacheHit,
+    )
+
+
+def estimateKernelCost(kernel) -> float:
+    """Estimates the relative cost of generating a kernel.
+
+    Generation time grows with the number of wave tiles unrolled per iteration and
+    with the extra epilogue paths of fused activation, GSU and StreamK kernels. The
+    weights were fitted on gfx942 kernels; only the relative order matters.
+    """
+    if getattr(kernel, "duplicate", False):
+        return 0.05
+    waveTile = kernel._state.get("MIWaveTile", (1, 1))
+    cost = 1.0 + waveTile[0] * waveTile[1] / 32.0
+    if kernel["ProblemType"]["ActivationType"] != "none":
+        cost *= 1.4
+    if kernel["GlobalSplitU"] != 1:
+        cost *= 1.2
+    if kernel["StreamK"] > 0:
+        cost *= 1.2
+    return cost
+
+
+# Reasons reported for the error codes of KernelWriterAssembly.getSourceFileString.
+_KERNEL_ERROR_REASONS = {-2: "assembly generation failed"}
+
+
 def removeInvalidSolutionsAndKernels(results, kernels, solutions, errorTolerant, globalParameters):
-    removeKernels = []
-    removeKernelNames = []
-    removeSolutions = []
-    removeResults = []
+    """Removes kernels that failed to generate together with the solutions using them.
+
+    ``results``, ``kernels`` and ``solutions`` are filtered in place, each in a single
+    pass. The number of dropped kernels and solutions is reported by reason.
+    """
+    removeKernelIdxs = set()
+    removeKernelNames = set()
+    reasons = collections.Counter()
 
     for kernIdx, r in (
         tqdm(enumerate(results)) if globalParameters["PrintLevel"] > 1 else enumerate(results)
@@ -115,50 +197,36 @@ def removeInvalidSolutionsAndKernels(results, kernels, solutions, errorTolerant,
                     )
                 )
                 print(kernels[kernIdx]["SolutionNameMin"])
-            removeKernels.append(kernels[kernIdx])
-            kName = Solution.getKeyNoInternalArgs(kernels[kernIdx])
-            if kName not in removeKernelNames:
-                removeKernelNames.append(kName)
-            removeResults.append(results[kernIdx])
+            removeKernelIdxs.add(kernIdx)
+            removeKernelNames.add(Solution.getKeyNoInternalArgs(kernels[kernIdx]))
+            reasons[_KERNEL_ERROR_REASONS.get(r.err, f"error code {r.err}")] += 1
 
-    if len(removeKernels) > 0 and not errorTolerant:
+    if len(removeKernelIdxs) > 0 and not errorTolerant:
         printExit("** kernel generation failure **")
 
-    for kern in removeKernels:
-        kernels.remove(kern)
-
-    for solution in (
-        tqdm(solutions, "Finding invalid solutions")
-        if globalParameters["PrintLevel"] > 1
-        else solutions
-    ):
-        solutionKernels = solution.getKernels()
-        for kernel in solutionKernels:
-            kName = Solution.getKeyNoInternalArgs(kernel)
-            if kName in removeKernelNames:
-                removeSolutions.append(solution)
-                break
-
-    for solut in removeSolutions:
-        solutions.remove(solut)
-
-    for rel in removeResults:
-        results.remove(rel)
+    if not removeKernelIdxs:
+        return
 
+    kernels[:] = [k for i, k in enumerate(kernels) if i not in removeKernelIdxs]
+    results[:] = [r for i, r in enumerate(results) if i not in removeKernelIdxs]
 
-def writeAssembly(asmPath: Union[Path, str], result: KernelCodeGenResult):
-    if result.err:
-        printExit(f"Failed to build kernel {result.name} because it has error code {result.err}")
-    path = Path(asmPath) / f"{result.name}.s"
-    isa = result.isa
-    wfsize = result.wavefrontSize
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(result.src)
-
-    # result.src is very large so let garbage collector know to clean up
-    del result
+    numSolutions = len(solutions)
+    solutions[:] = [
+        solution
+        for solution in (
+            tqdm(solutions, "Finding invalid solutions")
+            if globalParameters["PrintLevel"] > 1
+            else solutions
+        )
+        if not any(
+            Solution.getKeyNoInternalArgs(kernel) in removeKernelNames
+            for kernel in solution.getKernels()
+        )
+    ]
 
-    return path, isa, wfsize
+    for reason, count in sorted(reasons.items()):
+        print1(f"Removed {count} kernels: {reason}")
+    print1(f"Removed {numSolutions - len(solutions)} solutions using removed kernels")
 
 
 def writeHelpers(
@@ -231,28 +299,37 @@ def writeSolutionsAndKernels(
     numAsmKernels = len(asmKernels)
     numKernels = len(asmKernels)
     assert numKernels == numAsmKernels, "Only assembly kernels are supported in TensileLite"
-    asmIter = zip(
-        itertools.repeat(kernelWriterAssembly), itertools.repeat(TensileInstructions()), asmKernels
+
+    def processWriteAndAssemble(kernel):
+        """Generates, writes and assembles a kernel in one task.
+
+        Only the result record without the assembly source is sent back so that the
+        memory held for a kernel is released as soon as its task completes.
+        """
+        if kernel.duplicate:
+            return processKernelSource(kernelWriterAssembly, TensileInstructions(), kernel)
+        result = writeKernelSource(
+            kernelWriterAssembly, TensileInstructions(), kernel, assemblyTmpPath
+        )
+        if result.err == 0:
+            p = Path(assemblyTmpPath) / f"{result.name}.s"
+            asmToolchain.assemble(
+                str(p), str(p.with_suffix(".o")), isaToGfx(result.isa), result.wavefrontSize
+            )
+        return result
+
+    asmResults = ParallelMapByCost(
+        processWriteAndAssemble,
+        asmKernels,
+        estimateKernelCost,
+        "Generating assembly kernels",
+        multiArg=False,
+        procs=globalParameters["MaxInFlightKernels"],
     )
-    asmResults = ParallelMap2(processKernelSource, asmIter, "Generating assembly kernels")
     removeInvalidSolutionsAndKernels(
         asmResults, asmKernels, solutions, errorTolerant, globalParameters
     )
 
-    def assemble(ret):
-        p, isa, wavefrontsize = ret
-        asmToolchain.assemble(str(p), str(p.with_suffix(".o")), isaToGfx(isa), wavefrontsize)
-
-    unaryWriteAssembly = functools.partial(writeAssembly, assemblyTmpPath)
-    compose = lambda *F: functools.reduce(lambda f, g: lambda x: f(g(x)), F)
-    ret = ParallelMap2(
-        compose(assemble, unaryWriteAssembly),
-        asmResults,
-        "Writing assembly kernels",
-        return_as="list",
-        multiArg=False,
-    )
-
     writeHelpers(outputPath, kernelHelperObjs, KERNEL_HELPER_FILENAME_CPP, KERNEL_HELPER_FILENAME_H)
     srcKernelFile = Path(outputPath) / "Kernels.cpp"
 
@@ -276,6 +353,7 @@ def writeSolutionsAndKernelsTCL(
     kernelWriterAssembly,
     compress=True,
     fromTensile=False,
+    cache: Optional[KernelCache] = None,
 ):
 
     outputPath = Path(outputPath)
@@ -305,20 +383,41 @@ def writeSolutionsAndKernelsTCL(
     uniqueAsmKernels = [k for k in asmKernels if not k.duplicate]
 
     def assemble(ret):
-        p, isa, wavefrontsize = ret
-        asmToolchain.assemble(str(p), str(p.with_suffix(".o")), isaToGfx(isa), wavefrontsize)
-
-    unaryProcessKernelSource = functools.partial(
-        processKernelSource, kernelWriterAssembly, TensileInstructions()
-    )
-    unaryWriteAssembly = functools.partial(writeAssembly, assemblyTmpPath)
-    compose = lambda *F: functools.reduce(lambda f, g: lambda x: f(g(x)), F)
-    ret = ParallelMap2(
-        compose(assemble, unaryWriteAssembly, unaryProcessKernelSource),
+        """Assembles a kernel, returns (cacheKey, objectFromCache)."""
+        p, isa, wavefrontsize, cacheKey = ret
+        objPath = p.with_suffix(".o")
+        if cacheKey is not None and cache.fetchObject(cacheKey, objPath):
+            return cacheKey, True
+        asmToolchain.assemble(str(p), str(objPath), isaToGfx(isa), wavefrontsize)
+        if cacheKey is not None:
+            cache.storeObject(cacheKey, objPath)
+        return cacheKey, False
+
+    def processAndTrack(kernel):
+        result = writeKernelSource(
+            kernelWriterAssembly, TensileInstructions(), kernel, assemblyTmpPath, cache
+        )
+        if result.err:
+            printExit(f"Failed to build kernel {result.name} because it has error code {result.err}")
+        path = Path(assemblyTmpPath) / f"{result.name}.s"
+        cacheKey, objectHit = assemble((path, result.isa, result.wavefrontSize, result.cacheKey))
+        return result.cacheHit, objectHit
+
+    ret = ParallelMapByCost(
+        processAndTrack,
         uniqueAsmKernels,
+        estimateKernelCost,
         "Generating assembly kernels",
         multiArg=False,
+        procs=globalParameters["MaxInFlightKernels"],
     )
+
+    if cache is not None:
+        hits = sum(1 for sourceHit, _ in ret if sourceHit)
+        objectHits = sum(1 for _, objectHit in ret if objectHit)
+        evicted, size = cache.prune()
+        stats = KernelCacheStats(hits, len(ret) - hits, objectHits, evicted, size)
+        print1(f"# Kernel cache ({cache.path}): {stats}")
     buildAssemblyCodeObjectFiles(
         asmToolchain, asmKernels, kernelWriterAssembly, destLibPath, assemblyTmpPath, compress
     )
@@ -404,8 +503,15 @@ def generateLogicDataAndSolutions(logicFiles, args, cxxCompiler):
     solutions = []
     masterLibraries = {}
     nextSolIndex = 0
-
-    fIter = zip(logicFiles, itertools.repeat(cxxCompiler), itertools.repeat(archs))
+    numLoaded = 0
+    numReused = 0
+
+    fIter = zip(
+        logicFiles,
+        itertools.repeat(cxxCompiler),
+        itertools.repeat(archs),
+        itertools.repeat(args["LogicCachePath"]),
+    )
 
     def libraryIter(lib: MasterSolutionLibrary):
         if len(lib.solutions):
@@ -418,11 +524,14 @@ def generateLogicDataAndSolutions(logicFiles, args, cxxCompiler):
     for library in ParallelMap2(
         LibraryIO.parseLibraryLogicFile, fIter, "Loading Logics...", return_as="generator_unordered"
     ):
-        _, architectureName, _, _, _, newLibrary = library
+        _, architectureName, _, logicSolutions, _, newLibrary = library
 
         if architectureName == "":
             continue
 
+        numLoaded += len(logicSolutions)
+        numReused += sum(1 for s in logicSolutions if s.derivedParametersReused)
+
         if architectureName in masterLibraries:
             nextSolIndex = masterLibraries[architectureName].merge(newLibrary, nextSolIndex)
         else:
@@ -476,6 +585,10 @@ def generateLogicDataAndSolutions(logicFiles, args, cxxCompiler):
 
     print1(f"Number of solutions parsed: {numSoln}")
     print1(f"Number of unique solutions: {len(solutions)}")
+    print1(
+        f"Derived parameters: {numReused} verified by fingerprint, "
+        f"{numLoaded - numReused} recomputed"
+    )
 
     return solutions, masterLibraries
 
@@ -581,6 +694,10 @@ def run():
 
     copyStaticFiles(outputPath)
 
+    kernelCache = None
+    if arguments["KernelCachePath"]:
+        kernelCache = KernelCache(arguments["KernelCachePath"], arguments["KernelCacheMaxSize"])
+
     numKernels = writeSolutionsAndKernelsTCL(
         outputPath,
         asmToolchain,
@@ -589,6 +706,7 @@ def run():
         kernelHelperObjs,
         kernelWriterAssembly,
         compress=arguments["UseCompression"],
+        cache=kernelCache,
     )
 
     archs = [
@@ -598,6 +716,7 @@ def run():
     ]
     newLibraryDir = ensurePath(os.path.join(outputPath, "library"))
 
+    libraryFiles = []
     for archName, newMasterLibrary in masterLibraries.items():
         if archName in archs:
             if globalParameters["LazyLibraryLoading"]:
@@ -605,11 +724,12 @@ def run():
             else:
                 masterFile = os.path.join(newLibraryDir, "TensileLibrary_" + archName)
             newMasterLibrary.applyNaming(kernelMinNaming)
-            LibraryIO.write(masterFile, state(newMasterLibrary), arguments["LibraryFormat"])
+            libraryFiles.append((masterFile, newMasterLibrary))
             for name, lib in newMasterLibrary.lazyLibraries.items():
                 filename = os.path.join(newLibraryDir, name)
                 lib.applyNaming(kernelMinNaming)
-                LibraryIO.write(filename, state(lib), arguments["LibraryFormat"])
+                libraryFiles.append((filename, lib))
+    LibraryIO.writeStates(libraryFiles, arguments["LibraryFormat"])
 
     if not globalParameters["KeepBuildTmp"]:
         buildTmp = Path(arguments["OutputPath"]).parent / "library" / "build_tmp"
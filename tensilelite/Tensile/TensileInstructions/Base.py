@@ -20,9 +20,11 @@
 # CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 ################################################################################
 
+import gc
 import pickle
 import threading
 
+from contextlib import contextmanager
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import Tuple
@@ -31,9 +33,40 @@ from ..Common import initAsmCaps, initArchCaps, initRegisterCaps, initAsmBugs
 from .Formatting import __TI_DEBUG_LEVEL__, printExit
 
 
+@contextmanager
+def _gcPaused():
+    # Pauses the cyclic GC and restores its previous state on exit
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gcEnabled:
+            gc.enable()
+
+def _pickleCopy(x):
+    # The copy allocates a whole instruction tree at once, do not let it trigger
+    # collections of the rest of the kernel being generated.
+    with _gcPaused():
+        return pickle.loads(pickle.dumps(x))
+
 def fastdeepcopy(x):
     # Note: Some object can't be pickled
-    return pickle.loads(pickle.dumps(x))
+    if isinstance(x, Item):
+        # Copy the item without the module it is attached to, the copy keeps
+        # pointing at the same parent instead of a copy of the whole parent tree.
+        parent = x.parent
+        x.parent = ""
+        try:
+            result = _pickleCopy(x)
+        finally:
+            x.parent = parent
+        result.parent = parent
+        return result
+    return _pickleCopy(x)
+
+# memo key of the Item parent links waiting for their parent to be copied
+_PARENT_LINKS = object()
 
 class TensileInstructions:
 
@@ -139,13 +172,33 @@ class Item:
         self.name = name
 
     def __deepcopy__(self, memo):
+        # The parent is not copied through this link: it points to the copy of
+        # the parent if that is copied along with the item, otherwise it is shared.
+        pending = memo.setdefault(_PARENT_LINKS, {})
         cls = self.__class__
         result = cls.__new__(cls)
         memo[id(self)] = result
+        for child in pending.pop(id(self), ()):
+            child.parent = result
         for k, v in self.__dict__.items():
-            setattr(result, k, deepcopy(v, memo))
+            if k == "parent" and isinstance(v, Item):
+                if id(v) in memo:
+                    v = memo[id(v)]
+                else:
+                    pending.setdefault(id(v), []).append(result)
+                setattr(result, k, v)
+            else:
+                setattr(result, k, deepcopy(v, memo))
         return result
 
+    def emit(self, writer) -> None:
+        """
+        Writes the text of the item to writer, any object with a write(str) method.
+        Containers override this to emit their items one by one instead of building
+        their whole text first.
+        """
+        writer.write(str(self))
+
     @property
     def asmCaps(self) -> dict:
         return _global_ti.getAsmCaps()
@@ -185,7 +238,6 @@ def getSlcBitName(hasGLCModifier):
     return "slc"
   return "sc1"
 
-def _removeIdent(isaDict) -> list:
-    ids = [th.ident for th in threading.enumerate()]
-    isaDict = [id for id in isaDict if id in ids]
-    return isaDict
+def _removeIdent(isaDict) -> dict:
+    ids = {th.ident for th in threading.enumerate()}
+    return {t: info for t, info in isaDict.items() if t in ids}
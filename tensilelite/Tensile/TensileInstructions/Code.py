@@ -157,6 +157,14 @@ class Module(Item):
         s = "".join(str(x) for x in self.itemList)
         return "".join((prefix, s, suffix))
 
+    def emit(self, writer) -> None:
+        if printModuleNames:
+            writer.write(f"// {self.name}{{\n")
+        for x in self.itemList:
+            x.emit(writer)
+        if printModuleNames:
+            writer.write(f"// }} {self.name}\n")
+
     def addSpaceLine(self):
         self.itemList.append(TextBlock("\n"))
 
@@ -911,3 +919,8 @@ class KernelBody(Item):
         kStr += str(self.signature)
         kStr += str(self.body)
         return kStr
+
+    def emit(self, writer) -> None:
+        writer.write(str(TextBlock(block3Line("Begin Kernel"))))
+        writer.write(str(self.signature))
+        self.body.emit(writer)
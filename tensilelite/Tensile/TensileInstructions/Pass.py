@@ -72,10 +72,20 @@ def getAssignmentDict(module):
     return assignmentDict
 
 def buildGraph(module, vgprMax, sgprMax, assignmentDict):
+    """
+    Builds the sparse register graph of module.
+
+    graph["v"], graph["s"] and graph["m"] map a register index to the (segment, item)
+    pairs of the instructions accessing the register, in program order. Branches, labels,
+    waits and barriers are recorded once in graph["boundaries"]; the segment of an item
+    is the number of boundaries preceding it.
+    """
     graph = dict()
-    graph["v"] = [[] for _ in range(vgprMax)]
-    graph["s"] = [[] for _ in range(sgprMax)]
-    graph["m"] = [[] for _ in range(1)]
+    graph["v"] = dict()
+    graph["s"] = dict()
+    graph["m"] = dict()
+    graph["size"] = {"v": vgprMax, "s": sgprMax, "m": 1}
+    graph["boundaries"] = []
     _recordGraph(module, graph, assignmentDict)
     return graph
 
@@ -110,43 +120,77 @@ def _getAssignmentDictIter(module, assignmentDict):
                 num = item.value
             assignmentDict[item.name] = num
 
+# Role of an item type in the register graph, cached per type by _graphItemKind
+_GRAPH_MODULE, _GRAPH_REGS, _GRAPH_BOUNDARY, _GRAPH_NONE = range(4)
+_graphItemKinds = dict()
+
+def _graphItemKind(item):
+    kind = _graphItemKinds.get(type(item))
+    if kind is None:
+        if isinstance(item, Module):
+            kind = _GRAPH_MODULE
+        elif isinstance(item, (CommonInstruction, ReadWriteInstruction, MacroInstruction)):
+            kind = _GRAPH_REGS
+        elif isinstance(item, (BranchInstruction, Label, _SWaitCnt, _SWaitCntVscnt, \
+                            SEndpgm, SBarrier, SNop, SSleep)):
+            kind = _GRAPH_BOUNDARY
+        else:
+            kind = _GRAPH_NONE
+        _graphItemKinds[type(item)] = kind
+    return kind
+
 def _addRegToGraph(item, assignmentDict, params: list, graph, noOpt):
+    segment = len(graph["boundaries"])
     for p in params:
         if isinstance(p, RegisterContainer):
-            _setName2RegNum(p, assignmentDict)
+            if p.regIdx == None and p.regName:
+                _setName2RegNum(p, assignmentDict)
             if p.regType == "acc":
                 continue
+            regGraph = graph[p.regType]
+            regMax = graph["size"][p.regType]
             for i in range(p.regIdx, p.regIdx + p.regNum):
-                if graph[p.regType][i] and graph[p.regType][i][-1] == item:
+                if i >= regMax:
+                    raise IndexError("%s%d exceeds the %d allocated registers" % (p.regType, i, regMax))
+                itemList = regGraph.get(i)
+                if itemList is None:
+                    itemList = regGraph[i] = []
+                elif itemList[-1][1] is item:
                     continue
-                # print("[%s] Index %d %d" %(p.regType, i, len(graph[p.regType])))
                 if noOpt:
-                    graph[p.regType][i].append(NoOptItem(item))
+                    itemList.append((segment, NoOptItem(item)))
                 else:
-                    graph[p.regType][i].append(item)
+                    itemList.append((segment, item))
 
 def _recordGraph(module, graph, assignmentDict):
     for item in module.items():
-        if isinstance(item, Module):
+        kind = _graphItemKind(item)
+        if kind == _GRAPH_MODULE:
             _recordGraph(item, graph, assignmentDict)
-        elif isinstance(item, (CommonInstruction, ReadWriteInstruction, MacroInstruction)):
+        elif kind == _GRAPH_REGS:
             _addRegToGraph(item, assignmentDict, item.getParams(), graph, module.isNoOpt())
-        elif isinstance(item, (BranchInstruction, Label, _SWaitCnt, _SWaitCntVscnt, \
-                            SEndpgm, SBarrier, SNop, SSleep)):
-            for i in range(len(graph["v"])):
-                graph["v"][i].append(item)
-            for i in range(len(graph["s"])):
-                graph["s"][i].append(item)
+        elif kind == _GRAPH_BOUNDARY:
+            graph["boundaries"].append(item)
 
 # Currently only removes s_mov_b32, does not support 2 sgpr at lvalue
 def _removeDuplicateAssignmentGPR(graph, regType):
-    for idx, sList in enumerate(graph[regType]):
+    # Number of boundaries invalidating the assigned values before each segment
+    resets = [0]
+    for item in graph["boundaries"]:
+        isReset = isinstance(item, (BranchInstruction, Label, _SWaitCnt, _SWaitCntVscnt))
+        resets.append(resets[-1] + isReset)
+
+    for idx in sorted(graph[regType]):
+        sList = graph[regType][idx]
         assignValue = None
+        lastSegment = 0
         newList = []
-        for item in sList:
+        for segment, item in sList:
+            if resets[segment] != resets[lastSegment]:
+                assignValue = None
+            lastSegment = segment
             isRemoved = False
-            if isinstance(item, (NoOptItem, BranchInstruction, Label, MacroInstruction, \
-                                _SWaitCnt, _SWaitCntVscnt)):
+            if isinstance(item, (NoOptItem, MacroInstruction)):
                assignValue = None
             # FIXME: Need refactor.
             elif isinstance(item, SMovB32):
@@ -175,7 +219,7 @@ def _removeDuplicateAssignmentGPR(graph, regType):
                                 assignValue = None
                                 break
             if not isRemoved:
-                newList.append(item)
+                newList.append((segment, item))
 
         if len(newList) != len(sList):
             graph["s"][idx] = newList
@@ -202,22 +246,12 @@ def _setName2RegNum(gpr, assignmentDict):
 
 def _graphDebugSaveToTxt(graph, kernelName):
     f = open('%s.txt' % kernelName, 'w')
-    f.write("VGPR\n")
-    i = 0
-    for d in graph["v"]:
-        f.write("[%d]\n" % i)
-        for dd in d:
-            ss = str(dd)
-            f.write(ss)
-        f.write("\n")
-        i += 1
-    i = 0
-    f.write("SGPR\n")
-    for d in graph["s"]:
-        f.write("[%d]\n" % i)
-        for dd in d:
-            ss = str(dd)
-            f.write(ss)
-        f.write("\n")
-        i += 1
+    for regType, title in (("v", "VGPR"), ("s", "SGPR")):
+        f.write("%s\n" % title)
+        for i in sorted(graph[regType]):
+            f.write("[%d]\n" % i)
+            for segment, dd in graph[regType][i]:
+                ss = "(%d) %s" % (segment, str(dd))
+                f.write(ss)
+            f.write("\n")
     f.close()
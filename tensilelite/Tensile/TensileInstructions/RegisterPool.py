@@ -51,14 +51,16 @@ class RegisterPool:
     Available = 1
     InUse = 2
 
-  class Register:
-    def __init__(self, status, tag):
-      self.status = status
-      self.tag = tag
-
   class ResourceOverflowException(Exception):
     pass
 
+  # Register states are kept in a bytearray holding the Status values, so that runs of
+  # available registers can be searched with bytearray.find and snapshots are cheap.
+  _UNAVAILABLE = Status.Unavailable.value
+  _AVAILABLE = Status.Available.value
+  _INUSE = Status.InUse.value
+  _STATE_CHARS = bytes.maketrans(b"\x00\x01\x02", b".|#")
+
   ########################################
   # Init
   # defaultPreventOverflow: control behavior of checkout and checkoutAligned when preventOverflow is not explicitly specificed.
@@ -66,12 +68,36 @@ class RegisterPool:
     self.printRP=printRP
     self.type = type
     self.defaultPreventOverflow = defaultPreventOverflow
-    self.pool = [self.Register(RegisterPool.Status.Unavailable, "init") for i in range(0,size)]
+    self.status = bytearray(size)
+    self.tags = ["init"] * size
     self.checkOutSize = {}
     self.checkOutSizeTemp = {}
     self.occupancyLimitSize    = 0
     self.occupancyLimitMaxSize = 0
 
+  def __deepcopy__(self, memo):
+    cls = self.__class__
+    result = cls.__new__(cls)
+    memo[id(self)] = result
+    result.__dict__.update(self.__dict__)
+    result.status = bytearray(self.status)
+    result.tags = list(self.tags)
+    result.checkOutSize = dict(self.checkOutSize)
+    result.checkOutSizeTemp = {k: list(v) for k, v in self.checkOutSizeTemp.items()}
+    return result
+
+  ########################################
+  # Register state of the pool
+  def getStatus(self, i) -> Status:
+    return RegisterPool.Status(self.status[i])
+
+  def getTag(self, i) -> str:
+    return self.tags[i]
+
+  def appendAvailable(self, size, tag=""):
+    self.status.extend(bytes([self._AVAILABLE]) * size)
+    self.tags.extend([tag] * size)
+
   #######################################
   # Set occupancy limit
   def setOccupancyLimit(self, maxSize, size):
@@ -100,21 +126,21 @@ class RegisterPool:
     if self.printRP:
       print("RP::add(%u..%u for '%s')"%(start,start+size-1,tag))
     newSize = start + size
-    oldSize = len(self.pool)
+    oldSize = len(self.status)
     if newSize > oldSize:
-      for i in range(0, newSize-oldSize):
-        self.pool.append(self.Register(RegisterPool.Status.Unavailable,tag))
+      self.status.extend(bytes(newSize-oldSize))
+      self.tags.extend([tag] * (newSize-oldSize))
     # mark as available
     for i in range(start, start+size):
-      if self.pool[i].status == RegisterPool.Status.Unavailable:
-        self.pool[i].status = RegisterPool.Status.Available
-        self.pool[i].tag = tag
-      elif self.pool[i].status == RegisterPool.Status.Available:
-        printWarning("RegisterPool::add(%u,%u) pool[%u](%s) already available" % (start, start+size-1, i, self.pool[i].tag))
-      elif self.pool[i].status == RegisterPool.Status.InUse:
-        printWarning("RegisterPool::add(%u,%u) pool[%u](%s) already in use" % (start, start+size-1, i, self.pool[i].tag))
+      if self.status[i] == self._UNAVAILABLE:
+        self.status[i] = self._AVAILABLE
+        self.tags[i] = tag
+      elif self.status[i] == self._AVAILABLE:
+        printWarning("RegisterPool::add(%u,%u) pool[%u](%s) already available" % (start, start+size-1, i, self.tags[i]))
+      elif self.status[i] == self._INUSE:
+        printWarning("RegisterPool::add(%u,%u) pool[%u](%s) already in use" % (start, start+size-1, i, self.tags[i]))
       else:
-        raise RuntimeError("RegisterPool::add(%u,%u) pool[%u](%s) = %s" % (start, start+size-1, i, self.pool[i].tag, self.pool[i].status))
+        raise RuntimeError("RegisterPool::add(%u,%u) pool[%u](%s) = %s" % (start, start+size-1, i, self.tags[i], self.getStatus(i)))
     if self.printRP:
       print(self.state())
 
@@ -123,15 +149,15 @@ class RegisterPool:
     if start in self.checkOutSize:
       size = self.checkOutSize[start]
       for i in range(start, start+size):
-        if self.pool[i].status != RegisterPool.Status.InUse:
-          raise RuntimeError("RegisterPool::addFromCheckOut('%s',%s) is not in InUse state"%(self.pool[start].tag, start))
-        self.pool[i].status = RegisterPool.Status.Available
-      self.checkOutSizeTemp[start] = [size, self.pool[start].tag]
+        if self.status[i] != self._INUSE:
+          raise RuntimeError("RegisterPool::addFromCheckOut('%s',%s) is not in InUse state"%(self.tags[start], start))
+        self.status[i] = self._AVAILABLE
+      self.checkOutSizeTemp[start] = [size, self.tags[start]]
       self.checkOutSize.pop(start)
       if self.printRP:
-        print("RP::addFromCheckOut('%s') @ %u +%u"%(self.pool[start].tag, start,size))
+        print("RP::addFromCheckOut('%s') @ %u +%u"%(self.tags[start], start,size))
     else:
-      raise RuntimeError("RegisterPool::addFromCheckOut('%s',%s) but it was never checked out"%(self.pool[start].tag, start))
+      raise RuntimeError("RegisterPool::addFromCheckOut('%s',%s) but it was never checked out"%(self.tags[start], start))
 
   ########################################
   # Remove
@@ -141,72 +167,64 @@ class RegisterPool:
       print("RP::remove(%u..%u) for %s"%(start,start+size-1,tag))
     # reserve space
     newSize = start + size
-    oldSize = len(self.pool)
+    oldSize = len(self.status)
     if newSize > oldSize:
       printWarning("RegisterPool::remove(%u,%u) but poolSize=%u" % (start, start+size-1, oldSize))
     # mark as unavailable
     for i in range(start, start+size):
-      if  self.pool[i].status == RegisterPool.Status.Available:
-        self.pool[i].status = RegisterPool.Status.Unavailable
-      elif self.pool[i].status == RegisterPool.Status.Unavailable:
-        printWarning("RegisterPool::remove(%u,%u) pool[%u](%s) already unavailable" % (start, start+size-1, i, self.pool[i].tag))
-      elif  self.pool[i].status == RegisterPool.Status.InUse:
-        printWarning("RegisterPool::remove(%u,%u) pool[%u](%s) still in use" % (start, start+size-1, i, self.pool[i].tag))
+      if  self.status[i] == self._AVAILABLE:
+        self.status[i] = self._UNAVAILABLE
+      elif self.status[i] == self._UNAVAILABLE:
+        printWarning("RegisterPool::remove(%u,%u) pool[%u](%s) already unavailable" % (start, start+size-1, i, self.tags[i]))
+      elif  self.status[i] == self._INUSE:
+        printWarning("RegisterPool::remove(%u,%u) pool[%u](%s) still in use" % (start, start+size-1, i, self.tags[i]))
       else:
-        printExit("RegisterPool::remove(%u,%u) pool[%u](%s) = %s" % (start, start+size-1, i, self.pool[i].tag, self.pool[i].status))
+        printExit("RegisterPool::remove(%u,%u) pool[%u](%s) = %s" % (start, start+size-1, i, self.tags[i], self.getStatus(i)))
 
   # Removes registers from the pool so they cannot be subsequently allocated for tmps
   def removeFromCheckOut(self, start):
     if start in self.checkOutSizeTemp:
       size, tag = self.checkOutSizeTemp[start]
       for i in range(start, start+size):
-        if self.pool[i].status != RegisterPool.Status.Available:
-          raise RuntimeError("RegisterPool::addFromCheckOut('%s',%s) is not in Available state"%(self.pool[start].tag, start))
-        self.pool[i].status = RegisterPool.Status.InUse
-        self.pool[i].tag = tag
+        if self.status[i] != self._AVAILABLE:
+          raise RuntimeError("RegisterPool::addFromCheckOut('%s',%s) is not in Available state"%(self.tags[start], start))
+        self.status[i] = self._INUSE
+        self.tags[i] = tag
       self.checkOutSize[start] = size
       self.checkOutSizeTemp.pop(start)
       if self.printRP:
-        print("RegisterPool::removeFromCheckOut('%s') @ %u +%u"%(self.pool[start].tag, start,size))
+        print("RegisterPool::removeFromCheckOut('%s') @ %u +%u"%(self.tags[start], start,size))
     else:
-      raise RuntimeError("RegisterPool::removeFromCheckOut('%s',%s) but it was never checked out"%(self.pool[start].tag, start))
+      raise RuntimeError("RegisterPool::removeFromCheckOut('%s',%s) but it was never checked out"%(self.tags[start], start))
 
   ########################################
   # Check Out
   def checkOut(self, size, tag="_untagged_", preventOverflow=-1):
     return self.checkOutAligned(size, 1, tag, preventOverflow)
 
+  # First aligned start of size available registers, -1 if there is none
+  def _findAvailable(self, size, alignment):
+    run = bytes([self._AVAILABLE]) * size
+    i = self.status.find(run)
+    while i > -1:
+      aligned = roundUpToNearestMultiple(i, alignment)
+      if aligned == i:
+        return i
+      # no aligned run can start between i and aligned
+      i = self.status.find(run, aligned)
+    return -1
+
   def checkOutAligned(self, size, alignment, tag="_untagged_aligned_", preventOverflow=-1):
     if preventOverflow == -1:
       preventOverflow = self.defaultPreventOverflow
     assert(size > 0)
-    found = -1
-    for i in range(0, len(self.pool)):
-      # alignment
-      if i % alignment != 0:
-        continue
-      # enough space
-      if i + size > len(self.pool):
-        continue
-      # all available
-      allAvailable = True
-      for j in range(0, size):
-        if self.pool[i+j].status != RegisterPool.Status.Available:
-          allAvailable = False
-          i = j+1
-          break
-      if allAvailable:
-        found = i
-        break
-      else:
-        continue
+    found = self._findAvailable(size, alignment)
 
     # success without overflowing
     if found > -1:
       #print "Found: %u" % found
-      for i in range(found, found+size):
-        self.pool[i].status = RegisterPool.Status.InUse
-        self.pool[i].tag = tag
+      self.status[found:found+size] = bytes([self._INUSE]) * size
+      self.tags[found:found+size] = [tag] * size
       self.checkOutSize[found] = size
       if self.printRP:
         print("RP::checkOut '%s' (%u,%u) @ %u avail=%u"%(tag, size,alignment, found, self.available()))
@@ -215,16 +233,11 @@ class RegisterPool:
     # need overflow
     else:
       #print "RegisterPool::checkOutAligned(%u,%u) overflowing past %u" % (size, alignment, len(self.pool))
-      # where does tail sequence of available registers begin
+      # where does tail sequence of available registers begin, never before register 1
       assert (not preventOverflow)
-      start = len(self.pool)
-      for i in range(len(self.pool)-1, 0, -1):
-        if self.pool[i].status == RegisterPool.Status.Available:
-          self.pool[i].tag = tag
-          start = i
-          continue
-        else:
-          break
+      oldSize = len(self.status)
+      start = max(len(self.status.rstrip(bytes([self._AVAILABLE]))), 1) if oldSize > 1 else oldSize
+      self.tags[start:oldSize] = [tag] * (oldSize-start)
       #print "Start: ", start
       # move forward for alignment
 
@@ -232,22 +245,19 @@ class RegisterPool:
       #print "Aligned Start: ", start
       # new checkout can begin at start
       newSize = start + size
-      oldSize = len(self.pool)
       if self.occupancyLimitSize > 0:
         if newSize > self.occupancyLimitSize and newSize <= self.occupancyLimitMaxSize:
           print("newSize", newSize, "OldSIze", oldSize, "Limit", self.occupancyLimitSize)
           assert self.occupancyLimitSize >= newSize
       overflow = newSize - oldSize
       #print "Overflow: ", overflow
-      for i in range(start, len(self.pool)):
-        self.pool[i].status = RegisterPool.Status.InUse
-        self.pool[i].tag = tag
-      for i in range(0, overflow):
-        if len(self.pool) < start:
-          # this is padding to meet alignment requirements
-          self.pool.append(self.Register(RegisterPool.Status.Available,tag))
-        else:
-          self.pool.append(self.Register(RegisterPool.Status.InUse,tag))
+      if start < oldSize:
+        self.status[start:oldSize] = bytes([self._INUSE]) * (oldSize-start)
+        self.tags[start:oldSize] = [tag] * (oldSize-start)
+      # padding to meet alignment requirements
+      padding = min(max(start-oldSize, 0), max(overflow, 0))
+      self.status.extend(bytes([self._AVAILABLE]) * padding + bytes([self._INUSE]) * (overflow-padding))
+      self.tags.extend([tag] * max(overflow, 0))
       self.checkOutSize[start] = size
       if self.printRP:
         print(self.state())
@@ -266,18 +276,17 @@ class RegisterPool:
       for sIdx, s in enumerate(sizes):
         idxVec.append(idx)
         self.checkOutSize[idx] = s
-        for i in range(idx, idx+s):
-          self.pool[i].tag = tags[sIdx]
+        self.tags[idx:idx+s] = [tags[sIdx]] * s
         idx += s
       return idxVec
 
   def initTmps(self, initValue, start=0, stop=-1):
     module = Module("initTmps from RegisterPool")
-    stop= len(self.pool) if stop== -1 or stop>len(self.pool) else stop+1
+    stop= len(self.status) if stop== -1 or stop>len(self.status) else stop+1
     for i in range(start, stop):
       #if self.type == 's':
-      #  print i, self.pool[i].status
-      if self.pool[i].status==RegisterPool.Status.Available:
+      #  print i, self.getStatus(i)
+      if self.status[i]==self._AVAILABLE:
         if self.type == 's':
           module.add(SMovB32(dst=sgpr(i), src=hex(initValue), comment="init tmp in pool"))
         elif self.type == 'v':
@@ -292,99 +301,74 @@ class RegisterPool:
   def checkIn(self, start):
     if start in self.checkOutSize:
       size = self.checkOutSize[start]
-      for i in range(start, start+size):
-        self.pool[i].status = RegisterPool.Status.Available
+      self.status[start:start+size] = bytes([self._AVAILABLE]) * size
       self.checkOutSize.pop(start)
       if self.printRP:
-        print("RP::checkIn('%s') @ %u +%u"%(self.pool[start].tag, start,size))
+        print("RP::checkIn('%s') @ %u +%u"%(self.tags[start], start,size))
     else:
       if 0:
         traceback.print_stack(None)
         import pdb; pdb.set_trace()
-      printWarning("RegisterPool::checkIn('%s',%s) but it was never checked out"%(self.pool[start].tag, start))
+      printWarning("RegisterPool::checkIn('%s',%s) but it was never checked out"%(self.tags[start], start))
     #traceback.print_stack(None)
 
   ########################################
   # Size
   def size(self):
-    return len(self.pool)
+    return len(self.status)
 
 
   ########################################
   # Number of available registers
   def available(self):
-    numAvailable = 0
-    for s in self.pool:
-      if s.status == RegisterPool.Status.Available:
-        numAvailable += 1
-    return numAvailable
+    return self.status.count(self._AVAILABLE)
 
   ########################################
   # Size of registers of at least specified blockSize
   def availableBlock(self, blockSize, align):
-    if blockSize ==0:
-      blockSize = 1
-    blocksAvail = 0
-    consecAvailable = 0
-    #for s in self.pool:
-    for i in range(0, len(self.pool)):
-      s = self.pool[i]
-      if s.status == RegisterPool.Status.Available:
-        if not (consecAvailable == 0 and i % align != 0):
-          # do not increment if the first item is not aligned
-          consecAvailable += 1
-      else:
-        blocksAvail += consecAvailable // blockSize
-        consecAvailable = 0
-    blocksAvail += consecAvailable // blockSize
-    #print self.state()
-    #print "available()=", self.available(), "availableBlock()=",maxAvailable
-    return blocksAvail * blockSize
+    return self.availableBlockMaxVgpr(len(self.status), blockSize, align)
 
   # Size of registers of at least specified blockSize
   def availableBlockMaxVgpr(self, maxVgpr, blockSize, align):
     if blockSize ==0:
       blockSize = 1
     blocksAvail = 0
-    consecAvailable = 0
-    #for s in self.pool:
-    for i in range(0, maxVgpr):
-      if i >= len(self.pool) :
-        if not (consecAvailable == 0 and i % align != 0):
-          consecAvailable += 1
-      else:
-        s = self.pool[i]
-        if s.status == RegisterPool.Status.Available:
-          if not (consecAvailable == 0 and i % align != 0):
-            # do not increment if the first item is not aligned
-            consecAvailable += 1
-        else:
-          blocksAvail += consecAvailable // blockSize
-          consecAvailable = 0
-    blocksAvail += consecAvailable // blockSize
+    # registers past the end of the pool count as available
+    status = self.status[:maxVgpr] + bytes([self._AVAILABLE]) * max(maxVgpr - len(self.status), 0)
+    run = bytes([self._AVAILABLE])
+    i = status.find(run)
+    while i > -1:
+      # the first register of a block must be aligned
+      i = roundUpToNearestMultiple(i, align)
+      if i >= maxVgpr:
+        break
+      if status[i] != self._AVAILABLE:
+        i = status.find(run, i)
+        continue
+      end = status.find(bytes([self._UNAVAILABLE]), i)
+      inUse = status.find(bytes([self._INUSE]), i)
+      if end == -1 or (inUse != -1 and inUse < end):
+        end = inUse
+      if end == -1:
+        end = maxVgpr
+      blocksAvail += (end - i) // blockSize
+      i = status.find(run, end)
     #print self.state()
     #print "available()=", self.available(), "availableBlock()=",maxAvailable
     return blocksAvail * blockSize
 
   def availableBlockAtEnd(self):
-    availCnt = 0
-    for s in reversed(self.pool):
-      if s.status == RegisterPool.Status.Available:
-        availCnt += 1
-      else:
-        break
-
-    return availCnt
+    return len(self.status) - len(self.status.rstrip(bytes([self._AVAILABLE])))
 
 
   ########################################
   def checkFinalState(self):
-    for si in range(0,len(self.pool)):
-      if self.pool[si].status == RegisterPool.Status.InUse:
-        if self.printRP:
-          print(self.state())
-        raise RuntimeError("RegisterPool::checkFinalState: temp (%s, '%s') was never checked in." \
-            %(si, self.pool[si].tag))
+    si = self.status.find(self._INUSE)
+    if si > -1:
+      if self.printRP:
+        print(self.state())
+      raise RuntimeError("RegisterPool::checkFinalState: temp (%s, '%s') was never checked in." \
+          %(si, self.tags[si]))
     print2("total vgpr count: %u\n"%self.size())
 
   ########################################
@@ -395,27 +379,22 @@ class RegisterPool:
     for placeValueIdx in range(1, len(placeValues)):
       placeValue = placeValues[placeValueIdx]
       priorPlaceValue = placeValues[placeValueIdx-1]
-      if len(self.pool) >= placeValue:
+      if len(self.status) >= placeValue:
         pvs = "" # place value string
-        for i in range(0, len(self.pool)):
+        for i in range(0, len(self.status)):
           if i % placeValue==0:
             pvs += "%u"%((i%priorPlaceValue)//placeValue)
           else:
             pvs += " "
         stateStr += pvs + "\n"
-    for i in range(0, len(self.pool)):
-      if self.pool[i].status == RegisterPool.Status.Unavailable:
-        stateStr += "." # 'removed', this indicates a fixed assignment from "remove", ie a non-tmp allocation
-      elif self.pool[i].status == RegisterPool.Status.Available:
-        stateStr += "|" # Can be allocated
-      elif self.pool[i].status == RegisterPool.Status.InUse:
-        stateStr += "#" # Checked out
+    # '.' removed, ie a fixed assignment from "remove"; '|' can be allocated; '#' checked out
+    stateStr += self.status.translate(self._STATE_CHARS).decode()
     return stateStr
 
   def stateDetailed(self):
-    for index, register in enumerate(self.pool):
-        print("%u: %s"%(index, register.tag))
-  
+    for index, tag in enumerate(self.tags):
+        print("%u: %s"%(index, tag))
+
   def growPool(self, rangeStart: int, rangeEnd: int, checkOutSize: int, comment: str=""):
     tl = []
     for _ in range(rangeStart, rangeEnd):
@@ -0,0 +1,50 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+from Tensile.Common import Capabilities
+
+
+def test_initAsmCapsUnsupportedNotCached(tmp_path, monkeypatch):
+    monkeypatch.setenv("TENSILE_ASM_CAPS_CACHE", str(tmp_path / "caps"))
+    assembler = tmp_path / "clang"
+    assembler.write_text("")
+    caps = {"SupportedISA": False, "HasMFMA": False}
+    probes = []
+
+    def probe(isaVersion, assemblerPath, isDebug):
+        probes.append(isaVersion)
+        return dict(caps)
+
+    monkeypatch.setattr(Capabilities, "_probeAsmCaps", probe)
+    initAsmCaps = Capabilities.initAsmCaps.__wrapped__
+
+    assert initAsmCaps((9, 4, 2), str(assembler), False) == caps
+    assert not (tmp_path / "caps").exists()
+
+    caps = {"SupportedISA": True, "HasMFMA": True}
+    assert initAsmCaps((9, 4, 2), str(assembler), False) == caps
+    assert len(list((tmp_path / "caps").iterdir())) == 1
+    assert initAsmCaps((9, 4, 2), str(assembler), False) == caps
+    assert len(probes) == 2
@@ -0,0 +1,64 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+from Tensile.TensileCreateLibrary import KernelCache as KernelCacheModule
+from Tensile.TensileCreateLibrary.KernelCache import KernelCache
+
+
+class FakeKernel(dict):
+    def __init__(self, state):
+        super().__init__(state)
+        self._state = state
+
+
+def test_keyFollowsCodegenSources(tmp_path, monkeypatch):
+    root = tmp_path / "Tensile"
+    (root / "TensileInstructions").mkdir(parents=True)
+    writer = root / "KernelWriterAssembly.py"
+    writer.write_text("# writer\n")
+    (root / "TensileInstructions" / "Base.py").write_text("# base\n")
+    monkeypatch.setattr(KernelCacheModule, "ROOT_PATH", str(root))
+
+    cache = KernelCache(tmp_path / "cache")
+    kernel = FakeKernel({"ISA": [9, 4, 2], "MacroTile0": 128, "SolutionIndex": 3})
+
+    def key():
+        KernelCacheModule._codegenDigest.cache_clear()
+        return cache.key(kernel, "Cijk_MT128", "/opt/rocm/llvm/bin/clang++", "19.0")
+
+    try:
+        original = key()
+        assert key() == original
+        kernel._state["SolutionIndex"] = 4
+        assert key() == original
+
+        writer.write_text("# writer, edited\n")
+        edited = key()
+        assert edited != original
+
+        (root / "TensileInstructions" / "Base.py").write_text("# base, edited\n")
+        assert key() != edited
+    finally:
+        KernelCacheModule._codegenDigest.cache_clear()
@@ -0,0 +1,137 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+import json
+import math
+import sys
+
+import pytest
+
+from Tensile import LibraryIO
+from Tensile.Common import state
+
+
+def test_readCSV(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text('GFlops, SizeI,"Total, Flops", s0, s1\n'
+                    '0, 64,"1,024", 1.5,"2.5"\n'
+                    '\n'
+                    '0, 128, 77, nan, -1\n')
+    header, data, strings = LibraryIO.readCSV(str(path), lambda row: [1, 3, 4] if len(row) == 5 else [], (2,))
+    assert header == ["GFlops", " SizeI", "Total, Flops", " s0", " s1"]
+    assert data.shape == (2, 3)
+    assert data[0].tolist() == [64.0, 1.5, 2.5]
+    assert data[1, 0] == 128.0 and math.isnan(data[1, 1]) and data[1, 2] == -1.0
+    assert strings == [["1,024", "77"]]
+
+
+def test_readLogicCache(tmp_path):
+    logic = tmp_path / "logic.yaml"
+    logic.write_text("- {MinimumRequiredVersion: 4.33.0}\n- aquavanjaram\n- gfx942\n")
+    cache = tmp_path / "cache"
+    data = LibraryIO.read(str(logic), True)
+
+    assert LibraryIO.readLogic(str(logic), str(cache)) == data
+    sidecar, = cache.iterdir()
+    assert LibraryIO.readLogic(str(logic), str(cache)) == data
+
+    for corrupt in (b"", b"\x01", b"\xc1", b"\x81\xa7Version"):
+        sidecar.write_bytes(corrupt)
+        assert LibraryIO.readLogic(str(logic), str(cache)) == data
+        assert [p.name for p in cache.iterdir()] == [sidecar.name]
+        assert LibraryIO.readLogic(str(logic), str(cache)) == data
+
+
+def test_writeLogicCacheUnencodable(tmp_path):
+    cacheFile = tmp_path / "cache" / "logic.dat"
+    LibraryIO._writeLogicCache(str(cacheFile), {"Version": LibraryIO.LOGIC_CACHE_VERSION}, [object()])
+    assert list(cacheFile.parent.iterdir()) == []
+
+
+class StateKeysObject:
+    StateKeys = ["name", ("renamed", "inner"), "items"]
+
+    def __init__(self, name, inner, items):
+        self.name = name
+        self.inner = inner
+        self.items = items
+
+
+class StateObject:
+    def __init__(self, value):
+        self.value = value
+
+    def state(self):
+        return {"value": self.value, "quoted": 'say "hi"\n\tback\\slash'}
+
+
+class ShallowStateObject:
+    def __init__(self, solutions, library):
+        self.solutions = solutions
+        self.library = library
+
+    def shallowState(self):
+        return {"solutions": self.solutions.values(), "library": self.library}
+
+    def state(self):
+        return state(self.shallowState())
+
+
+def nestedState(intKeys):
+    deep = {"a": {"b": {"c": {"d": [1, {"e": []}, {}]}}}}
+    inner = StateKeysObject("line1\nline2", {}, [])
+    solutions = {i: StateKeysObject("s%d" % i, StateObject(i), [[], {}, "", "'\"", None, True, 1.5]) for i in range(3)}
+    rv = {
+        "empty": {},
+        "emptyList": [],
+        "strings": ["", "multi\nline", 'double "quotes"', "single 'quotes'", "unicode \u00e9\u4e2d"],
+        "numbers": [0, -1, 2**40, 0.1, 1e-30, float(3)],
+        "tuple": (1, (2, ()), "x"),
+        "objects": [inner, StateKeysObject("outer", inner, [inner, []])],
+        "library": ShallowStateObject(solutions, deep),
+        "deep": deep,
+        "none": None,
+        "flags": [True, False],
+    }
+    if intKeys:
+        rv["intKeys"] = {1: "one", 2: {3: []}}
+    return rv
+
+
+@pytest.mark.parametrize("fmt,ext,stdlibJson", [("json", ".json", False), ("json", ".json", True),
+                                                ("msgpack", ".dat", False)])
+def test_writeState(tmp_path, monkeypatch, fmt, ext, stdlibJson):
+    if stdlibJson:
+        monkeypatch.setattr(LibraryIO, "json", json)
+        monkeypatch.delitem(sys.modules, "orjson", raising=False)
+    # orjson only accepts string keys
+    intKeys = fmt != "json" or LibraryIO.json.__name__ != "orjson"
+    for name, obj in [("nested", nestedState(intKeys)), ("emptyMap", {}), ("emptyList", []),
+                      ("object", StateKeysObject("n", {}, [])), ("string", 'a "b"\nc')]:
+        expected = tmp_path / ("expected_" + name)
+        streamed = tmp_path / ("streamed_" + name)
+        LibraryIO.write(str(expected), state(obj), fmt)
+        LibraryIO.writeState(str(streamed), obj, fmt)
+        assert (tmp_path / (streamed.name + ext)).read_bytes() == (tmp_path / (expected.name + ext)).read_bytes()
@@ -0,0 +1,199 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+import math
+
+import numpy as np
+import pytest
+
+from Tensile.LibraryLogic import LogicAnalyzer, ProblemWinners
+
+nan = float("nan")
+
+# gflops of 6 problems (2 x 3 sizes) x 5 solutions, with tied winners, tied
+# runner-ups, nan cells and a problem with a single positive solution
+DATA = [
+    [100.0, 200.0, 200.0, nan, 50.0],
+    [300.0, nan, 120.0, 300.0, -5.0],
+    [nan, nan, 80.0, 10.0, 40.0],
+    [-2.0, -2.0, -2.0, 60.0, -2.0],
+    [150.0, 150.0, 150.0, 150.0, 150.0],
+    [90.0, 95.0, 250.0, nan, 249.0],
+]
+
+
+def makeAnalyzer(data=DATA, exactWinners=None):
+    """LogicAnalyzer over data without benchmark files, solutions are named s<i>."""
+    a = object.__new__(LogicAnalyzer)
+    a.numIndices = 2
+    a.numProblemSizes = [2, 3]
+    a.problemIndexToSize = [[128, 256], [64, 512, 1024]]
+    a.flopsPerMac = 2
+    a.numSolutions = len(data[0])
+    a.solutions = ["s%u" % i for i in range(a.numSolutions)]
+    a.solutionNaming = (None, list(a.solutions), ["64x64"] * a.numSolutions)
+    a.problemWinners = None
+    a.totalProblems = len(data)
+    a.totalSize = a.totalProblems * a.numSolutions
+    a.globalIndexRange = [[0, 2], [0, 3]]
+    a.problemIndicesForGlobalRange = a.problemIndicesForRange(a.globalIndexRange)
+    a.parameters = {"SolutionImportanceMin": 0.1}
+    a.exactWinners = exactWinners or {}
+    a.data = np.array(data, dtype=np.float32)
+    a.problemFlops = np.array(
+        [a.totalFlopsForProblemIndices(p) for p in a.problemIndicesForGlobalRange],
+        dtype=np.float64,
+    )
+    return a
+
+
+def referenceWinners(data):
+    """Winner index and gflops and runner-up gflops of each row, scanned in order."""
+    winners = []
+    for row in data:
+        winnerIdx, winnerGFlops = -1, -1e6
+        for i, gflops in enumerate(row):
+            if gflops > winnerGFlops:
+                winnerIdx, winnerGFlops = i, gflops
+        secondGFlops = -1e6 if winnerIdx >= 0 else -1e9
+        for i, gflops in enumerate(row):
+            if i != winnerIdx and gflops > secondGFlops:
+                secondGFlops = gflops
+        winners.append((winnerIdx, winnerGFlops, secondGFlops))
+    return winners
+
+
+def test_winners():
+    winnerIdx, winnerGFlops, secondGFlops = ProblemWinners(np.array(DATA, dtype=np.float32)).getWinners()
+    # the first of tied solutions wins, nan never does
+    assert winnerIdx.tolist() == [1, 0, 2, 3, 0, 2]
+    assert winnerGFlops.tolist() == [200.0, 300.0, 80.0, 60.0, 150.0, 250.0]
+    assert secondGFlops.tolist() == [200.0, 300.0, 40.0, -2.0, 150.0, 249.0]
+    assert list(zip(winnerIdx.tolist(), winnerGFlops.tolist(), secondGFlops.tolist())) \
+        == referenceWinners(DATA)
+
+
+def test_winnersFloors():
+    data = [[nan, -2e6], [-5e5, -2e9], [-2e6, -5e8]]
+    winnerIdx, winnerGFlops, secondGFlops = ProblemWinners(np.array(data)).getWinners()
+    assert winnerIdx.tolist() == [-1, 0, -1]
+    assert winnerGFlops.tolist() == [-1e6, -5e5, -1e6]
+    assert secondGFlops.tolist() == [-2e6, -1e6, -2e6]
+    assert list(zip(winnerIdx.tolist(), winnerGFlops.tolist(), secondGFlops.tolist())) \
+        == referenceWinners(data)
+
+
+def test_leastImportantSolution():
+    idx, percSaved, percWins, percTime = makeAnalyzer().leastImportantSolution()
+    assert idx == 0
+    assert percSaved == 0.0
+    assert percWins == pytest.approx(1 / 3, abs=0, rel=1e-15)
+    assert math.isclose(percTime, 0.1848830886351278, rel_tol=1e-15)
+
+
+def test_leastImportantSolutionZeroGFlops():
+    # zero gflops count as not benchmarked, the only positive solution is singular
+    data = [[0.0, 10.0, -1.0], [20.0, 0.0, 0.0]]
+    a = makeAnalyzer(data)
+    a.numProblemSizes = [2, 1]
+    a.problemIndexToSize = [[128, 256], [64]]
+    a.globalIndexRange = [[0, 2], [0, 1]]
+    a.problemIndicesForGlobalRange = a.problemIndicesForRange(a.globalIndexRange)
+    a.problemFlops = np.array([2.0 * 128 * 64, 2.0 * 256 * 64])
+    assert a.leastImportantSolution() == (2, 0.0, 0.0, 0.0)
+
+
+def test_keepWinnerSolutions(capsys):
+    a = makeAnalyzer()
+    a.keepWinnerSolutions()
+    assert a.solutions == ["s0", "s1", "s2", "s3"]
+    assert a.data.shape == (6, 4)
+
+
+def test_removeLeastImportantSolutions(capsys):
+    a = makeAnalyzer(exactWinners={(1, 0): [4, 1.0]})
+    a.removeLeastImportantSolutions()
+    removed = [line.split(": ")[1].split()[0] for line in capsys.readouterr().out.splitlines()
+               if line.startswith("# Removing Unimportant Solution")]
+    assert removed == ["s0", "s1", "s2"]
+    assert a.solutions == ["s3", "s4"]
+    assert a.exactWinners == {(1, 0): [1, 1.0]}
+    np.testing.assert_array_equal(a.data, np.array(DATA, dtype=np.float32)[:, 3:])
+
+
+@pytest.mark.parametrize("removeOrder", [[0, 0, 0, 0], [4, 3, 2, 1], [1, 1, 2, 0], [2, 0, 2, 1]])
+def test_problemWinnersRemoveSolution(removeOrder):
+    data = np.array(DATA, dtype=np.float32)
+    winners = ProblemWinners(data)
+    columns = list(range(data.shape[1]))
+    for solutionIdx in removeOrder:
+        winners.removeSolution(solutionIdx)
+        del columns[solutionIdx]
+        # incremental updates match a fresh scan of the remaining solutions
+        fresh = ProblemWinners(data[:, columns]).getWinners()
+        for incremental, expected in zip(winners.getWinners(), fresh):
+            assert incremental.tolist() == expected.tolist()
+        winnerIdx, winnerGFlops, secondGFlops = winners.getWinners()
+        assert list(zip(winnerIdx.tolist(), winnerGFlops.tolist(), secondGFlops.tolist())) \
+            == referenceWinners(data[:, columns].tolist())
+
+
+def test_removeLeastImportantSolutionsIncremental(capsys):
+    # removing with tracked winners matches recomputing them for every removal
+    a = makeAnalyzer(exactWinners={(1, 0): [4, 1.0]})
+    a.removeLeastImportantSolutions()
+    b = makeAnalyzer(exactWinners={(1, 0): [4, 1.0]})
+    removed = []
+    while len(b.solutions) > 1:
+        lis = b.leastImportantSolution()
+        if lis is None:
+            break
+        lisIdx, percSaved, percWins, _ = lis
+        if percSaved >= b.parameters["SolutionImportanceMin"] and percWins != 0:
+            break
+        removed.append(b.solutions[lisIdx])
+        b.removeSolution(lisIdx)
+    assert removed == ["s0", "s1", "s2"]
+    assert a.solutions == b.solutions
+    assert a.exactWinners == b.exactWinners
+    np.testing.assert_array_equal(a.data, b.data)
+
+
+def test_dataColumns():
+    a = makeAnalyzer()
+    a.removeSolution(1)
+    a.pruneSolutions({0, 2, 3})
+    # removals only record the kept columns
+    assert a.dataColumns.tolist() == [0, 3, 4]
+    assert a._data.shape == (6, 5)
+    assert a.solutions == ["s0", "s3", "s4"]
+    assert a.numSolutions == 3
+    # reading data compacts it
+    expected = np.array(DATA, dtype=np.float32)[:, [0, 3, 4]]
+    np.testing.assert_array_equal(a.data, expected)
+    assert a.dataColumns is None
+    assert a._data.shape == (6, 3)
+    assert a[([0, 1], 1)] == 10.0
+    a.removeSolution(0)
+    np.testing.assert_array_equal(a.data, expected[:, 1:])
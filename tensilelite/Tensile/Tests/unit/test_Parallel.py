@@ -0,0 +1,58 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+import importlib
+import os
+import stat
+import tempfile
+
+# Tensile.Common re-exports joblib's Parallel under the module's name
+Parallel = importlib.import_module("Tensile.Common.Parallel")
+
+
+def test_globalParametersSnapshot(tmp_path, monkeypatch):
+    exitHandlers = []
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(Parallel, "_snapshotDirPid", None)
+    monkeypatch.setattr(Parallel, "_snapshotStamps", set())
+    monkeypatch.setattr(Parallel.atexit, "register", lambda f, *args: exitHandlers.append((f, args)))
+
+    snapshot = Parallel.globalParametersSnapshot()
+    snapshotDir = os.path.dirname(snapshot.path)
+    assert os.path.dirname(snapshotDir) == str(tmp_path)
+    assert stat.S_IMODE(os.stat(snapshotDir).st_mode) == 0o700
+    assert os.listdir(snapshotDir) == [os.path.basename(snapshot.path)]
+    assert Parallel.globalParametersSnapshot() == snapshot
+    assert len(exitHandlers) == 1
+
+    monkeypatch.setattr(Parallel, "_loadedGlobalParametersStamp", None)
+    Parallel.syncGlobalParameters(snapshot._replace(pid=-1))
+    assert Parallel._loadedGlobalParametersStamp == snapshot.stamp
+
+    # Only the process that created the directory removes it
+    f, (path, pid) = exitHandlers[0]
+    f(path, pid + 1)
+    assert os.path.isdir(snapshotDir)
+    f(path, pid)
+    assert not os.path.exists(snapshotDir)
@@ -0,0 +1,87 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+from Tensile.TensileInstructions import Label, Module, SAddU32, SBranch, SMovB32, SNop, \
+    TextBlock, sgpr
+from Tensile.TensileInstructions.Instructions import _SWaitCnt
+from Tensile.TensileInstructions.Pass import buildGraph, getAssignmentDict, \
+    removeDuplicateAssignment
+
+
+def _removeDuplicates(module):
+    graph = buildGraph(module, 8, 8, getAssignmentDict(module))
+    removeDuplicateAssignment(graph)
+    return graph
+
+
+def test_removeDuplicateAssignment():
+    module = Module("test")
+    first = SMovB32(dst=sgpr(4), src=0, comment="first")
+    module.add(first)
+    module.add(SMovB32(dst=sgpr(4), src=0))
+    module.add(SMovB32(dst=sgpr(4), src=0, comment="dup"))
+    other = SMovB32(dst=sgpr(5), src=0)
+    module.add(other)
+    changed = SMovB32(dst=sgpr(4), src=1)
+    module.add(changed)
+
+    graph = _removeDuplicates(module)
+
+    items = module.items()
+    assert items[0] is first
+    assert isinstance(items[1], TextBlock)
+    assert "dup (dup assign opt.)" in str(items[1])
+    assert items[2] is other
+    assert items[3] is changed
+    assert len(items) == 4
+    assert [item for _, item in graph["s"][4]] == [first, changed]
+
+
+def test_removeDuplicateAssignmentBoundaries():
+    module = Module("test")
+    kept = [SMovB32(dst=sgpr(4), src=0)]
+    module.add(kept[-1])
+    for boundary in (Label("label", ""), _SWaitCnt(lgkmcnt=0), SBranch("label")):
+        module.add(boundary)
+        kept.append(SMovB32(dst=sgpr(4), src=0))
+        module.add(kept[-1])
+    # s_nop does not invalidate the assigned value
+    module.add(SNop(waitState=0))
+    module.add(SMovB32(dst=sgpr(4), src=0))
+    # Neither does an unrelated sgpr write, but a write to s4 does
+    module.add(SAddU32(dst=sgpr(5), src0=sgpr(5), src1=1))
+    module.add(SMovB32(dst=sgpr(4), src=0))
+    write = SAddU32(dst=sgpr(4), src0=sgpr(4), src1=1)
+    module.add(write)
+    kept.append(SMovB32(dst=sgpr(4), src=0))
+    module.add(kept[-1])
+
+    graph = _removeDuplicates(module)
+
+    movs = [item for item in module.items() if isinstance(item, SMovB32)]
+    assert movs == kept
+    # s_nop still starts a new segment, it just does not count as a reset
+    assert len(graph["boundaries"]) == 4
+    assert graph["s"][4] == [(0, kept[0]), (1, kept[1]), (2, kept[2]), (3, kept[3]), \
+                             (4, write), (4, kept[4])]
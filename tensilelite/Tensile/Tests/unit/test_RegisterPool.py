@@ -0,0 +1,108 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+import hashlib
+import random
+from copy import deepcopy
+
+from Tensile.TensileInstructions.RegisterPool import RegisterPool
+
+# sha256 of the traces of all replayed sequences, recorded with the Register-object pool
+# this class replaced; any change to checkout order, overflow, padding or tags shows up here
+REPLAY_DIGEST = "1d07576a327bed63809a6ffd93f06cb9ef6e56195d6d1710622e55dd61bc0c36"
+REPLAY_SEQUENCES = 300
+
+
+def _replay(seed):
+    """Runs a seeded sequence of pool operations and returns the observed trace."""
+    r = random.Random(seed)
+    pool = RegisterPool(r.randint(0, 40), "v", defaultPreventOverflow=False, printRP=False)
+    pool.add(r.randint(0, 10), r.randint(1, 30), "a")
+    checkedOut = []
+    movedToPool = []
+    trace = []
+    for step in range(60):
+        op = r.random()
+        tag = "t%d" % step
+        try:
+            if op < 0.35:
+                size, alignment = r.choice([1, 2, 3, 4, 8]), r.choice([1, 2, 4, 8])
+                checkedOut.append(pool.checkOutAligned(size, alignment, tag, r.random() < 0.2))
+                trace.append(checkedOut[-1])
+            elif op < 0.4:
+                checkedOut.extend(pool.checkOutMulti([r.randint(1, 3), r.randint(1, 3)], r.choice([1, 2]), [tag, tag + "b"]))
+                trace.append(checkedOut[-2:])
+            elif op < 0.6 and checkedOut:
+                pool.checkIn(checkedOut.pop(r.randrange(len(checkedOut))))
+            elif op < 0.65 and checkedOut:
+                start = checkedOut.pop(r.randrange(len(checkedOut)))
+                pool.addFromCheckOut(start)
+                movedToPool.append(start)
+            elif op < 0.7 and movedToPool:
+                start = movedToPool.pop(r.randrange(len(movedToPool)))
+                pool.removeFromCheckOut(start)
+                checkedOut.append(start)
+            elif op < 0.8:
+                trace.append((pool.available(), pool.availableBlockAtEnd(),
+                              pool.availableBlock(r.choice([0, 1, 2, 4]), r.choice([1, 2, 4])),
+                              pool.availableBlockMaxVgpr(r.randint(0, 80), r.choice([1, 2, 4]), r.choice([1, 2, 4]))))
+            elif op < 0.9:
+                start = r.randint(0, pool.size())
+                if start + 4 <= pool.size():
+                    pool.remove(start, r.randint(1, 4), "x")
+            else:
+                pool.add(r.randint(0, pool.size() + 4), r.randint(1, 6), tag)
+        except Exception as e:
+            trace.append(type(e).__name__)
+        snapshot = deepcopy(pool)
+        trace.append(pool.state())
+        trace.append(tuple(pool.getTag(i) for i in range(pool.size())))
+        assert snapshot.state() == trace[-2]
+    return trace
+
+
+def test_replay():
+    h = hashlib.sha256()
+    for seed in range(REPLAY_SEQUENCES):
+        h.update(repr(_replay(seed)).encode())
+    assert h.hexdigest() == REPLAY_DIGEST
+
+
+def test_checkOutAligned():
+    pool = RegisterPool(0, "v", defaultPreventOverflow=False, printRP=False)
+    pool.add(0, 8, "a")
+    pool.remove(0, 1, "x")
+    assert pool.checkOutAligned(2, 2, "t0") == 2
+    assert pool.checkOutAligned(4, 4, "t1") == 4
+    assert pool.checkOut(1, "t2") == 1
+    assert pool.state().splitlines()[-1] == ".#######"
+    # the pool overflows past its end once no aligned run is available
+    assert pool.checkOutAligned(4, 4, "t3") == 8
+    assert pool.state().splitlines()[-1] == ".###########"
+    assert pool.getTag(11) == "t3"
+    pool.checkIn(4)
+    assert pool.state().splitlines()[-1] == ".###||||####"
+    assert pool.availableBlock(2, 2) == 4
+    assert pool.checkOutAligned(3, 2, "t4") == 4
@@ -0,0 +1,48 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+from Tensile.Common import globalParameters
+from Tensile.SolutionStructs import Solution
+
+
+def test_getDerivationDigest(monkeypatch):
+    isa = (9, 4, 2)
+    asmCaps = {"HasMFMA": True, "HasWMMA": False, "HasNewBarrier": False}
+    monkeypatch.setitem(globalParameters, "AsmCaps", {isa: asmCaps})
+    monkeypatch.setitem(globalParameters, "ArchCaps", {isa: {"HasAccCD": True, "HasEccHalf": True}})
+    digest = Solution.getDerivationDigest(isa)
+    assert Solution.getDerivationDigest([9, 4, 2]) == digest
+
+    # capabilities the derivation does not read do not invalidate fingerprints
+    asmCaps["HasNewBarrier"] = True
+    asmCaps["HasNewCap"] = True
+    assert Solution.getDerivationDigest(isa) == digest
+
+    asmCaps["HasWMMA"] = True
+    assert Solution.getDerivationDigest(isa) != digest
+    asmCaps["HasWMMA"] = False
+
+    monkeypatch.setattr(Solution, "DerivationSchemaVersion", Solution.DerivationSchemaVersion + 1)
+    assert Solution.getDerivationDigest(isa) != digest
@@ -0,0 +1,38 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+import threading
+
+from Tensile.TensileInstructions.Base import TensileInstructions, _removeIdent
+
+
+def test_removeIdent():
+    kernelInfo = {threading.get_ident(): TensileInstructions.kernelInfo(isa=(9, 4, 2))}
+    kernelInfo.update({-i: TensileInstructions.kernelInfo(isa=(9, 0, 10)) for i in range(1, 1002)})
+    kernelInfo = _removeIdent(kernelInfo)
+    assert kernelInfo == {threading.get_ident(): TensileInstructions.kernelInfo(isa=(9, 4, 2))}
+    kernelInfo[threading.get_ident()].wavefrontSize = 32
+    kernelInfo[-1] = TensileInstructions.kernelInfo(isa=(9, 0, 10))
+    assert len(kernelInfo) == 2
@@ -0,0 +1,51 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+import hashlib
+
+import pytest
+
+from Tensile.Common import atomicWrite, fileDigest
+
+
+def test_fileDigest(tmp_path):
+    path = tmp_path / "data"
+    path.write_bytes(b"tensile" * 1000)
+    assert fileDigest(path) == hashlib.sha1(b"tensile" * 1000).hexdigest()
+    assert fileDigest(path, "sha256") == hashlib.sha256(b"tensile" * 1000).hexdigest()
+
+
+def test_atomicWrite(tmp_path):
+    path = tmp_path / "out.json"
+    with atomicWrite(path) as f:
+        f.write("first")
+    assert path.read_text() == "first"
+
+    with pytest.raises(TypeError):
+        with atomicWrite(path) as f:
+            f.write("partial")
+            raise TypeError
+    assert path.read_text() == "first"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
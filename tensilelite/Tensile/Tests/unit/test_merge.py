@@ -0,0 +1,128 @@
+################################################################################
+#
+# Copyright (C) 2025 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+
+
+from copy import deepcopy
+
+from Tensile.Utilities import merge
+
+
+def solution(index, **params):
+    rv = {"SolutionIndex": index, "SolutionNameMin": "S%d" % index, "MacroTile0": 128,
+          "MatrixInstruction": [16, 16, 16, 1], "ProblemType": {"DataType": 4, "TransposeA": False}}
+    rv.update(params)
+    return rv
+
+
+def test_fixSizeInconsistencies():
+    sizes = [
+        [[128, 128, 1, 128, 0, 0, 0, 0], [0, 1.0]],
+        [[128, 128, 1, 128, 1, 1, 1, 1], [1, 2.0]],  # same size once trimmed
+        [[64, 64, 1, 64], [2, 3.0]],
+        [[64, 64, 1, 64, 0, 0, 0, 0], [3, 4.0]],  # already present untrimmed
+        [[32, 32, 1, 32, 0, 5, 5, 5, 5], [4, 5.0]],  # SolutionTag included
+        [[32, 32, 1, 32, 0], [5, 6.0]],
+        [[16, 16, 1, 16, 0, 0, 0, 0], [6, 7.0]],
+    ]
+    fixed, count = merge.fixSizeInconsistencies(sizes, "base")
+    assert fixed == [
+        [[128, 128, 1, 128], [0, 1.0]],
+        [[64, 64, 1, 64], [2, 3.0]],
+        [[32, 32, 1, 32, 0], [5, 6.0]],
+        [[16, 16, 1, 16], [6, 7.0]],
+    ]
+    assert count == 4
+    # entries are trimmed in place, duplicates keep their size
+    assert sizes[0][0] == [128, 128, 1, 128]
+    assert sizes[1][0] == [128, 128, 1, 128, 1, 1, 1, 1]
+
+
+def test_solutionKey():
+    a = solution(0)
+    reordered = {k: a[k] for k in reversed(list(a))}
+    assert merge.solutionKey(a) == merge.solutionKey(reordered)
+    assert merge.solutionKey(a) == merge.solutionKey(solution(7))
+    assert merge.solutionKey(a) != merge.solutionKey(solution(0, MacroTile0=256))
+    assert merge.solutionKey(a) != merge.solutionKey(solution(0, MatrixInstruction=[16, 16, 16, 2]))
+    assert merge.solutionKey(a) != merge.solutionKey(solution(0, ProblemType={"DataType": 4, "TransposeA": True}))
+
+
+def test_addKernel():
+    pool = [solution(0), solution(1, MacroTile0=256), solution(2, MacroTile0=256)]
+    poolIndex = merge.indexSolutionPool(pool)
+
+    # equal up to SolutionIndex and SolutionNameMin: the first match is reused
+    pool, index = merge.addKernel(pool, solution(9, MacroTile0=256), poolIndex)
+    assert (index, len(pool)) == (1, 3)
+
+    new = solution(9, MacroTile0=64)
+    pool, index = merge.addKernel(pool, new, poolIndex)
+    assert (index, len(pool)) == (3, 4)
+    assert pool[3] == dict(new, SolutionIndex=3)
+    assert new["SolutionIndex"] == 9
+
+    # the index tracks kernels added before, with or without poolIndex
+    pool, index = merge.addKernel(pool, solution(5, MacroTile0=64), poolIndex)
+    assert (index, len(pool)) == (3, 4)
+    pool, index = merge.addKernel(pool, solution(5, MacroTile0=64))
+    assert (index, len(pool)) == (3, 4)
+
+
+def test_mergeLogic():
+    def logic(solutions, sizes):
+        return [{"MinimumRequiredVersion": "4.33.0"}, "aquavanjaram", "gfx942", ["Device 0049"],
+                {"DataType": 4}, solutions, [[2, 3, 0, 1], [[0, 1, 2], [0, 1, 2]]], sizes, None, None,
+                None, "Equality"]
+
+    base = logic([solution(0), solution(1, MacroTile0=256), solution(2, MacroTile0=64)], [
+        [[128, 128, 1, 128, 0, 0, 0, 0], [0, 100.0]],
+        [[256, 256, 1, 256], [1, 200.0]],
+        [[512, 512, 1, 512], [1, 300.0]],
+    ])
+    inc = logic([solution(0, MacroTile0=64), solution(1, MacroTile0=32)], [
+        [[128, 128, 1, 128], [0, 150.0]],  # faster, reuses the unused base kernel 2
+        [[256, 256, 1, 256], [1, 100.0]],  # slower
+        [[1024, 1024, 1, 1024], [1, 50.0]],  # new size
+    ])
+    merged, sizesAdded, solutionsAdded, solutionsRemoved = merge.mergeLogic(deepcopy(base), deepcopy(inc), False)
+    assert merged[5] == [solution(0, MacroTile0=256, SolutionNameMin="S1"),
+                         solution(1, MacroTile0=64, SolutionNameMin="S0"),
+                         solution(2, MacroTile0=32, SolutionNameMin="S1")]
+    assert merged[7] == [
+        [[128, 128, 1, 128], [1, 150.0]],
+        [[256, 256, 1, 256], [0, 200.0]],
+        [[512, 512, 1, 512], [0, 300.0]],
+        [[1024, 1024, 1, 1024], [2, 50.0]],
+    ]
+    assert (sizesAdded, solutionsAdded, solutionsRemoved) == (1, 2, 2)
+
+    # forced merges take the incremental kernel even when it is slower
+    merged = merge.mergeLogic(deepcopy(base), deepcopy(inc), True)[0]
+    assert [solution["MacroTile0"] for solution in merged[5]] == [256, 64, 32]
+    assert merged[7] == [
+        [[128, 128, 1, 128], [1, 150.0]],
+        [[256, 256, 1, 256], [2, 100.0]],
+        [[512, 512, 1, 512], [0, 300.0]],
+        [[1024, 1024, 1, 1024], [2, 50.0]],
+    ]
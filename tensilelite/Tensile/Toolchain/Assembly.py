@@ -23,6 +23,7 @@
 ################################################################################
 
 import collections
+import json
 import math
 import os
 import shlex
@@ -30,9 +31,10 @@ import shutil
 import subprocess
 
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 
-from ..Common import globalParameters, print2, ensurePath, SemanticVersion, isaToGfx
+from ..Common import globalParameters, print1, print2, ensurePath, ParallelMap2, SemanticVersion, isaToGfx, \
+    atomicWrite, fileDigest
 from ..KernelWriterAssembly import KernelWriterAssembly
 from ..Toolchain.Validators import getVersion
 from ..SolutionStructs import Solution
@@ -169,6 +171,57 @@ def _batchObjectFiles(objFiles: List[str], coPathDest: Union[Path, str], maxObjF
 
     return newObjFilesOutput
 
+def _readManifest(manifestPath: Path) -> dict:
+    try:
+        with open(manifestPath, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _writeManifest(manifestPath: Path, manifest: dict):
+    with atomicWrite(manifestPath) as f:
+        json.dump(manifest, f, sort_keys=True)
+
+
+def _buildCodeObject(
+      toolchain: AssemblyToolchain,
+      coFileRaw: Path,
+      coFile: Path,
+      objFiles: List[str],
+      gfx: str,
+      compress: bool,
+      previous: Optional[dict]
+    ):
+    """Links and compresses a single code object unless it is up to date.
+
+    Returns:
+        A tuple (entry, built) holding the manifest entry of the code object and whether
+        it had to be built.
+    """
+    entry = {
+        "toolchain": [toolchain.assembler, str(toolchain.assemblerVersion), toolchain.bundler,
+                      toolchain.buildIdKind, str(toolchain.coVersion), compress],
+        "inputs": [[os.path.basename(o), fileDigest(o)] for o in objFiles],
+    }
+    if previous is not None and coFile.exists():
+        stat = coFile.stat()
+        if previous.get("output") == [stat.st_size, stat.st_mtime_ns] and \
+           {k: previous.get(k) for k in entry} == entry:
+            entry["output"] = previous["output"]
+            return entry, False
+
+    objFiles = _batchObjectFiles(objFiles, coFileRaw)
+    toolchain.link(objFiles, str(coFileRaw))
+    if compress:
+        toolchain.compress(str(coFileRaw), str(coFile), gfx)
+    else:
+        shutil.move(coFileRaw, coFile)
+    stat = coFile.stat()
+    entry["output"] = [stat.st_size, stat.st_mtime_ns]
+    return entry, True
+
+
 def buildAssemblyCodeObjectFiles(
       toolchain: AssemblyToolchain,
       kernels: List[Solution],
@@ -179,6 +232,10 @@ def buildAssemblyCodeObjectFiles(
     ):
     """Builds code object files from assembly files
 
+    Code objects are linked and compressed in parallel. The object files that went into
+    each code object are recorded with their digests in a manifest next to destDir; code
+    objects whose inputs and toolchain did not change since the previous build are skipped.
+
     Args:
         toolchain: The assembly toolchain object to use for building.
         kernels: A list of the kernel objects to build.
@@ -196,12 +253,14 @@ def buildAssemblyCodeObjectFiles(
 
     destDir = Path(ensurePath(destDir))
     asmDir = Path(ensurePath(asmDir))
+    manifestPath = destDir.with_name(destDir.name + "_manifest.json")
+    manifest = _readManifest(manifestPath)
 
     archKernelMap = collections.defaultdict(list)
     for k in filter(isAsm, kernels):
       archKernelMap[tuple(k['ISA'])].append(k)
 
-    coFiles = []
+    jobs = []
     for arch, archKernels in archKernelMap.items():
       if len(archKernels) == 0:
         continue
@@ -217,13 +276,14 @@ def buildAssemblyCodeObjectFiles(
         if coName:
           coFileMap[asmDir / (coName + extCoRaw)].append(str(asmDir / (writer.getKernelFileBase(kernel) + extObj)))
       for coFileRaw, objFiles in coFileMap.items():
-        objFiles = _batchObjectFiles(objFiles, coFileRaw)
-        toolchain.link(objFiles, str(coFileRaw))
         coFile = destDir / coFileRaw.name.replace(extCoRaw, extCo)
-        if compress:
-          toolchain.compress(str(coFileRaw), str(coFile), gfx)
-        else:
-          shutil.move(coFileRaw, coFile)
-        coFiles.append(coFile)
+        jobs.append((toolchain, coFileRaw, coFile, objFiles, gfx, compress, manifest.get(coFile.name)))
+
+    results = ParallelMap2(_buildCodeObject, jobs, "Linking code objects", return_as="list")
+
+    coFiles = [job[2] for job in jobs]
+    _writeManifest(manifestPath, {coFile.name: entry for coFile, (entry, _) in zip(coFiles, results)})
+    numBuilt = sum(1 for _, built in results if built)
+    print1(f"Code objects: {numBuilt} built, {len(coFiles) - numBuilt} up to date")
 
     return coFiles
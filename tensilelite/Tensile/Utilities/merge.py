@@ -25,11 +25,22 @@
 import yaml
 import os
 import sys
+import io
+import time
 import shutil
 import argparse
+import contextlib
+import itertools
+import concurrent.futures
+from collections import Counter
 from copy import deepcopy
 from enum import IntEnum
 
+try:
+    from yaml import CSafeLoader as yamlLoader, CSafeDumper as yamlDumper
+except ImportError:
+    from yaml import SafeLoader as yamlLoader, SafeDumper as yamlDumper
+
 verbosity = 1
 
 def ensurePath(path):
@@ -54,20 +65,22 @@ def reindexSolutions(data):
     return data
 
 def fixSizeInconsistencies(sizes, fileType):
-    duplicates = list()
+    # count of each size key currently in the table, kept up to date as sizes are trimmed
+    sizeCount = Counter(tuple(size) for size, *_ in sizes)
+    duplicates = set()
     for i in range(0,len(sizes)):
         currSize = sizes[i][0]
         # >= so size will be trimmed when a SolutionTag is included
         if len(currSize) >= 8:
             currSize = currSize[:-4]
-            if currSize in (item for index in sizes for item in index):
-                duplicates.append(i-len(duplicates))
+            if sizeCount[tuple(currSize)] > 0:
+                duplicates.add(i)
             else:
+                sizeCount[tuple(sizes[i][0])] -= 1
+                sizeCount[tuple(currSize)] += 1
                 sizes[i][0] = currSize
-    sizes_ = deepcopy(sizes)
+    sizes_ = deepcopy([size for i, size in enumerate(sizes) if i not in duplicates])
     if len(duplicates) > 0:
-        for i in duplicates:
-            sizes_.pop(i)
         verbose(len(duplicates), "duplicate size(s) removed from", fileType, "logic file")
     return sizes_, len(sizes_)
 
@@ -75,17 +88,37 @@ def fixSizeInconsistencies(sizes, fileType):
 def cmpHelper(sol):
     return {k:v for k, v in sol.items() if k!="SolutionIndex" and k!="SolutionNameMin"}
 
-def addKernel(solutionPool, solution):
+# hashable form of a solution, equal for solutions whose cmpHelper dicts compare equal
+def solutionKey(sol):
+    def freeze(value):
+        if isinstance(value, dict):
+            return frozenset((k, freeze(v)) for k, v in value.items())
+        if isinstance(value, list):
+            return tuple(freeze(v) for v in value)
+        return value
+    return freeze(cmpHelper(sol))
+
+# map solutionKey -> SolutionIndex of the first matching solution in the pool
+def indexSolutionPool(solutionPool):
+    poolIndex = {}
     for item in solutionPool:
-        if cmpHelper(item) == cmpHelper(solution):
-            index = item["SolutionIndex"]
-            debug("...Reuse previously existed kernel", end="")
-            break
+        poolIndex.setdefault(solutionKey(item), item["SolutionIndex"])
+    return poolIndex
+
+# poolIndex must be kept alongside solutionPool when adding several kernels
+def addKernel(solutionPool, solution, poolIndex=None):
+    if poolIndex is None:
+        poolIndex = indexSolutionPool(solutionPool)
+    key = solutionKey(solution)
+    if key in poolIndex:
+        index = poolIndex[key]
+        debug("...Reuse previously existed kernel", end="")
     else:
         index = len(solutionPool)
         _solution = deepcopy(solution) # if we don't we will see some subtle errors
         _solution["SolutionIndex"] = index
         solutionPool.append(_solution)
+        poolIndex[key] = index
         debug("...A new kernel has been added", end="")
     debug("({}) {}".format(index, solutionPool[index]["SolutionNameMin"] if "SolutionNameMin" in solutionPool[index] else "(SolutionName N/A)"))
     return solutionPool, index
@@ -101,7 +134,7 @@ def sanitizeSolutions(solList):
 def removeUnusedKernels(oriData, prefix=""):
     origNumSolutions = len(oriData[5])
 
-    kernelsInUse = [ index for _, [index, _] in oriData[7] ]
+    kernelsInUse = { index for _, [index, _] in oriData[7] }
     for i, solution in enumerate(oriData[5]):
         solutionIndex = solution["SolutionIndex"]
         oriData[5][i]["__InUse__"] = True if solutionIndex in kernelsInUse else False
@@ -135,9 +168,71 @@ def loadData(filename):
         print("Cannot open file: ", filename)
         sys.stdout.flush()
         sys.exit(-1)
-    data = yaml.load(stream, yaml.SafeLoader)
+    data = yaml.load(stream, yamlLoader)
     return data
 
+def writeData(data, filename):
+    with open(filename, "w") as outFile:
+        yaml.dump(data, outFile, Dumper=yamlDumper, default_flow_style=None)
+
+def _callCaptured(func, args, verbosityLevel):
+    global verbosity
+    verbosity = verbosityLevel
+    out = io.StringIO()
+    result, error = None, None
+    start = time.time()
+    with contextlib.redirect_stdout(out):
+        try:
+            result = func(*args)
+        except BaseException as e: # checks on the logic files call sys.exit
+            error = e
+    return out.getvalue(), result, error, time.time() - start
+
+# Calls func(*args) for each entry of argsList and yields (i, result, seconds) as the
+# calls finish, in argsList order if ordered is set. With more than one job (None for
+# the number of CPUs) the calls run in worker processes; the console output of each call
+# is printed once it finishes so that messages of concurrent merges don't interleave.
+# At most jobs calls are in flight, so no more than jobs results wait to be consumed.
+# If a call fails, the calls still running are finished and their output printed
+# before the error is raised.
+def mapFiles(func, argsList, jobs=1, ordered=True):
+    jobs = os.cpu_count() if jobs is None else jobs
+    if jobs <= 1 or len(argsList) <= 1:
+        for i, args in enumerate(argsList):
+            start = time.time()
+            result = func(*args)
+            yield i, result, time.time() - start
+        return
+
+    tasks = enumerate(argsList)
+    with concurrent.futures.ProcessPoolExecutor(min(jobs, len(argsList))) as executor:
+        running = {} # future -> index in argsList, in submission order
+        def submit():
+            for i, args in itertools.islice(tasks, jobs - len(running)):
+                running[executor.submit(_callCaptured, func, args, verbosity)] = i
+
+        submit()
+        error = None
+        while running:
+            if ordered:
+                done = [next(iter(running))]
+            else:
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                done = sorted(done, key=running.get)
+            for future in done:
+                i = running.pop(future)
+                log, result, callError, seconds = future.result()
+                print(log, end="")
+                sys.stdout.flush()
+                if error is None and callError is not None:
+                    error = callError
+                elif error is None:
+                    yield i, result, seconds
+            if error is None:
+                submit()
+        if error is not None:
+            raise error
+
 def compareDestFolderToYaml(originalDir, incFile, incData):
     checkFolders = ["Equality", "GridBased"]
     # Parsing destination folder and yaml attribute
@@ -274,18 +369,28 @@ def getSolutionTag(solution):
 
     return tagTuple
 
-def findSolutionWithIndex(solutionData, solIndex):
+# map SolutionIndex -> list of solutions carrying that index
+def indexSolutionData(solutionData):
+    indexMap = {}
+    for s in solutionData:
+        indexMap.setdefault(s["SolutionIndex"], []).append(s)
+    return indexMap
+
+def findSolutionWithIndex(solutionData, solIndex, indexMap=None):
     # Check solution at the index corresponding to solIndex first
     if solIndex < len(solutionData) and solutionData[solIndex]["SolutionIndex"] == solIndex:
         return solutionData[solIndex]
     else:
         debug("Searching for index...")
-        solution = [s for s in solutionData if s["SolutionIndex"]==solIndex]
+        if indexMap is None:
+            indexMap = indexSolutionData(solutionData)
+        solution = indexMap.get(solIndex, [])
         assert(len(solution) == 1)
         return solution[0]
 
 def addSolutionTagToKeys(solutionMap, solutionPool):
-    return [[[getSolutionTag(findSolutionWithIndex(solutionPool, idx))] + keys, [idx, eff]]
+    indexMap = indexSolutionData(solutionPool)
+    return [[[getSolutionTag(findSolutionWithIndex(solutionPool, idx, indexMap))] + keys, [idx, eff]]
             for [keys, [idx, eff]] in solutionMap]
 
 def removeSolutionTagFromKeys(solutionMap):
@@ -363,10 +468,12 @@ def mergeLogic(oriData, incData, forceMerge, trimSize=True, addSolutionTags=Fals
 
     solutionPool = deepcopy(oriData[5])
     solutionMap = deepcopy(oriData[7])
+    poolIndex = indexSolutionPool(solutionPool)
+    incIndexMap = indexSolutionData(incData[5])
 
     origDict = {tuple(origSize): [i, origEff] for i, [origSize, [origIndex, origEff]] in enumerate(oriData[7])}
     for incSize, [incIndex, incEff] in incData[7]:
-        incSolution = findSolutionWithIndex(incData[5], incIndex)
+        incSolution = findSolutionWithIndex(incData[5], incIndex, incIndexMap)
 
         storeEff = incEff if noEff == False else 0.0
         try:
@@ -377,7 +484,7 @@ def mergeLogic(oriData, incData, forceMerge, trimSize=True, addSolutionTags=Fals
                 elif forceMerge:
                     verbose("[!]", incSize, "already exists but does not improve in performance.", end="")
                 verbose("Efficiency:", origEff, "->", incEff, "(force_merge=True)" if forceMerge else "")
-                solutionPool, index = addKernel(solutionPool, incSolution)
+                solutionPool, index = addKernel(solutionPool, incSolution, poolIndex)
                 solutionMap[j][1] = [index, storeEff]
             else:
                 verbose("[X]", incSize, "already exists but does not improve in performance.", end="")
@@ -387,7 +494,7 @@ def mergeLogic(oriData, incData, forceMerge, trimSize=True, addSolutionTags=Fals
                 verbose("[X]", incSize, "has been rejected because a compatible solution already exists with higher performance")
             else:
                 verbose("[-]", incSize, "has been added to solution table, Efficiency: N/A ->", incEff)
-                solutionPool, index = addKernel(solutionPool, incSolution)
+                solutionPool, index = addKernel(solutionPool, incSolution, poolIndex)
                 solutionMap.append([incSize,[index, storeEff]])
 
     verbose(numOrigRemoved, "unused kernels removed from base logic file")
@@ -408,7 +515,32 @@ def mergeLogic(oriData, incData, forceMerge, trimSize=True, addSolutionTags=Fals
 
     return [mergedData, numSizesAdded, numSolutionsAdded, numSolutionsRemoved]
 
-def avoidRegressions(originalDir, incrementalDir, outputPath, forceMerge, trimSize=True, addSolutionTags=False, noEff=False):
+def mergeLogicFile(origFile, incFile, outputFile, originalDir, forceMerge, trimSize, addSolutionTags, noEff):
+    msg("Base logic file:", origFile, "| Incremental:", incFile, "| Merge policy: %s"%("Forced" if forceMerge else "Winner"), "| Trim size:", trimSize,
+    "| Add solution tags:", addSolutionTags)
+    oriData = loadData(origFile)
+    incData = loadData(incFile)
+
+    # Terminate when the destination folder doesn't match Incremental logic yaml
+    # For example, merge Gridbased yaml to Equality folder or Equality yaml to GridBased folder
+    compareDestFolderToYaml(originalDir, incFile, incData)
+
+    # Terminate when ProblemType of originalFiles and incrementalFiles mismatch
+    compareProblemType(oriData, incData)
+
+    # So far "SolutionIndex" in logic yamls has zero impact on actual 1-1 size mapping (but the order of the Solution does)
+    # since mergeLogic() takes that value very seriously so we reindex them here so it doesn't choke on duplicated SolutionIndex
+    oriData = reindexSolutions(oriData)
+    incData = reindexSolutions(incData)
+
+    mergedData, *stats = mergeLogic(oriData, incData, forceMerge, trimSize, addSolutionTags, noEff)
+    msg(stats[0], "size(s) and", stats[1], "kernel(s) added,", stats[2], "kernel(s) removed")
+
+    writeData(mergedData, outputFile)
+    msg("File written to", outputFile)
+    return stats
+
+def avoidRegressions(originalDir, incrementalDir, outputPath, forceMerge, trimSize=True, addSolutionTags=False, noEff=False, jobs=1):
     originalFiles = allFiles(originalDir)
     incrementalFiles = allFiles(incrementalDir)
     ensurePath(outputPath)
@@ -425,35 +557,23 @@ def avoidRegressions(originalDir, incrementalDir, outputPath, forceMerge, trimSi
 
     incrementalFiles = incrementalFilesTemp
 
+    tasks = []
     for incFile in incrementalFiles:
         basename = os.path.split(incFile)[-1]
         origFile = os.path.join(originalDir, basename)
         forceMerge = defaultForceMergePolicy(incFile) if forceMerge is None else forceMerge
-
-        msg("Base logic file:", origFile, "| Incremental:", incFile, "| Merge policy: %s"%("Forced" if forceMerge else "Winner"), "| Trim size:", trimSize,
-        "| Add solution tags:", addSolutionTags)
-        oriData = loadData(origFile)
-        incData = loadData(incFile)
-
-        # Terminate when the destination folder doesn't match Incremental logic yaml
-        # For example, merge Gridbased yaml to Equality folder or Equality yaml to GridBased folder
-        compareDestFolderToYaml(originalDir, incFile, incData)
-
-        # Terminate when ProblemType of originalFiles and incrementalFiles mismatch
-        compareProblemType(oriData, incData)
-
-        # So far "SolutionIndex" in logic yamls has zero impact on actual 1-1 size mapping (but the order of the Solution does)
-        # since mergeLogic() takes that value very seriously so we reindex them here so it doesn't choke on duplicated SolutionIndex
-        oriData = reindexSolutions(oriData)
-        incData = reindexSolutions(incData)
-
-        mergedData, *stats = mergeLogic(oriData, incData, forceMerge, trimSize, addSolutionTags, noEff)
-        msg(stats[0], "size(s) and", stats[1], "kernel(s) added,", stats[2], "kernel(s) removed")
-
-        with open(os.path.join(outputPath, basename), "w") as outFile:
-            yaml.safe_dump(mergedData,outFile,default_flow_style=None)
-        msg("File written to", os.path.join(outputPath, basename))
+        tasks.append((origFile, incFile, os.path.join(outputPath, basename), originalDir, forceMerge, trimSize, addSolutionTags, noEff))
+
+    # each file pair is merged independently of the others
+    totals = [0, 0, 0]
+    start = time.time()
+    for done, (i, stats, seconds) in enumerate(mapFiles(mergeLogicFile, tasks, jobs, ordered=False), 1):
+        totals = [t + s for t, s in zip(totals, stats)]
+        msg("[{}/{}]".format(done, len(tasks)), tasks[i][1], "merged in {:.1f} s".format(seconds))
         msg("------------------------------")
+    if tasks:
+        msg("Merged", len(tasks), "logic file(s) in {:.1f} s:".format(time.time() - start), totals[0], "size(s) and", totals[1],
+            "kernel(s) added,", totals[2], "kernel(s) removed")
 
 # partialLogicFilePaths: list of full paths to partial logic files
 # outputDir: Directory to write the final result to
@@ -467,35 +587,38 @@ def avoidRegressions(originalDir, incrementalDir, outputPath, forceMerge, trimSi
 # This is useful for when a tuning task is
 # shared between multiple machines who each
 # will provide a partial result.
-def mergePartialLogics(partialLogicFilePaths, outputDir, forceMerge, trimSize=True, addSolutionTags=False):
+def mergePartialLogics(partialLogicFilePaths, outputDir, forceMerge, trimSize=True, addSolutionTags=False, jobs=1):
     logicFiles = deepcopy(partialLogicFilePaths)
     ensurePath(outputDir)
 
-    baseLogicFile = logicFiles.pop(0)
-    baseLogicData = loadData(baseLogicFile)
-    msg("Base logic file:", baseLogicFile)
-    for f in logicFiles:
-        forceMerge = defaultForceMergePolicy(f) if forceMerge is None else forceMerge
+    # With jobs > 1, up to jobs partial files are parsed ahead in worker processes;
+    # the merges are applied in order
+    with contextlib.closing(mapFiles(loadData, [(f,) for f in logicFiles], jobs)) as loadedFiles:
+        baseLogicFile = logicFiles.pop(0)
+        _, baseLogicData, _ = next(loadedFiles)
+        msg("Base logic file:", baseLogicFile)
+        for n, f in enumerate(logicFiles, 1):
+            forceMerge = defaultForceMergePolicy(f) if forceMerge is None else forceMerge
 
-        msg("Incremental file:", f, "| Merge policy: %s"%("Forced" if forceMerge else "Winner"), "| Trim size:", trimSize)
-        incLogicData = loadData(f)
+            msg("[{}/{}] Incremental file:".format(n, len(logicFiles)), f, "| Merge policy: %s"%("Forced" if forceMerge else "Winner"), "| Trim size:", trimSize)
+            _, incLogicData, _ = next(loadedFiles)
 
-        # So far "SolutionIndex" in logic yamls has zero impact on actual 1-1 size mapping (but the order of the Solution does)
-        # since mergeLogic() takes that value very seriously so we reindex them here so it doesn't choke on duplicated SolutionIndex
-        baseLogicData = reindexSolutions(baseLogicData)
-        incLogicData = reindexSolutions(incLogicData)
+            # So far "SolutionIndex" in logic yamls has zero impact on actual 1-1 size mapping (but the order of the Solution does)
+            # since mergeLogic() takes that value very seriously so we reindex them here so it doesn't choke on duplicated SolutionIndex
+            baseLogicData = reindexSolutions(baseLogicData)
+            incLogicData = reindexSolutions(incLogicData)
 
-        mergedData, *stats = mergeLogic(baseLogicData, incLogicData, forceMerge, trimSize, addSolutionTags)
-        msg(stats[0], "size(s) and", stats[1], "kernel(s) added,", stats[2], "kernel(s) removed")
+            mergedData, *stats = mergeLogic(baseLogicData, incLogicData, forceMerge, trimSize, addSolutionTags)
+            msg(stats[0], "size(s) and", stats[1], "kernel(s) added,", stats[2], "kernel(s) removed")
 
-        # Use the merged data as the base data for the next partial logic file
-        baseLogicData = deepcopy(mergedData)
+            # Use the merged data as the base data for the next partial logic file,
+            # mergeLogic returns it detached from its inputs
+            baseLogicData = mergedData
 
 
     baseFileName = os.path.basename(baseLogicFile)
     outputFilePath = os.path.join(outputDir, baseFileName)
-    with open(outputFilePath, "w") as outFile:
-        yaml.safe_dump(baseLogicData, outFile, default_flow_style=None)
+    writeData(baseLogicData, outputFilePath)
     msg("File written to", outputFilePath)
     msg("------------------------------")
 
@@ -510,6 +633,7 @@ if __name__ == "__main__":
     argParser.add_argument("--add_solution_tags", help="Add tags to the size key for solution properies, allowing for solutions with different requirements "
                            "to exist for the same size. Default doesn't add this tag.", action="store_true")
     argParser.add_argument("--no_eff", help="force set eff as 0.0.", action="store_true")
+    argParser.add_argument("-j", "--jobs", help="Number of logic files merged in parallel. Default is the number of CPUs", default=None, type=int)
 
     args = argParser.parse_args(sys.argv[1:])
     originalDir = args.original_dir
@@ -520,9 +644,10 @@ if __name__ == "__main__":
     trimSize = args.notrim
     add_solution_tags = args.add_solution_tags
     no_eff = args.no_eff
+    jobs = args.jobs
 
     if forceMerge in ["none"]: forceMerge=None
     elif forceMerge in ["true", "1"]: forceMerge=True
     elif forceMerge in ["false", "0"]: forceMerge=False
 
-    avoidRegressions(originalDir, incrementalDir, outputPath, forceMerge, trimSize, add_solution_tags, no_eff)
+    avoidRegressions(originalDir, incrementalDir, outputPath, forceMerge, trimSize, add_solution_tags, no_eff, jobs)